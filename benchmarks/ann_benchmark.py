@@ -0,0 +1,72 @@
+"""Benchmark the IVF memory index against exact search.
+
+Reports recall@k and queries per second for several ``n_probe`` settings on
+synthetic clustered embeddings.
+
+Usage:
+    python -m benchmarks.ann_benchmark --size 200000 --dim 384 --k 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.storage.ann import IVFIndex
+from src.storage.vector_index import VectorIndex
+
+
+def make_data(size: int, dim: int, n_clusters: int, seed: int) -> np.ndarray:
+    """Generate clustered embeddings (memories on related topics cluster)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size)
+    return centers[labels] + 0.5 * rng.standard_normal((size, dim)).astype(np.float32)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100_000, help="Number of stored embeddings")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--k", type=int, default=10, help="Results per query")
+    parser.add_argument("--clusters", type=int, default=1000, help="Synthetic topic clusters")
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    data = make_data(args.size + args.queries, args.dim, args.clusters, args.seed)
+    vectors, queries = data[: args.size], data[args.size:]
+
+    exact = VectorIndex(dim=args.dim, initial_capacity=args.size)
+    for vector in vectors:
+        exact.add(vector)
+    matrix, valid = exact.arrays()
+
+    start = time.perf_counter()
+    truth = [{row for row, _ in exact.search(q, limit=args.k)} for q in queries]
+    exact_qps = len(queries) / (time.perf_counter() - start)
+
+    ivf = IVFIndex(min_train_size=0)
+    start = time.perf_counter()
+    ivf.train(matrix, valid)
+    train_seconds = time.perf_counter() - start
+
+    print(f"size={args.size} dim={args.dim} k={args.k} n_lists={ivf.centroids.shape[0]} "
+          f"train={train_seconds:.2f}s")
+    print(f"{'method':<16}{'recall@k':>10}{'QPS':>12}")
+    print(f"{'exact':<16}{1.0:>10.3f}{exact_qps:>12.1f}")
+
+    for n_probe in args.n_probe:
+        start = time.perf_counter()
+        results = [ivf.search(q, matrix, valid, limit=args.k, n_probe=n_probe) for q in queries]
+        qps = len(queries) / (time.perf_counter() - start)
+        recall = np.mean([
+            len(expected & {slot for slot, _ in found}) / len(expected)
+            for expected, found in zip(truth, results)
+        ])
+        print(f"{'ivf n_probe=' + str(n_probe):<16}{recall:>10.3f}{qps:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure the cold-start import time of the application.
+
+Imports the target module in fresh interpreters with ``python -X importtime``,
+reports the median total and the slowest modules, and fails (exit status 1)
+if the median exceeds the budget or if a module that should load lazily
+(provider SDKs, database and template layers, NumPy) was imported.
+
+Usage:
+    python -m benchmarks.import_benchmark --budget-ms 2500 --runs 5
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Loaded on first use, never by importing the application
+LAZY_MODULES = (
+    "langchain_openai",
+    "langchain_anthropic",
+    "openai",
+    "anthropic",
+    "sqlalchemy",
+    "jinja2",
+    "yaml",
+    "numpy",
+)
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Import a module in a fresh interpreter.
+
+    Args:
+        module: Module to import, e.g. ``src.main``
+
+    Returns:
+        Self and cumulative import time in microseconds per loaded module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=PROJECT_ROOT,
+    )
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|", 2)
+        if own.strip().isdigit():
+            times[name.strip()] = (int(own), int(cumulative))
+    return times
+
+
+def eager_lazy_modules(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    """Modules from ``LAZY_MODULES`` that were imported."""
+    return [name for name in LAZY_MODULES if name in times]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--budget-ms", type=float, default=2500.0, help="Maximum median import time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to show")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [run[args.module][1] / 1000 for run in runs]
+    median = statistics.median(totals)
+
+    print(f"{args.module}: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(totals):.0f}, max {max(totals):.0f}, budget {args.budget_ms:.0f})")
+    print(f"{'self ms':>9}{'cumulative ms':>15}  module")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[: args.top]
+    for name, (own, cumulative) in slowest:
+        print(f"{own / 1000:>9.1f}{cumulative / 1000:>15.1f}  {name}")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    eager = eager_lazy_modules(runs[-1])
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
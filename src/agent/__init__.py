@@ -1,7 +1,22 @@
-"""Agent module - Core intelligent agent logic."""
+"""Agent module - Core intelligent agent logic.
 
-from src.agent.graph import create_agent_graph
-from src.agent.state import AgentState
+Exports are resolved on first access, so importing one submodule (e.g.
+``src.agent.concurrency``) does not load the agent graph and its providers.
+"""
 
-__all__ = ["create_agent_graph", "AgentState"]
+from importlib import import_module
+from typing import Any
 
+_EXPORTS = {
+    "create_agent_graph": "src.agent.graph",
+    "AgentState": "src.agent.state",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
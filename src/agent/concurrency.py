@@ -0,0 +1,221 @@
+"""Concurrency controls for agent execution."""
+
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_input(message: str) -> str:
+    """Normalize a user message for request coalescing (collapse whitespace)."""
+    return " ".join(message.split())
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution.
+
+    The first caller for a key starts the work as a separate task; callers
+    arriving while it is in flight await the same task and receive its
+    result (or exception). A caller being cancelled does not cancel the
+    shared work for the others.
+    """
+
+    def __init__(self):
+        """Initialize with no calls in flight."""
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        """Number of keys currently in flight."""
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Coalescing key (equal keys share one execution)
+            fn: Zero-argument coroutine function doing the work
+
+        Returns:
+            Result of the shared execution
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self.executions += 1
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        """Forget a finished call."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Execution and coalescing counters."""
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted (maps to HTTP 429)."""
+
+    def __init__(self, reason: str, retry_after: int = 1):
+        """Initialize rejection.
+
+        Args:
+            reason: Human-readable reason
+            retry_after: Suggested client back-off in seconds
+        """
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class KeyedLock:
+    """Per-key async locks, so work on the same key runs one at a time in order.
+
+    Locks are created on demand and dropped when no task holds or waits for
+    them. ``asyncio.Lock`` wakes waiters in FIFO order, so turns of a session
+    execute in arrival order. With ``limit`` > 1, up to ``limit`` holders of
+    a key run at once (a keyed semaphore).
+    """
+
+    def __init__(self, max_pending: Optional[int] = None, limit: int = 1):
+        """Initialize keyed lock.
+
+        Args:
+            max_pending: Maximum holders + waiters per key; further callers
+                are rejected with ``AdmissionRejected`` (None for unbounded)
+            limit: Holders of the same key allowed at once
+        """
+        self.max_pending = max_pending
+        self.limit = limit
+        self._locks: Dict[Hashable, List[Any]] = {}
+
+    def __len__(self) -> int:
+        """Number of keys currently held or awaited."""
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        """Hold the lock for a key.
+
+        Args:
+            key: Lock key (e.g. the session's thread ID)
+        """
+        entry = self._locks.get(key)
+        if entry is None:
+            lock = asyncio.Lock() if self.limit == 1 else asyncio.Semaphore(self.limit)
+            entry = self._locks[key] = [lock, 0]
+        if self.max_pending is not None and entry[1] >= self.max_pending:
+            raise AdmissionRejected(f"Too many pending requests for '{key}'", retry_after=1)
+
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0 and self._locks.get(key) is entry:
+                del self._locks[key]
+
+
+class AdmissionController:
+    """Global bound on in-flight work with a bounded wait queue.
+
+    Up to ``max_concurrency`` callers run at once and up to ``max_queue``
+    wait; anyone beyond that (or waiting longer than ``queue_timeout``) is
+    rejected immediately with a ``Retry-After`` estimate derived from the
+    average service time.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: Optional[float] = None,
+    ):
+        """Initialize admission controller.
+
+        Args:
+            max_concurrency: Maximum number of concurrently admitted callers
+            max_queue: Maximum number of callers waiting for admission
+            queue_timeout: Maximum wait in seconds (None for no limit)
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._avg_service_seconds = 0.0
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a new caller could be admitted."""
+        backlog = (self.waiting + 1) / self.max_concurrency
+        return max(1, math.ceil(self._avg_service_seconds * backlog))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(reason, retry_after=self.retry_after())
+
+    def check(self) -> None:
+        """Raise ``AdmissionRejected`` if a new caller would be rejected right now."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            raise self._reject("Server is at capacity")
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Wait for an execution slot, or raise ``AdmissionRejected``."""
+        self.check()
+
+        self.waiting += 1
+        try:
+            if self.queue_timeout is None:
+                await self._semaphore.acquire()
+            else:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise self._reject("Timed out waiting for capacity") from None
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+            # Exponentially weighted average of service time
+            elapsed = time.monotonic() - started
+            self._avg_service_seconds += 0.1 * (elapsed - self._avg_service_seconds)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Admission counters."""
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_service_seconds": round(self._avg_service_seconds, 3),
+        }
@@ -10,12 +10,12 @@ except ImportError:
         # If create_agent is not available, we'll use a compatibility layer
         create_agent = None
 
-from langchain.chat_models import init_chat_model
-from langchain_openai import ChatOpenAI
-
+from src.agent.history import get_history_middleware
+from src.agent.state import DeltaAgentState
+from src.agent.tool_executor import get_tool_middleware
 from src.config import settings
 from src.storage.checkpointer import get_checkpointer
-from src.tools.example_tools import get_weather, calculate, get_current_time
+from src.storage.llm_cache import get_llm_cache
 
 
 def get_model():
@@ -24,25 +24,38 @@ def get_model():
     Returns:
         Configured chat model instance
     """
+    # Response cache (None when LLM_CACHE_MODE=off)
+    cache = get_llm_cache()
+
+    # Provider SDKs are imported only for the provider in use (cold start)
     # 优先使用 CSTCloud
     if settings.CSTCLOUD_API_KEY:
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model=settings.CSTCLOUD_MODEL,
             temperature=0.7,
             api_key=settings.CSTCLOUD_API_KEY,
             base_url=settings.CSTCLOUD_BASE_URL,
+            cache=cache,
         )
     elif settings.OPENAI_API_KEY:
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model="gpt-4",
             temperature=0.7,
             api_key=settings.OPENAI_API_KEY,
+            cache=cache,
         )
     elif settings.ANTHROPIC_API_KEY:
+        from langchain.chat_models import init_chat_model
+
         return init_chat_model(
             "claude-sonnet-4-5-20250929",
             temperature=0.7,
             api_key=settings.ANTHROPIC_API_KEY,
+            cache=cache,
         )
     else:
         raise ValueError(
@@ -50,6 +63,17 @@ def get_model():
         )
 
 
+def get_tools():
+    """Tools available to the agent.
+
+    Returns:
+        List of LangChain tools
+    """
+    from src.tools.example_tools import get_weather, calculate, get_current_time
+
+    return [get_weather, calculate, get_current_time]
+
+
 def create_agent_graph():
     """Create agent using official recommended create_agent API.
     
@@ -63,7 +87,7 @@ def create_agent_graph():
     model = get_model()
     
     # Define tools list
-    tools = [get_weather, calculate, get_current_time]
+    tools = get_tools()
     
     # Get checkpointer for memory
     checkpointer = get_checkpointer()
@@ -87,6 +111,11 @@ When using tools, make sure to use them correctly and explain the results to the
         tools=tools,
         system_prompt=system_prompt,
         checkpointer=checkpointer,
+        # Delta-encoded message history in checkpoints
+        state_schema=DeltaAgentState if settings.CHECKPOINT_DELTA else None,
+        # Bounded history (sliding window / rolling summary); concurrent tool calls with
+        # timeouts and a per-turn parallelism limit
+        middleware=[*get_history_middleware(model), *get_tool_middleware()],
     )
     
     return agent
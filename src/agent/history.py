@@ -0,0 +1,182 @@
+"""Bounded conversation history.
+
+``HistoryMiddleware`` runs once per agent invocation, before the first model
+call. When a thread's history grows past ``max_turns`` turns or
+``max_tokens`` tokens, the oldest turns are removed from the state, so both
+the prompt and the checkpoint stay bounded. Depending on the policy, removed
+turns are either dropped (``window``) or folded into a rolling summary kept
+at the head of the history (``summarize``).
+
+History is always cut at turn boundaries (a turn starts with a user message),
+so tool calls and their results are never separated.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, RemoveMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.constants import TAG_NOSTREAM
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from src.agent.streaming import message_content
+from src.agent.utils import format_messages
+from src.config import settings
+
+HISTORY_POLICIES = ("off", "window", "summarize")
+
+# Message ID of the rolling summary at the head of the history
+SUMMARY_MESSAGE_ID = "history-summary"
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def is_summary(message: BaseMessage) -> bool:
+    """Whether a message is the rolling history summary."""
+    return message.id == SUMMARY_MESSAGE_ID
+
+
+class HistoryMiddleware(AgentMiddleware):
+    """Keep recent turns verbatim and drop or summarize older ones.
+
+    Trimming starts once history exceeds ``max_turns`` or ``max_tokens`` and
+    then cuts down to ``keep_turns`` / ``keep_tokens``, so the (possibly
+    expensive) summarization runs every few turns rather than on each one.
+    The current turn is always kept in full.
+    """
+
+    def __init__(
+        self,
+        policy: str = "summarize",
+        max_turns: Optional[int] = 20,
+        max_tokens: Optional[int] = 8000,
+        keep_turns: Optional[int] = None,
+        keep_tokens: Optional[int] = None,
+        model: Optional[BaseChatModel] = None,
+        token_counter=count_tokens_approximately,
+    ):
+        """Initialize history middleware.
+
+        Args:
+            policy: 'window' (drop old turns) or 'summarize' (fold them into a summary)
+            max_turns: Trim when the history has more turns than this (None for no limit)
+            max_tokens: Trim when the history has more tokens than this (None for no limit)
+            keep_turns: Turns kept after trimming (defaults to half of ``max_turns``)
+            keep_tokens: Token budget kept after trimming (defaults to half of ``max_tokens``)
+            model: Chat model writing summaries (required for 'summarize')
+            token_counter: Function counting the tokens of a message list
+        """
+        super().__init__()
+        if policy not in ("window", "summarize"):
+            raise ValueError(f"Unknown history policy '{policy}', expected 'window' or 'summarize'")
+        if policy == "summarize" and model is None:
+            raise ValueError("The 'summarize' history policy requires a model")
+
+        self.policy = policy
+        self.max_turns = max_turns
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns if keep_turns is not None else (max(1, max_turns // 2) if max_turns else None)
+        self.keep_tokens = keep_tokens if keep_tokens is not None else (max_tokens // 2 if max_tokens else None)
+        # Summary calls are internal: keep their tokens out of client streams
+        self.model = model.with_config(tags=[TAG_NOSTREAM]) if model is not None else None
+        self.token_counter = token_counter
+
+    def _cutoff(self, messages: Sequence[BaseMessage]) -> int:
+        """Index of the first message to keep verbatim (0 when nothing is trimmed)."""
+        starts = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage) and not is_summary(m)]
+        if len(starts) <= 1:
+            return 0
+
+        counts = [self.token_counter([m]) for m in messages]
+        suffix = [0] * (len(messages) + 1)
+        for i in range(len(messages) - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + counts[i]
+
+        over_turns = self.max_turns is not None and len(starts) > self.max_turns
+        over_tokens = self.max_tokens is not None and suffix[0] > self.max_tokens
+        if not (over_turns or over_tokens):
+            return 0
+
+        # Drop whole turns from the front until within the retention budget
+        first = 0
+        if self.keep_turns is not None:
+            first = max(first, len(starts) - self.keep_turns)
+        if self.keep_tokens is not None:
+            while first < len(starts) - 1 and suffix[starts[first]] > self.keep_tokens:
+                first += 1
+        first = min(first, len(starts) - 1)
+        return starts[first] if first > 0 else 0
+
+    def _prompt(self, removed: Sequence[BaseMessage]) -> List[HumanMessage]:
+        """Summarization prompt for the removed messages and the previous summary."""
+        # Loaded on first summary: the template engine is not needed at startup
+        from src.prompts.loader import render_prompt
+
+        summary = next((message_content(m)[len(SUMMARY_PREFIX):] for m in removed if is_summary(m)), None)
+        prompt = render_prompt(
+            "history_summary",
+            context={
+                "summary": summary,
+                "messages": format_messages([m for m in removed if not is_summary(m)]),
+            },
+        )
+        return [HumanMessage(content=prompt)]
+
+    def _update(self, messages: Sequence[BaseMessage], cutoff: int, summary: Optional[str]) -> Dict[str, Any]:
+        """State update replacing the history with (summary +) kept messages."""
+        head = []
+        if summary is not None:
+            head.append(HumanMessage(content=SUMMARY_PREFIX + summary, id=SUMMARY_MESSAGE_ID))
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *head, *messages[cutoff:]]}
+
+    def before_agent(self, state, runtime) -> Optional[Dict[str, Any]]:
+        """Trim the history before the turn runs."""
+        messages = state["messages"]
+        cutoff = self._cutoff(messages)
+        if cutoff == 0:
+            return None
+
+        summary = None
+        if self.policy == "summarize":
+            summary = message_content(self.model.invoke(self._prompt(messages[:cutoff])))
+        return self._update(messages, cutoff, summary)
+
+    async def abefore_agent(self, state, runtime) -> Optional[Dict[str, Any]]:
+        """Trim the history before the turn runs."""
+        messages = state["messages"]
+        cutoff = self._cutoff(messages)
+        if cutoff == 0:
+            return None
+
+        summary = None
+        if self.policy == "summarize":
+            response = await self.model.ainvoke(self._prompt(messages[:cutoff]))
+            summary = message_content(response)
+        return self._update(messages, cutoff, summary)
+
+
+def get_history_middleware(model: Optional[BaseChatModel] = None) -> List[AgentMiddleware]:
+    """Build the history middleware configured in settings.
+
+    Args:
+        model: Chat model used for summaries (the agent's model)
+
+    Returns:
+        Middleware list for ``create_agent`` (empty when HISTORY_POLICY=off)
+    """
+    policy = settings.HISTORY_POLICY.lower()
+    if policy not in HISTORY_POLICIES:
+        raise ValueError(f"Unknown HISTORY_POLICY '{settings.HISTORY_POLICY}', expected one of {HISTORY_POLICIES}")
+    if policy == "off":
+        return []
+
+    return [
+        HistoryMiddleware(
+            policy=policy,
+            max_turns=settings.HISTORY_MAX_TURNS,
+            max_tokens=settings.HISTORY_MAX_TOKENS,
+            keep_turns=settings.HISTORY_KEEP_TURNS,
+            keep_tokens=settings.HISTORY_KEEP_TOKENS,
+            model=model,
+        )
+    ]
@@ -6,6 +6,7 @@ Each function here represents a node in the LangGraph workflow.
 from typing import Any
 from langchain_core.messages import HumanMessage, AIMessage
 from src.agent.state import AgentState
+from src.agent.tool_executor import get_tool_executor
 from src.config import settings
 
 
@@ -54,13 +55,19 @@ async def llm_node(state: AgentState) -> AgentState:
 
 
 async def tool_node(state: AgentState) -> AgentState:
-    """Node that executes tools/function calls."""
+    """Node that executes tools/function calls.
+
+    All tool calls of the last message run concurrently (see
+    ``src.agent.tool_executor``); results are added in call order.
+    """
     messages = state.get("messages", [])
-    
-    # Check if the last message contains tool calls
-    # Execute tools and add results to state
-    
-    return state
+    tool_calls = getattr(messages[-1], "tool_calls", None) if messages else None
+    if not tool_calls:
+        return {"messages": []}
+
+    return {
+        "messages": await get_tool_executor().arun(tool_calls),
+    }
 
 
 async def end_node(state: AgentState) -> AgentState:
@@ -1,8 +1,14 @@
 """Agent state schema definition."""
 
-from typing import TypedDict, Annotated, Sequence
-from langchain_core.messages import BaseMessage
+from functools import reduce
+from typing import Any, List, TypedDict, Annotated, Sequence
+from langchain.agents import AgentState as BaseAgentState
+from langchain_core.messages import AnyMessage, BaseMessage
+from langgraph.channels import DeltaChannel
 from langgraph.graph.message import add_messages
+from typing_extensions import Required
+
+from src.config import settings
 
 
 class AgentState(TypedDict):
@@ -19,3 +25,23 @@ class AgentState(TypedDict):
     # tool_results: list
     # user_context: dict
 
+
+def add_message_batches(messages: List[AnyMessage], batches: Sequence[Any]) -> List[AnyMessage]:
+    """Batch form of ``add_messages``: apply several message updates in order."""
+    return reduce(add_messages, batches, messages)
+
+
+class DeltaAgentState(BaseAgentState):
+    """``create_agent`` state whose message history is checkpointed as deltas.
+
+    Each checkpoint stores only the messages written in that step; the full
+    history is stored every ``CHECKPOINT_SNAPSHOT_INTERVAL`` updates and
+    rebuilt from the latest snapshot plus later writes when a thread loads.
+    """
+
+    messages: Required[
+        Annotated[
+            List[AnyMessage],
+            DeltaChannel(add_message_batches, snapshot_frequency=settings.CHECKPOINT_SNAPSHOT_INTERVAL),
+        ]
+    ]
@@ -0,0 +1,131 @@
+"""Streaming helpers that turn agent graph events into client-facing events."""
+
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+def message_content(message: Any) -> str:
+    """Extract text content from a message, message chunk or dict.
+
+    Args:
+        message: LangChain message/chunk, dict or any other object
+
+    Returns:
+        Text content of the message
+    """
+    if message is None:
+        return ""
+
+    if hasattr(message, "content"):
+        content = message.content
+    elif isinstance(message, dict):
+        content = message.get("content", str(message))
+    else:
+        content = str(message)
+
+    # Some providers return a list of content blocks instead of a plain string
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                parts.append(block.get("text", ""))
+        return "".join(parts)
+
+    return content if isinstance(content, str) else str(content)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format an event as a Server-Sent Events frame.
+
+    Args:
+        event: Event name
+        data: JSON-serializable event payload
+
+    Returns:
+        SSE frame string
+    """
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def stream_agent_events(
+    agent: Any,
+    message: str,
+    session_id: str,
+    config: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run the agent and yield events as they are produced by the graph.
+
+    Emitted events (each a dict with ``event`` and ``data`` keys):
+        - ``start``: sent immediately, before the graph runs
+        - ``token``: an LLM output token chunk
+        - ``tool_start`` / ``tool_end``: a tool call started / finished
+        - ``final``: the final assistant message
+        - ``error``: the run failed; no further events follow
+
+    Args:
+        agent: Compiled agent graph (from ``create_agent_graph()``)
+        message: User message
+        session_id: Session ID used as the checkpointer thread ID
+        config: Optional extra runnable config merged into the run config
+
+    Yields:
+        Event dictionaries
+    """
+    yield {"event": "start", "data": {"session_id": session_id}}
+
+    run_config = {**(config or {}), "configurable": {"thread_id": session_id}}
+    inputs = {"messages": [{"role": "user", "content": message}]}
+    final_message: Any = None
+
+    try:
+        async for event in agent.astream_events(inputs, config=run_config, version="v2"):
+            kind = event.get("event")
+            data = event.get("data", {})
+
+            if kind == "on_chat_model_stream":
+                # Internal model calls (e.g. history summaries) are not part of the answer
+                if "nostream" in event.get("tags", ()):
+                    continue
+                text = message_content(data.get("chunk"))
+                if text:
+                    yield {"event": "token", "data": {"content": text}}
+
+            elif kind == "on_tool_start":
+                yield {
+                    "event": "tool_start",
+                    "data": {
+                        "name": event.get("name"),
+                        "run_id": str(event.get("run_id", "")),
+                        "input": data.get("input"),
+                    },
+                }
+
+            elif kind == "on_tool_end":
+                yield {
+                    "event": "tool_end",
+                    "data": {
+                        "name": event.get("name"),
+                        "run_id": str(event.get("run_id", "")),
+                        "output": message_content(data.get("output")),
+                    },
+                }
+
+            elif kind == "on_chat_model_end":
+                final_message = data.get("output", final_message)
+
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # Top-level graph finished: prefer the last message in the final state
+                output = data.get("output")
+                if isinstance(output, dict) and output.get("messages"):
+                    final_message = output["messages"][-1]
+    except Exception as e:
+        yield {"event": "error", "data": {"detail": str(e)}}
+        return
+
+    yield {
+        "event": "final",
+        "data": {"response": message_content(final_message), "session_id": session_id},
+    }
@@ -0,0 +1,238 @@
+"""Concurrent execution of the tool calls of a model turn.
+
+When the model requests several tools in one message, the calls are
+independent, so they run concurrently: a turn takes as long as its slowest
+call, not the sum of all calls. Each call is bounded by a timeout (per tool,
+``TOOL_TIMEOUTS``, or the default ``TOOL_TIMEOUT``), at most
+``TOOL_MAX_PARALLEL`` calls of a turn run at once, and results come back in
+the order of the calls. A failing or timed-out call becomes an error
+``ToolMessage`` for the model instead of failing the turn. Results of tools
+marked ``cacheable`` (``src.tools.base.cacheable``) are memoized in the tool
+result cache; a hit is answered without taking a slot of the turn.
+
+- ``ToolExecutor.arun()`` executes a list of tool calls (custom node graph,
+  ``src.agent.nodes.tool_node``)
+- ``ToolExecutionMiddleware`` applies the same timeouts and per-turn limit to
+  ``create_agent``, which already dispatches the tool calls of a turn as
+  parallel tasks
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping, Optional, Sequence
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ToolCallRequest
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+from src.agent.concurrency import KeyedLock
+from src.config import settings
+from src.storage.tool_cache import ToolCache, get_tool_cache
+
+
+def error_message(tool_call: ToolCall, error: str) -> ToolMessage:
+    """Error result of a tool call, returned to the model."""
+    return ToolMessage(
+        content=f"Error: {error}",
+        name=tool_call["name"],
+        tool_call_id=tool_call["id"],
+        status="error",
+    )
+
+
+class ToolExecutor:
+    """Runs tool calls concurrently with timeouts and bounded parallelism."""
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        timeout: Optional[float] = None,
+        tool_timeouts: Optional[Mapping[str, float]] = None,
+        max_parallel: Optional[int] = None,
+        cache: Optional[ToolCache] = None,
+    ):
+        """Initialize executor.
+
+        Args:
+            tools: Tools that may be called
+            timeout: Default timeout per call in seconds (None for no timeout)
+            tool_timeouts: Timeouts overriding the default for specific tools
+            max_parallel: Maximum concurrent calls per turn (None for unbounded)
+            cache: Result cache for cacheable tools (None to disable memoization)
+        """
+        self.tools: Dict[str, BaseTool] = {tool.name: tool for tool in tools}
+        self.timeout = timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.max_parallel = max_parallel
+        self.cache = cache
+        self._counters = {"calls": 0, "errors": 0, "timeouts": 0}
+
+    def timeout_for(self, name: str) -> Optional[float]:
+        """Timeout of a tool in seconds."""
+        return self.tool_timeouts.get(name, self.timeout)
+
+    async def guard(self, tool_call: ToolCall, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one tool call under its timeout.
+
+        Args:
+            tool_call: Tool call from the model
+            call: Coroutine function executing the call
+
+        Returns:
+            Result of ``call``, or an error ``ToolMessage`` if it timed out
+        """
+        self._counters["calls"] += 1
+        timeout = self.timeout_for(tool_call["name"])
+        try:
+            return await asyncio.wait_for(call(), timeout)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            return error_message(tool_call, f"tool '{tool_call['name']}' timed out after {timeout}s")
+
+    def cache_arguments(self, tool_call: ToolCall) -> Optional[Dict[str, Any]]:
+        """Canonicalized arguments of a cacheable call, or None if it is not memoized.
+
+        Arguments are validated against the tool's schema, so omitted defaults
+        and equivalent spellings map to the same cache entry.
+        """
+        tool = self.tools.get(tool_call["name"])
+        if self.cache is None or tool is None or not (tool.metadata or {}).get("cacheable"):
+            return None
+        schema = tool.args_schema
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            try:
+                return schema.model_validate(tool_call["args"]).model_dump(mode="json")
+            except Exception:
+                # Invalid arguments: the tool reports the error itself
+                return None
+        return dict(tool_call["args"])
+
+    async def cached(self, tool_call: ToolCall, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Answer a call from the tool result cache, or run it and cache its result.
+
+        Args:
+            tool_call: Tool call from the model
+            call: Coroutine function executing the call (with timeout and limits)
+
+        Returns:
+            Cached or fresh result; error results are not cached
+        """
+        arguments = self.cache_arguments(tool_call)
+        if arguments is None:
+            return await call()
+
+        name = tool_call["name"]
+        key = self.cache.key(name, arguments)
+        found, content = await self.cache.aget(name, key)
+        if found:
+            return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"])
+
+        started = time.monotonic()
+        result = await call()
+        if isinstance(result, ToolMessage) and result.status != "error":
+            ttl = (self.tools[name].metadata or {}).get("cache_ttl")
+            await self.cache.aset(name, key, result.content, ttl=ttl, seconds=time.monotonic() - started)
+        return result
+
+    async def _invoke(self, tool_call: ToolCall) -> ToolMessage:
+        tool = self.tools.get(tool_call["name"])
+        if tool is None:
+            self._counters["errors"] += 1
+            return error_message(tool_call, f"unknown tool '{tool_call['name']}'")
+        try:
+            return await tool.ainvoke({**tool_call, "type": "tool_call"})
+        except Exception as e:
+            self._counters["errors"] += 1
+            return error_message(tool_call, str(e))
+
+    async def arun(self, tool_calls: Sequence[ToolCall]) -> List[ToolMessage]:
+        """Execute the tool calls of a turn concurrently.
+
+        Args:
+            tool_calls: Tool calls of one model message
+
+        Returns:
+            One ``ToolMessage`` per call, in the order of ``tool_calls``
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel) if self.max_parallel else None
+
+        async def run(tool_call: ToolCall) -> ToolMessage:
+            if semaphore is None:
+                return await self.guard(tool_call, lambda: self._invoke(tool_call))
+            async with semaphore:
+                return await self.guard(tool_call, lambda: self._invoke(tool_call))
+
+        return list(
+            await asyncio.gather(*(self.cached(tool_call, lambda c=tool_call: run(c)) for tool_call in tool_calls))
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Call, error and timeout counters."""
+        return dict(self._counters)
+
+
+def _turn_key(request: ToolCallRequest) -> Hashable:
+    """Identify the model turn of a tool call (the ID of the message that requested it)."""
+    call_id = request.tool_call["id"]
+    messages = request.state.get("messages", []) if isinstance(request.state, dict) else []
+    for message in reversed(messages):
+        if isinstance(message, AIMessage) and message.id and any(c["id"] == call_id for c in message.tool_calls):
+            return message.id
+    return call_id
+
+
+class ToolExecutionMiddleware(AgentMiddleware):
+    """Tool result memoization, per-tool timeouts and a per-turn parallelism limit for ``create_agent``."""
+
+    def __init__(self, executor: ToolExecutor):
+        """Initialize middleware.
+
+        Args:
+            executor: Executor providing timeouts, limits and counters
+        """
+        super().__init__()
+        self.executor = executor
+        self._turns = KeyedLock(limit=executor.max_parallel) if executor.max_parallel else None
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[Any]],
+    ) -> Any:
+        return await self.executor.cached(request.tool_call, lambda: self._run(request, handler))
+
+    async def _run(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[Any]],
+    ) -> Any:
+        if self._turns is None:
+            return await self.executor.guard(request.tool_call, lambda: handler(request))
+        async with self._turns.hold(_turn_key(request)):
+            return await self.executor.guard(request.tool_call, lambda: handler(request))
+
+
+_executor: Optional[ToolExecutor] = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """Get the shared executor for the agent's tools (configured from settings)."""
+    global _executor
+    if _executor is None:
+        from src.agent.graph import get_tools
+
+        _executor = ToolExecutor(
+            get_tools(),
+            timeout=settings.TOOL_TIMEOUT,
+            tool_timeouts=settings.TOOL_TIMEOUTS,
+            max_parallel=settings.TOOL_MAX_PARALLEL,
+            cache=get_tool_cache(),
+        )
+    return _executor
+
+
+def get_tool_middleware() -> List[AgentMiddleware]:
+    """Tool execution middleware for ``create_agent``."""
+    return [ToolExecutionMiddleware(get_tool_executor())]
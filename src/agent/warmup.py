@@ -0,0 +1,123 @@
+"""Startup warm-up and readiness.
+
+After the application lifespan has opened the shared pools, ``Warmup.run``
+pays the remaining first-request costs in the background:
+
+- ``prompts``: compile all prompt templates
+- ``agent``: build the model client and compile the agent graph
+- ``tools``: import the tool modules and their dependencies (NumPy) and start
+  the tool worker processes
+- ``llm`` (optional, ``WARMUP_LLM``): one small model request, opening the
+  provider connection
+
+Blocking steps run in worker threads so the server keeps answering health
+probes meanwhile. ``/ready`` reports not-ready (503) until the warm-up has
+finished, so the load balancer only routes to warm workers. A failed ``llm``
+step is recorded but does not block readiness.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROMPT = "ping"
+
+
+class Warmup:
+    """Runs the warm-up steps and tracks readiness."""
+
+    def __init__(self, llm: bool = False, timeout: Optional[float] = 30.0):
+        """Initialize warm-up.
+
+        Args:
+            llm: Whether to send a warm-up request to the model
+            timeout: Timeout of the warm-up model request in seconds
+        """
+        self.llm = llm
+        self.timeout = timeout
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._started: Optional[float] = None
+        self._seconds: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the warm-up has finished successfully."""
+        return self.status == "ready"
+
+    def mark_ready(self) -> None:
+        """Declare the worker ready without warming up (``WARMUP_ENABLED=false``)."""
+        self.status = "ready"
+
+    async def _step(self, name: str, fn: Callable[[], Any], required: bool = True) -> Any:
+        """Run one step (blocking ones in a worker thread) and record its duration or error."""
+        started = time.monotonic()
+        try:
+            result = await fn() if asyncio.iscoroutinefunction(fn) else await asyncio.to_thread(fn)
+        except Exception as e:
+            self.steps[name] = {"ok": False, "seconds": round(time.monotonic() - started, 3), "error": str(e)}
+            if required:
+                raise
+            logger.warning("Warm-up step '%s' failed: %s", name, e)
+            return None
+        self.steps[name] = {"ok": True, "seconds": round(time.monotonic() - started, 3)}
+        return result
+
+    async def run(self, build_agent: Callable[[], Any]) -> None:
+        """Warm up the worker.
+
+        Args:
+            build_agent: Returns the shared agent, building it on first call
+        """
+        self.status = "warming"
+        self._started = time.monotonic()
+        try:
+            from src.prompts.loader import preload_prompts
+
+            await self._step("prompts", preload_prompts)
+            await self._step("agent", build_agent)
+            await self._step("tools", _load_tools)
+            if self.llm:
+                await self._step("llm", self._ping_model, required=False)
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.error("Warm-up failed: %s", e)
+        else:
+            self.status = "ready"
+            logger.info("Warm-up finished in %.2fs", time.monotonic() - self._started)
+        finally:
+            self._seconds = time.monotonic() - self._started
+
+    async def _ping_model(self) -> None:
+        """Send one small request to the configured model (opens its connection pool)."""
+        from src.agent.graph import get_model
+
+        model = await asyncio.to_thread(get_model)
+        # Bypass the response cache: a cached reply would not touch the provider
+        model.cache = False
+        await asyncio.wait_for(model.ainvoke(WARMUP_PROMPT), self.timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Status, per-step durations and errors."""
+        return {
+            "status": self.status,
+            "seconds": round(self._seconds, 3) if self._seconds is not None else None,
+            "steps": self.steps,
+            "error": self.error,
+        }
+
+
+def _load_tools() -> None:
+    """Import the agent's tools, compile a trivial expression (loads NumPy) and start the worker processes."""
+    from src.agent.graph import get_tools
+    from src.tools.execution import get_tool_pools
+    from src.tools.expression import compile_expression
+
+    get_tools()
+    compile_expression("1 + 1").evaluate()
+    get_tool_pools().start()
@@ -1,7 +1,7 @@
 """Global configuration management using Pydantic Settings."""
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -26,6 +26,129 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
 
+    # LangGraph checkpointer: memory, postgres or redis. Persistent backends use an async
+    # connection pool opened at startup; CHECKPOINTER_URL defaults to DATABASE_URL / REDIS_URL
+    CHECKPOINTER_BACKEND: str = "memory"
+    CHECKPOINTER_URL: Optional[str] = None
+    CHECKPOINTER_POOL_MIN_SIZE: int = 2
+    CHECKPOINTER_POOL_MAX_SIZE: int = 20
+    CHECKPOINTER_POOL_TIMEOUT: float = 10.0
+    # Checkpoint size: compress blobs (none, zlib or zstd) and store only new messages per step,
+    # with a full snapshot of the history every CHECKPOINT_SNAPSHOT_INTERVAL updates
+    CHECKPOINT_COMPRESSION: str = "zstd"
+    CHECKPOINT_COMPRESSION_MIN_BYTES: int = 512
+    CHECKPOINT_DELTA: bool = True
+    CHECKPOINT_SNAPSHOT_INTERVAL: int = 100
+    # In-process hot cache over the persistent checkpointer (recent threads, LRU + idle TTL)
+    # with write-behind persistence, flushed on shutdown
+    CHECKPOINT_CACHE: bool = True
+    CHECKPOINT_CACHE_MAX_THREADS: int = 1024
+    CHECKPOINT_CACHE_MAX_CHECKPOINTS: int = 8
+    CHECKPOINT_CACHE_TTL: Optional[float] = 300.0
+    CHECKPOINT_WRITE_BEHIND: bool = True
+    CHECKPOINT_WRITE_QUEUE: int = 1024
+    # Budget of the memory backend: serialized bytes and threads (LRU eviction), idle TTL of a
+    # thread (seconds) and checkpoints kept per thread; None disables a limit
+    CHECKPOINT_MEMORY_MAX_BYTES: Optional[int] = 256 * 1024 * 1024
+    CHECKPOINT_MEMORY_MAX_THREADS: Optional[int] = 10000
+    CHECKPOINT_MEMORY_TTL: Optional[float] = 24 * 3600.0
+    CHECKPOINT_MEMORY_KEEP: Optional[int] = 20
+
+    # Conversation history: off, window (drop old turns) or summarize (fold them into a rolling
+    # summary). Trimming starts above MAX_TURNS / MAX_TOKENS and keeps KEEP_TURNS / KEEP_TOKENS
+    # (default: half of the maximum); None disables a limit
+    HISTORY_POLICY: str = "summarize"
+    HISTORY_MAX_TURNS: Optional[int] = 20
+    HISTORY_MAX_TOKENS: Optional[int] = 8000
+    HISTORY_KEEP_TURNS: Optional[int] = None
+    HISTORY_KEEP_TOKENS: Optional[int] = None
+
+    # Agent admission control: global concurrency, wait-queue depth and wait timeout (seconds),
+    # plus the maximum number of queued turns per session
+    AGENT_MAX_CONCURRENCY: int = 32
+    AGENT_MAX_QUEUE: int = 128
+    AGENT_QUEUE_TIMEOUT: Optional[float] = 30.0
+    AGENT_SESSION_MAX_PENDING: int = 4
+
+    # Tool calls of one model turn run concurrently: default and per-tool timeouts (seconds,
+    # e.g. TOOL_TIMEOUTS='{"database_query": 60}') and the maximum parallel calls per turn
+    TOOL_TIMEOUT: Optional[float] = 30.0
+    TOOL_TIMEOUTS: Dict[str, float] = {}
+    TOOL_MAX_PARALLEL: Optional[int] = 8
+
+    # Worker pools for tools with the 'thread' / 'process' execution policy (created at startup);
+    # worker counts are also the per-policy concurrency limits (None: min(32, cpus + 4) / cpus)
+    TOOL_THREAD_WORKERS: Optional[int] = None
+    TOOL_PROCESS_WORKERS: Optional[int] = None
+    TOOL_PROCESS_START_METHOD: Optional[str] = "spawn"
+
+    # calculate tool budgets: expression length, elements per input array, and element
+    # operations per evaluation (syntax nodes x elements, bounds the evaluation time)
+    CALCULATE_MAX_LENGTH: int = 2000
+    CALCULATE_MAX_ELEMENTS: int = 1_000_000
+    CALCULATE_MAX_OPERATIONS: int = 50_000_000
+    # Integer arithmetic is exact; powers with a larger result (in bits) are refused
+    CALCULATE_MAX_INT_BITS: int = 4096
+
+    # Memoization of cacheable tool results (tools declare cacheability and TTL):
+    # backend "memory" (per process, LRU within the entry/byte budget) or "redis" (shared, REDIS_URL)
+    TOOL_CACHE: bool = True
+    TOOL_CACHE_BACKEND: str = "memory"
+    TOOL_CACHE_TTL: Optional[float] = 300.0
+    TOOL_CACHE_MAX_ENTRIES: Optional[int] = 2048
+    TOOL_CACHE_MAX_BYTES: Optional[int] = 32 * 1024 * 1024
+
+    # Startup warm-up (prompts, agent graph, tools; optionally one model request with a
+    # timeout in seconds); /ready answers 503 until it has finished
+    WARMUP_ENABLED: bool = True
+    WARMUP_LLM: bool = False
+    WARMUP_TIMEOUT: Optional[float] = 30.0
+
+    # Opt-in for /agent/invoke: requests without session_id run on a throwaway thread (no shared
+    # history) and identical concurrent ones share one graph execution
+    AGENT_COALESCE_REQUESTS: bool = False
+
+    # LLM response cache
+    LLM_CACHE_MODE: str = "off"  # off, exact or semantic
+    LLM_CACHE_BACKEND: str = "memory"  # memory or redis
+    LLM_CACHE_TTL: Optional[float] = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_SEMANTIC_THRESHOLD: float = 0.95
+    LLM_CACHE_EMBEDDING_MODEL: Optional[str] = None
+
+    # Shared outbound HTTP client used by tools (timeouts in seconds; HTTP/2 needs the h2 package)
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: Optional[int] = 20
+    HTTP2_ENABLED: bool = False
+
+    # Database query tool: async engine pool (per DATABASE_URL), query timeout (seconds, enforced
+    # by the server on PostgreSQL), rows per cursor fetch and result size budget (characters)
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 10.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_QUERY_TIMEOUT: Optional[float] = 30.0
+    DB_FETCH_SIZE: int = 500
+    DB_MAX_RESULT_BYTES: Optional[int] = 1024 * 1024
+    # Results are returned column-major; above this many (estimated) tokens, as per-column
+    # statistics plus the first/last DB_RESULT_SAMPLE_ROWS rows
+    DB_RESULT_TOKEN_BUDGET: Optional[int] = 2000
+    # Significant digits of the summary statistics (full results keep exact values)
+    DB_RESULT_FLOAT_DIGITS: int = 6
+    DB_RESULT_SAMPLE_ROWS: int = 5
+    # Query result cache (keyed by normalized SQL + parameters, invalidated per table)
+    DB_CACHE: bool = True
+    DB_CACHE_TTL: Optional[float] = 300.0
+    DB_CACHE_MAX_ENTRIES: int = 1024
+    DB_CACHE_MAX_BYTES: Optional[int] = 64 * 1024 * 1024
+
+    # Long-term memory (directory of the persistent memory-mapped store; in-memory if unset)
+    MEMORY_STORE_PATH: Optional[str] = None
+
     # LangSmith
     LANGCHAIN_TRACING_V2: bool = False
     LANGCHAIN_PROJECT: str = "hydroagent"
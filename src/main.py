@@ -1,38 +1,109 @@
 """Main entry point for the HydroAgent application."""
 
 import asyncio
+import json
+import sys
+import threading
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from pydantic import BaseModel
 
 from src.config import settings
+from src.agent.concurrency import (
+    AdmissionController,
+    AdmissionRejected,
+    KeyedLock,
+    SingleFlight,
+    normalize_input,
+)
 from src.agent.graph import create_agent_graph
+from src.agent.streaming import format_sse, message_content, stream_agent_events
+from src.agent.tool_executor import get_tool_executor
+from src.agent.warmup import Warmup
+from src.storage.checkpointer import (
+    check_checkpointer,
+    close_checkpointer,
+    get_checkpointer_stats,
+    open_checkpointer,
+)
+from src.storage.llm_cache import get_llm_cache
+from src.storage.query_cache import get_query_cache
+from src.storage.tool_cache import get_tool_cache
+from src.tools.execution import get_tool_pools, init_tool_pools, shutdown_tool_pools
+from src.tools.http_client import close_http_client, init_http_client
+
+
+# Startup warm-up; /ready reports it to the load balancer
+warmup = Warmup(llm=settings.WARMUP_LLM, timeout=settings.WARMUP_TIMEOUT)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup, warm up, and release them on shutdown."""
+    # Fails startup if the configured checkpointer is unreachable
+    await open_checkpointer()
+    await init_http_client()
+    await init_tool_pools()
+    # Runs in the background so the server answers health probes while warming up
+    warmup_task = asyncio.create_task(warmup.run(get_agent)) if settings.WARMUP_ENABLED else None
+    if warmup_task is None:
+        warmup.mark_ready()
+    try:
+        yield
+    finally:
+        if warmup_task is not None and not warmup_task.done():
+            warmup_task.cancel()
+        await shutdown_tool_pools()
+        # Database engines exist only if the (lazily imported) database tool was used
+        data_tools = sys.modules.get("src.tools.data_tools")
+        if data_tools is not None:
+            await data_tools.dispose_engines()
+        await close_http_client()
+        await close_checkpointer()
+
 
 # FastAPI app
 app = FastAPI(
     title="HydroAgent",
     description="A LangGraph-based intelligent agent system using official create_agent API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Global agent instance (avoid recreating on each request)
 _agent = None
+_agent_lock = threading.Lock()
 
 
 def get_agent():
     """Get or create agent instance.
-    
+
+    Thread-safe: the warm-up builds the agent in a worker thread, and
+    concurrent first callers wait for that one build.
+
     Returns:
         Agent instance
     """
     global _agent
     if _agent is None:
-        _agent = create_agent_graph()
+        with _agent_lock:
+            if _agent is None:
+                _agent = create_agent_graph()
     return _agent
 
 
+async def aget_agent():
+    """Get the agent without blocking the event loop while it is being built."""
+    if _agent is not None:
+        return _agent
+    return await asyncio.to_thread(get_agent)
+
+
 class AgentRequest(BaseModel):
     """Request model for agent invocation."""
 
@@ -44,7 +115,78 @@ class AgentResponse(BaseModel):
     """Response model for agent invocation."""
 
     response: str
-    session_id: str
+    session_id: Optional[str] = None
+
+
+async def run_agent(agent, message: str, session_id: str) -> str:
+    """Run the agent on one message and return the final response text."""
+    # Use official recommended invoke way
+    result = await agent.ainvoke(
+        {"messages": [{"role": "user", "content": message}]},
+        config={"configurable": {"thread_id": session_id}},
+    )
+
+    # Get the last message content
+    messages = result.get("messages", [])
+    if not messages:
+        raise ValueError("No messages in response")
+
+    # Extract content from message
+    return message_content(messages[-1])
+
+
+async def run_stateless(agent, message: str) -> str:
+    """Run the agent on a fresh thread that is deleted afterwards.
+
+    The answer depends only on the message (no shared history), so identical
+    concurrent requests can share the run.
+    """
+    thread_id = f"stateless-{uuid.uuid4().hex}"
+    try:
+        async with agent_slot(thread_id):
+            return await run_agent(agent, message, thread_id)
+    finally:
+        checkpointer = getattr(agent, "checkpointer", None)
+        if isinstance(checkpointer, BaseCheckpointSaver):
+            await checkpointer.adelete_thread(thread_id)
+
+
+# Coalesces identical concurrent stateless requests on routes that opt in
+invoke_flight = SingleFlight()
+
+# Turns of one session run in order; all agent runs share a bounded number of slots
+session_locks = KeyedLock(max_pending=settings.AGENT_SESSION_MAX_PENDING)
+admission = AdmissionController(
+    max_concurrency=settings.AGENT_MAX_CONCURRENCY,
+    max_queue=settings.AGENT_MAX_QUEUE,
+    queue_timeout=settings.AGENT_QUEUE_TIMEOUT,
+)
+
+
+@asynccontextmanager
+async def agent_slot(session_id: str):
+    """Serialize turns of a session, then wait for a global execution slot.
+
+    Args:
+        session_id: Effective thread ID of the run (including the shared "default" thread)
+
+    Raises:
+        AdmissionRejected: If the session or the server is saturated
+    """
+    async with AsyncExitStack() as stack:
+        await stack.enter_async_context(session_locks.hold(session_id))
+        await stack.enter_async_context(admission.admit())
+        yield
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Reply 429 with a Retry-After hint when the agent is saturated."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 @app.get("/")
@@ -61,7 +203,41 @@ async def root():
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    checkpointer = await check_checkpointer()
+    if not checkpointer["ok"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "checkpointer": checkpointer},
+        )
+    return {"status": "healthy", "checkpointer": checkpointer}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the startup warm-up has finished."""
+    stats = warmup.get_stats()
+    if not warmup.ready:
+        return JSONResponse(status_code=503, content=stats)
+    return stats
+
+
+@app.get("/metrics")
+async def metrics():
+    """Cache and performance counters."""
+    llm_cache = get_llm_cache()
+    query_cache = get_query_cache()
+    tool_cache = get_tool_cache()
+    return {
+        "llm_cache": llm_cache.get_stats() if llm_cache is not None else None,
+        "query_cache": query_cache.get_stats() if query_cache is not None else None,
+        "invoke_coalescing": invoke_flight.get_stats(),
+        "admission": {**admission.get_stats(), "sessions": len(session_locks)},
+        "checkpointer": get_checkpointer_stats(),
+        "tools": get_tool_executor().get_stats(),
+        "tool_cache": tool_cache.get_stats() if tool_cache is not None else None,
+        "tool_pools": get_tool_pools().get_stats(),
+        "warmup": warmup.get_stats(),
+    }
 
 
 @app.post("/agent/invoke", response_model=AgentResponse)
@@ -72,38 +248,98 @@ async def invoke_agent(request: AgentRequest):
     which automatically handles tool calling and state management.
     """
     try:
-        agent = get_agent()
-        session_id = request.session_id or "default"
+        agent = await aget_agent()
 
-        # Use official recommended invoke way
-        result = await agent.ainvoke(
-            {"messages": [{"role": "user", "content": request.message}]},
-            config={"configurable": {"thread_id": session_id}},
-        )
+        # Opt-in: requests without a session run statelessly (not on the shared
+        # "default" thread), and identical concurrent ones share one graph execution
+        if settings.AGENT_COALESCE_REQUESTS and request.session_id is None:
+            response_text = await invoke_flight.do(
+                normalize_input(request.message),
+                lambda: run_stateless(agent, request.message),
+            )
+            return AgentResponse(response=response_text)
 
-        # Get the last message content
-        messages = result.get("messages", [])
-        if not messages:
-            raise ValueError("No messages in response")
-        
-        last_message = messages[-1]
-        
-        # Extract content from message
-        if hasattr(last_message, "content"):
-            response_text = last_message.content
-        elif isinstance(last_message, dict):
-            response_text = last_message.get("content", str(last_message))
-        else:
-            response_text = str(last_message)
+        session_id = request.session_id or "default"
+        async with agent_slot(session_id):
+            response_text = await run_agent(agent, request.message, session_id)
 
         return AgentResponse(
             response=response_text,
             session_id=session_id,
         )
+    except AdmissionRejected:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/agent/stream")
+async def stream_agent(request: AgentRequest):
+    """Invoke the agent and stream its output as Server-Sent Events.
+
+    Emits ``start``, ``token``, ``tool_start``, ``tool_end`` and ``final``
+    events (or ``error``) as they are produced by the graph.
+    """
+    try:
+        agent = await aget_agent()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Reject with 429 up front when saturated; the slot itself is taken inside
+    # the stream so it is always released with it
+    admission.check()
+    session_id = request.session_id or "default"
+
+    async def event_stream():
+        try:
+            async with agent_slot(session_id):
+                async for event in stream_agent_events(agent, request.message, session_id):
+                    yield format_sse(event["event"], event["data"])
+        except AdmissionRejected as e:
+            yield format_sse("error", {"detail": e.reason, "retry_after": e.retry_after})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Disable proxy buffering (e.g. nginx) so tokens are flushed immediately
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@app.websocket("/agent/ws")
+async def agent_websocket(websocket: WebSocket):
+    """WebSocket variant of the streaming endpoint.
+
+    Each received JSON message (``{"message": ..., "session_id": ...}``) starts
+    an agent run whose events are sent back as JSON objects.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            payload = await websocket.receive_json()
+            try:
+                request = AgentRequest(**payload)
+                agent = await aget_agent()
+            except Exception as e:
+                await websocket.send_json({"event": "error", "data": {"detail": str(e)}})
+                continue
+
+            session_id = request.session_id or "default"
+            try:
+                async with agent_slot(session_id):
+                    async for event in stream_agent_events(agent, request.message, session_id):
+                        await websocket.send_text(json.dumps(event, ensure_ascii=False, default=str))
+            except AdmissionRejected as e:
+                await websocket.send_json(
+                    {"event": "error", "data": {"detail": e.reason, "retry_after": e.retry_after}}
+                )
+    except WebSocketDisconnect:
+        pass
+
+
 if __name__ == "__main__":
     import uvicorn
 
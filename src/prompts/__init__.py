@@ -1,6 +1,5 @@
 """Prompts module - Prompt management and templating."""
 
-from src.prompts.loader import load_prompt, render_prompt
-
-__all__ = ["load_prompt", "render_prompt"]
+from src.prompts.loader import load_prompt, render_prompt, preload_prompts, clear_prompt_cache
 
+__all__ = ["load_prompt", "render_prompt", "preload_prompts", "clear_prompt_cache"]
@@ -1,10 +1,12 @@
 """Prompt loading and rendering utilities."""
 
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
 import yaml
 from jinja2 import Environment, FileSystemLoader, Template
 
+from src.config import settings
+
 
 # Get prompts directory
 PROMPTS_DIR = Path(__file__).parent / "templates"
@@ -17,65 +19,155 @@ jinja_env = Environment(
     lstrip_blocks=True,
 )
 
+TEMPLATE_EXTENSIONS = [".yaml", ".yml", ".txt", ".jinja2", ".j2"]
 
-def load_prompt(template_name: str, format: str = "auto") -> str:
-    """Load a prompt template from file.
-    
-    Args:
-        template_name: Name of the template file (without extension)
-        format: File format ('yaml', 'txt', 'jinja2', or 'auto' to detect)
-        
-    Returns:
-        Raw template content as string
-    """
+# Re-check template file mtimes on every render (picks up edits without a restart)
+auto_reload: bool = settings.ENVIRONMENT == "development"
+
+
+class CompiledPrompt(NamedTuple):
+    """A loaded and compiled prompt template."""
+
+    path: Path
+    mtime_ns: int
+    content: str
+    template: Template
+    variables: Dict[str, Any]
+
+
+# Compiled templates keyed by (template_name, format)
+_prompt_cache: Dict[Tuple[str, str], CompiledPrompt] = {}
+
+
+def _resolve_path(template_name: str, format: str) -> Path:
+    """Find the template file for a name and format."""
     # Try different extensions if auto
     if format == "auto":
-        extensions = [".yaml", ".yml", ".txt", ".jinja2", ".j2"]
+        extensions = TEMPLATE_EXTENSIONS
     else:
         extensions = [f".{format}"]
 
     for ext in extensions:
         template_path = PROMPTS_DIR / f"{template_name}{ext}"
         if template_path.exists():
-            return template_path.read_text(encoding="utf-8")
+            return template_path
+
+    # Allow names that already carry their extension (e.g. "system_prompt.yaml")
+    template_path = PROMPTS_DIR / template_name
+    if template_path.suffix in TEMPLATE_EXTENSIONS and template_path.exists():
+        return template_path
 
     raise FileNotFoundError(f"Prompt template '{template_name}' not found in {PROMPTS_DIR}")
 
 
+def _compile(path: Path) -> CompiledPrompt:
+    """Read and compile a template file."""
+    mtime_ns = path.stat().st_mtime_ns
+    content = path.read_text(encoding="utf-8")
+    source = content
+    variables: Dict[str, Any] = {}
+
+    # If YAML, parse it first
+    if path.suffix in (".yaml", ".yml"):
+        data = yaml.safe_load(content)
+        # If it's a structured YAML with a 'prompt' key, extract it
+        if isinstance(data, dict) and "prompt" in data:
+            source = data["prompt"]
+            variables = data.get("variables") or {}
+
+    return CompiledPrompt(path, mtime_ns, content, jinja_env.from_string(source), variables)
+
+
+def get_compiled_prompt(template_name: str, format: str = "auto") -> CompiledPrompt:
+    """Get a compiled template from the cache, loading it on first use.
+
+    When ``auto_reload`` is enabled, a cached entry is recompiled if its file
+    changed on disk.
+
+    Args:
+        template_name: Name of the template file (without extension)
+        format: File format ('yaml', 'txt', 'jinja2', or 'auto' to detect)
+
+    Returns:
+        Compiled prompt
+    """
+    key = (template_name, format)
+    cached = _prompt_cache.get(key)
+
+    if cached is not None:
+        if not auto_reload:
+            return cached
+        try:
+            if cached.path.stat().st_mtime_ns == cached.mtime_ns:
+                return cached
+        except FileNotFoundError:
+            pass
+
+    compiled = _compile(_resolve_path(template_name, format))
+    _prompt_cache[key] = compiled
+    return compiled
+
+
+def load_prompt(template_name: str, format: str = "auto") -> str:
+    """Load a prompt template from file.
+
+    Args:
+        template_name: Name of the template file (without extension)
+        format: File format ('yaml', 'txt', 'jinja2', or 'auto' to detect)
+
+    Returns:
+        Raw template content as string
+    """
+    return get_compiled_prompt(template_name, format=format).content
+
+
 def render_prompt(template_name: str, context: Optional[Dict[str, Any]] = None, format: str = "auto") -> str:
     """Load and render a prompt template with context.
-    
+
     Args:
         template_name: Name of the template file
         context: Variables to inject into the template
         format: File format ('yaml', 'txt', 'jinja2', or 'auto')
-        
+
     Returns:
         Rendered prompt string
     """
-    content = load_prompt(template_name, format=format)
-    context = context or {}
+    compiled = get_compiled_prompt(template_name, format=format)
+    # Merge YAML metadata into context
+    return compiled.template.render(**{**compiled.variables, **(context or {})})
 
-    # If YAML, parse it first
-    if template_name.endswith((".yaml", ".yml")):
-        data = yaml.safe_load(content)
-        # If it's a structured YAML with a 'prompt' key, extract it
-        if isinstance(data, dict) and "prompt" in data:
-            content = data["prompt"]
-            # Merge YAML metadata into context
-            context = {**data.get("variables", {}), **context}
 
-    # Render with Jinja2
-    template = Template(content)
-    return template.render(**context)
+def preload_prompts(template_names: Optional[Iterable[str]] = None) -> List[str]:
+    """Compile templates ahead of time (e.g. at application startup).
+
+    Args:
+        template_names: Templates to preload (defaults to every template file)
+
+    Returns:
+        Names of the preloaded templates
+    """
+    if template_names is None:
+        template_names = sorted(
+            {path.stem for path in PROMPTS_DIR.iterdir() if path.suffix in TEMPLATE_EXTENSIONS}
+        )
+
+    names = list(template_names)
+    for name in names:
+        get_compiled_prompt(name)
+    return names
+
+
+def clear_prompt_cache() -> None:
+    """Drop all compiled templates."""
+    _prompt_cache.clear()
 
 
 def get_system_prompt(context: Optional[Dict[str, Any]] = None) -> str:
     """Get the system prompt.
-    
+
     Args:
         context: Optional context variables
-        
+
     Returns:
         Rendered system prompt
     """
@@ -84,12 +176,11 @@ def get_system_prompt(context: Optional[Dict[str, Any]] = None) -> str:
 
 def get_planner_prompt(context: Optional[Dict[str, Any]] = None) -> str:
     """Get the planner prompt.
-    
+
     Args:
         context: Optional context variables
-        
+
     Returns:
         Rendered planner prompt
     """
     return render_prompt("planner_prompt", context=context)
-
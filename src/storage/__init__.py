@@ -1,7 +1,29 @@
-"""Storage module - Memory and persistence for the agent."""
+"""Storage module - Memory and persistence for the agent.
 
-from src.storage.checkpointer import get_checkpointer
-from src.storage.memory import MemoryManager
+Exports are resolved on first access, so the checkpointer does not pull in
+the NumPy-based memory indexes.
+"""
 
-__all__ = ["get_checkpointer", "MemoryManager"]
+from importlib import import_module
+from typing import Any
 
+_EXPORTS = {
+    "get_checkpointer": "src.storage.checkpointer",
+    "open_checkpointer": "src.storage.checkpointer",
+    "close_checkpointer": "src.storage.checkpointer",
+    "CheckpointerUnavailable": "src.storage.checkpointer",
+    "MemoryManager": "src.storage.memory",
+    "MemoryStore": "src.storage.memory_store",
+    "MmapMemoryStore": "src.storage.memory_store",
+    "IVFIndex": "src.storage.ann",
+    "BM25Index": "src.storage.bm25",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
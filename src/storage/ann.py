@@ -0,0 +1,224 @@
+"""Approximate nearest-neighbour (IVF) index for memory embeddings."""
+
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.storage.vector_index import normalize, top_k_cosine
+
+
+class IVFIndex:
+    """Inverted-file index with spherical k-means centroids.
+
+    Embeddings are partitioned into ``n_lists`` clusters; a query only scores
+    the members of its ``n_probe`` nearest clusters. Raising ``n_probe`` trades
+    latency for recall (``n_probe == n_lists`` is an exact search).
+
+    The index stores only centroids and per-cluster slot lists. Vectors are
+    read from the memory store's matrix at query time, and the store's
+    validity mask filters out deleted (tombstoned) slots, so deletes need no
+    index update until compaction renumbers slots (see ``remap``).
+    """
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        min_train_size: int = 50_000,
+        kmeans_iters: int = 10,
+        sample_size: int = 100_000,
+        seed: int = 0,
+    ):
+        """Initialize IVF index.
+
+        Args:
+            n_lists: Number of clusters (defaults to ``4 * sqrt(n)`` at training)
+            n_probe: Number of clusters scanned per query (recall/latency knob)
+            min_train_size: Minimum number of embeddings before training;
+                smaller collections are better served by exact search
+            kmeans_iters: K-means iterations
+            sample_size: Maximum number of embeddings used to fit centroids
+            seed: Random seed for centroid initialization
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.kmeans_iters = kmeans_iters
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[array] = []
+        self._list_cache: List[Optional[np.ndarray]] = []
+        self._indexed_upto = 0
+        self._trained_size = 0
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether centroids have been fitted."""
+        return self.centroids is not None
+
+    def needs_training(self, vector_count: int) -> bool:
+        """Whether the index should be (re)trained for a collection size.
+
+        Retrains once the collection has grown 4x since the last training, so
+        cluster sizes stay balanced as memories accumulate.
+        """
+        if vector_count < self.min_train_size:
+            return False
+        return not self.is_trained or vector_count > 4 * self._trained_size
+
+    def reset(self) -> None:
+        """Drop centroids and lists; the next ``train`` rebuilds the index."""
+        self.centroids = None
+        self._lists = []
+        self._list_cache = []
+        self._indexed_upto = 0
+        self._trained_size = 0
+
+    def _assign(self, data: np.ndarray, chunk_size: int = 16384) -> np.ndarray:
+        """Nearest-centroid assignment, computed in chunks to bound memory."""
+        assign = np.empty(data.shape[0], dtype=np.int64)
+        for start in range(0, data.shape[0], chunk_size):
+            chunk = np.asarray(data[start:start + chunk_size])
+            assign[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assign
+
+    def train(self, matrix: np.ndarray, valid: np.ndarray) -> None:
+        """Fit centroids on the valid rows of a matrix and index all of them.
+
+        Args:
+            matrix: (n, dim) matrix of normalized embeddings (row = slot)
+            valid: (n,) mask of rows holding a live embedding
+        """
+        slots = np.flatnonzero(valid)
+        if slots.size == 0:
+            return
+
+        n_lists = self.n_lists or max(1, int(4 * np.sqrt(slots.size)))
+        n_lists = min(n_lists, slots.size)
+        sample = slots
+        if sample.size > self.sample_size:
+            sample = np.sort(self._rng.choice(slots, self.sample_size, replace=False))
+        data = np.asarray(matrix[sample], dtype=np.float32)
+
+        self.centroids = data[self._rng.choice(data.shape[0], n_lists, replace=False)].copy()
+        for _ in range(self.kmeans_iters):
+            assign = self._assign(data)
+            order = np.argsort(assign, kind="stable")
+            counts = np.bincount(assign, minlength=n_lists)
+            sums = np.zeros_like(self.centroids)
+            nonempty = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+            sums[nonempty] = np.add.reduceat(data[order], starts, axis=0)
+
+            # Re-seed empty clusters with random points
+            empty = np.flatnonzero(counts == 0)
+            if empty.size:
+                sums[empty] = data[self._rng.choice(data.shape[0], empty.size, replace=False)]
+
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self.centroids = (sums / norms).astype(np.float32)
+
+        self._lists = [array("q") for _ in range(n_lists)]
+        self._list_cache = [None] * n_lists
+        self._indexed_upto = 0
+        self._trained_size = int(slots.size)
+        self.sync(matrix, valid)
+
+    def sync(self, matrix: np.ndarray, valid: np.ndarray) -> None:
+        """Index rows appended since the last call (incremental insert).
+
+        Args:
+            matrix: (n, dim) matrix of normalized embeddings (row = slot)
+            valid: (n,) mask of rows holding a live embedding
+        """
+        if not self.is_trained or matrix.shape[0] <= self._indexed_upto:
+            return
+
+        start = self._indexed_upto
+        slots = start + np.flatnonzero(valid[start:])
+        if slots.size:
+            for slot, cluster in zip(slots.tolist(), self._assign(matrix[slots]).tolist()):
+                self._lists[cluster].append(slot)
+                self._list_cache[cluster] = None
+        self._indexed_upto = matrix.shape[0]
+
+    def _list_array(self, cluster: int) -> np.ndarray:
+        """Slot list of a cluster as a (cached) NumPy array."""
+        cached = self._list_cache[cluster]
+        if cached is None:
+            cached = np.array(self._lists[cluster], dtype=np.int64)
+            self._list_cache[cluster] = cached
+        return cached
+
+    def search(
+        self,
+        query: Sequence[float],
+        matrix: np.ndarray,
+        valid: np.ndarray,
+        limit: int = 5,
+        threshold: Optional[float] = None,
+        n_probe: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """Approximate cosine top-k.
+
+        Args:
+            query: Query embedding
+            matrix: (n, dim) matrix of normalized embeddings (row = slot)
+            valid: (n,) mask of rows holding a live embedding
+            limit: Maximum number of results
+            threshold: Minimum cosine similarity (inclusive)
+            n_probe: Per-query override of ``self.n_probe``
+
+        Returns:
+            List of (slot, score) tuples sorted by descending score
+        """
+        if not self.is_trained or limit <= 0:
+            return []
+
+        q = normalize(query)
+        n_lists = self.centroids.shape[0]
+        n_probe = min(n_probe or self.n_probe, n_lists)
+
+        centroid_scores = self.centroids @ q
+        if n_probe < n_lists:
+            probe = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+        else:
+            probe = np.arange(n_lists)
+
+        candidates = np.concatenate([self._list_array(int(c)) for c in probe])
+        candidates = candidates[valid[candidates]]
+        if candidates.size == 0:
+            return []
+
+        hits = top_k_cosine(
+            np.asarray(matrix[candidates]),
+            np.ones(candidates.size, dtype=bool),
+            q,
+            limit,
+            threshold,
+        )
+        return [(int(candidates[row]), score) for row, score in hits]
+
+    def remap(self, keep: Sequence[int]) -> None:
+        """Renumber indexed slots after the store was compacted.
+
+        Args:
+            keep: Old slots kept by compaction; ``keep[i]`` became slot ``i``
+        """
+        if not self.is_trained:
+            return
+
+        keep_arr = np.asarray(keep, dtype=np.int64)
+        new_slot = np.full(max(self._indexed_upto, 1), -1, dtype=np.int64)
+        in_range = keep_arr < self._indexed_upto
+        new_slot[keep_arr[in_range]] = np.flatnonzero(in_range)
+
+        for cluster, members in enumerate(self._lists):
+            mapped = new_slot[np.array(members, dtype=np.int64)]
+            self._lists[cluster] = array("q", mapped[mapped >= 0].tolist())
+            self._list_cache[cluster] = None
+        self._indexed_upto = int(in_range.sum())
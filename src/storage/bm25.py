@@ -0,0 +1,199 @@
+"""BM25 inverted index for keyword search over memories."""
+
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+import math
+import re
+
+import numpy as np
+
+# CJK ideographs are indexed as character unigrams + bigrams (no word
+# segmentation needed); everything else as lowercase alphanumeric words.
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_RE = re.compile(rf"[{_CJK}]+|[^\W_{_CJK}]+")
+_CJK_RE = re.compile(rf"[{_CJK}]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split mixed Chinese/English text into index terms.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        List of terms (with repetitions)
+    """
+    terms = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        token = match.group()
+        if _CJK_RE.match(token):
+            terms.extend(token)
+            terms.extend(token[i:i + 2] for i in range(len(token) - 1))
+        else:
+            terms.append(token)
+    return terms
+
+
+class BM25Index:
+    """Incrementally maintained inverted index with Okapi BM25 scoring.
+
+    Documents are addressed by slot, appended in increasing slot order.
+    Queries only touch the postings of their own terms, so cost depends on
+    term frequency rather than corpus size. Deleted slots stay in postings
+    (masked at query time) until ``remap`` rebuilds them after compaction.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """Initialize BM25 index.
+
+        Args:
+            k1: Term-frequency saturation parameter
+            b: Document-length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._posting_cache: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._df: Dict[str, int] = {}
+        self._doc_len = array("I")
+        self._alive = bytearray()
+        self._doc_count = 0
+        self._total_len = 0
+
+    @property
+    def indexed_upto(self) -> int:
+        """Number of slots indexed so far (including deleted ones)."""
+        return len(self._doc_len)
+
+    def __len__(self) -> int:
+        """Number of live documents."""
+        return self._doc_count
+
+    def add(self, slot: int, text: str) -> None:
+        """Index a document.
+
+        Args:
+            slot: Document slot (must not be lower than ``indexed_upto``)
+            text: Document text
+        """
+        # Slots without a document (e.g. deleted before indexing) get length 0
+        while len(self._doc_len) < slot:
+            self._doc_len.append(0)
+            self._alive.append(0)
+
+        counts: Dict[str, int] = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("q"), array("I"))
+            postings[0].append(slot)
+            postings[1].append(tf)
+            self._posting_cache.pop(term, None)
+            self._df[term] = self._df.get(term, 0) + 1
+
+        length = sum(counts.values())
+        self._doc_len.append(length)
+        self._alive.append(1)
+        self._doc_count += 1
+        self._total_len += length
+
+    def delete(self, slot: int, text: str) -> None:
+        """Remove a document from scoring statistics and results.
+
+        Args:
+            slot: Document slot
+            text: Document text (needed to update document frequencies)
+        """
+        if slot >= len(self._alive) or not self._alive[slot]:
+            return
+        self._alive[slot] = 0
+        self._doc_count -= 1
+        self._total_len -= self._doc_len[slot]
+        for term in set(tokenize(text)):
+            if term in self._df:
+                self._df[term] -= 1
+
+    def _posting_arrays(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Postings of a term as (cached) NumPy arrays."""
+        cached = self._posting_cache.get(term)
+        if cached is None:
+            postings = self._postings.get(term)
+            if postings is None:
+                return None
+            cached = (np.array(postings[0], dtype=np.int64), np.array(postings[1], dtype=np.float32))
+            self._posting_cache[term] = cached
+        return cached
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """Rank documents against a keyword query.
+
+        Args:
+            query: Query text
+            limit: Maximum number of results
+
+        Returns:
+            List of (slot, score) tuples sorted by descending score
+        """
+        if not self._doc_count or limit <= 0:
+            return []
+
+        avg_len = self._total_len / self._doc_count or 1.0
+        doc_len = np.frombuffer(self._doc_len, dtype=np.uint32) if len(self._doc_len) else None
+        alive = np.frombuffer(self._alive, dtype=np.uint8)
+
+        slot_parts = []
+        score_parts = []
+        for term in set(tokenize(query)):
+            df = self._df.get(term, 0)
+            postings = self._posting_arrays(term)
+            if not df or postings is None:
+                continue
+            slots, tf = postings
+            idf = math.log(1 + (self._doc_count - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * doc_len[slots] / avg_len)
+            slot_parts.append(slots)
+            score_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not slot_parts:
+            return []
+
+        slots = np.concatenate(slot_parts)
+        scores = np.concatenate(score_parts)
+        unique, inverse = np.unique(slots, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores)
+        totals[alive[unique] == 0] = -np.inf
+
+        k = min(limit, unique.size)
+        top = np.argpartition(-totals, k - 1)[:k] if k < unique.size else np.arange(unique.size)
+        top = top[np.argsort(-totals[top], kind="stable")]
+        return [(int(unique[i]), float(totals[i])) for i in top if totals[i] > -np.inf]
+
+    def remap(self, keep: Sequence[int]) -> None:
+        """Renumber slots after the store was compacted.
+
+        Args:
+            keep: Old slots kept by compaction; ``keep[i]`` became slot ``i``
+        """
+        keep_arr = np.asarray(keep, dtype=np.int64)
+        keep_arr = keep_arr[keep_arr < self.indexed_upto]
+        new_slot = np.full(max(self.indexed_upto, 1), -1, dtype=np.int64)
+        new_slot[keep_arr] = np.arange(keep_arr.size)
+
+        for term, (slots, tf) in list(self._postings.items()):
+            mapped = new_slot[np.array(slots, dtype=np.int64)]
+            mask = mapped >= 0
+            if not mask.any():
+                del self._postings[term]
+                self._df.pop(term, None)
+                continue
+            self._postings[term] = (
+                array("q", mapped[mask].tolist()),
+                array("I", np.array(tf, dtype=np.uint32)[mask].tolist()),
+            )
+        self._posting_cache.clear()
+
+        self._doc_len = array("I", (self._doc_len[slot] for slot in keep_arr.tolist()))
+        self._alive = bytearray(self._alive[slot] for slot in keep_arr.tolist())
@@ -0,0 +1,215 @@
+"""Generic in-process cache primitives shared by the caching layers."""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+import sys
+import threading
+import time
+
+
+class CacheStats:
+    """Hit/miss counters with saved-latency accounting.
+
+    Latency is measured on misses (time from lookup to store); every hit is
+    credited with the running average miss latency as "saved" time.
+    """
+
+    def __init__(self):
+        """Initialize counters."""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.miss_seconds = 0.0
+        self.timed_misses = 0
+        self.saved_seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def avg_miss_seconds(self) -> float:
+        """Average latency of a miss (the work a hit avoids)."""
+        return self.miss_seconds / self.timed_misses if self.timed_misses else 0.0
+
+    def record_hit(self) -> None:
+        """Count a hit and credit the average miss latency as saved time."""
+        with self._lock:
+            self.hits += 1
+            self.saved_seconds += self.avg_miss_seconds
+
+    def record_miss(self, seconds: Optional[float] = None) -> None:
+        """Count a miss, optionally with the latency of the work it caused."""
+        with self._lock:
+            self.misses += 1
+            if seconds is not None:
+                self.miss_seconds += seconds
+                self.timed_misses += 1
+
+    def record_miss_latency(self, seconds: float) -> None:
+        """Attach latency to a miss counted earlier."""
+        with self._lock:
+            self.miss_seconds += seconds
+            self.timed_misses += 1
+
+    def record_store(self) -> None:
+        """Count a cache write."""
+        with self._lock:
+            self.stores += 1
+
+    def record_eviction(self, count: int = 1) -> None:
+        """Count evicted entries."""
+        with self._lock:
+            self.evictions += count
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Counters as a JSON-serializable dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "avg_miss_seconds": round(self.avg_miss_seconds, 6),
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+
+def approximate_size(value: Any) -> int:
+    """Cheap recursive size estimate of a cached value in bytes."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approximate_size(k) + approximate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approximate_size(item) for item in value)
+    return size
+
+
+class LRUCache:
+    """Thread-safe LRU mapping with optional TTL and memory budget.
+
+    Entries are evicted least-recently-used first once ``max_entries`` or
+    ``max_bytes`` is exceeded; expired entries are dropped on access.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 1024,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = approximate_size,
+        stats: Optional[CacheStats] = None,
+    ):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of entries (None for unbounded)
+            ttl: Default time-to-live in seconds (None for no expiry)
+            max_bytes: Memory budget in bytes, as estimated by ``sizeof``
+            sizeof: Function estimating the size of a value
+            stats: Optional counters updated with evictions
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.stats = stats
+        self._data: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of entries (including not yet purged expired ones)."""
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a non-expired entry exists (does not refresh recency)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry is not None and (entry[1] is None or entry[1] > time.monotonic())
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated size of all entries."""
+        return self._bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and mark it most recently used.
+
+        Args:
+            key: Cache key
+            default: Value returned on miss
+
+        Returns:
+            Cached value or ``default``
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at, size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Insert or replace a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time-to-live in seconds (defaults to ``self.ttl``)
+        """
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        """Evict LRU entries until within budget (lock held)."""
+        evicted = 0
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            evicted += 1
+        if evicted and self.stats is not None:
+            self.stats.record_eviction(evicted)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a value."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[2]
+            return entry[0]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def keys(self) -> Iterator[Hashable]:
+        """Snapshot of current keys, least recently used first."""
+        with self._lock:
+            return iter(list(self._data.keys()))
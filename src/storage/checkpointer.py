@@ -1,41 +1,248 @@
-"""LangGraph checkpointer configuration for state persistence."""
+"""LangGraph checkpointer configuration for state persistence.
 
-from typing import Optional
-from langgraph.checkpoint.memory import MemorySaver
+The backend is chosen explicitly with ``CHECKPOINTER_BACKEND``:
+
+- ``memory``: in-process ``BoundedMemorySaver`` (development, tests, single-node
+  deployments), bounded by ``CHECKPOINT_MEMORY_*``
+- ``postgres``: ``AsyncPostgresSaver`` on a psycopg ``AsyncConnectionPool``
+- ``redis``: ``AsyncRedisSaver`` on a bounded ``redis.asyncio`` pool
+
+Checkpoint blobs are compressed (``CHECKPOINT_COMPRESSION``) by
+``CompressedSerializer``; together with the delta-encoded messages channel of
+the agent state (``CHECKPOINT_DELTA``), this keeps checkpoints of long threads
+small.
+
+Persistent backends are fronted by ``TieredCheckpointSaver``
+(``CHECKPOINT_CACHE``): recently active threads are served from memory and
+writes are persisted in the background, flushed on shutdown.
+
+The persistent backends are async end to end, so checkpoint reads and writes
+never block the event loop. Their pools are opened once at application
+startup (``open_checkpointer``) and closed on shutdown
+(``close_checkpointer``). If a configured backend cannot be reached, startup
+fails with ``CheckpointerUnavailable`` instead of silently degrading to an
+in-memory saver that loses every conversation on restart.
+"""
+
+from typing import Any, Dict, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
 
 from src.config import settings
+from src.storage.memory_checkpointer import BoundedMemorySaver
+from src.storage.serde import CompressedSerializer
+from src.storage.tiered_checkpointer import TieredCheckpointSaver
+
+CHECKPOINTER_BACKENDS = ("memory", "postgres", "redis")
+
+_checkpointer: Optional[BaseCheckpointSaver] = None
+_pool: Any = None
+
+
+class CheckpointerUnavailable(RuntimeError):
+    """Raised when the configured checkpointer backend cannot be used."""
+
+
+def get_serde() -> Optional[CompressedSerializer]:
+    """Checkpoint serializer configured in settings (None for the saver's default)."""
+    codec = settings.CHECKPOINT_COMPRESSION.lower()
+    if codec == "none":
+        return None
+    return CompressedSerializer(codec=codec, min_size=settings.CHECKPOINT_COMPRESSION_MIN_BYTES)
+
+
+def _memory_saver() -> BoundedMemorySaver:
+    return BoundedMemorySaver(
+        max_bytes=settings.CHECKPOINT_MEMORY_MAX_BYTES,
+        max_threads=settings.CHECKPOINT_MEMORY_MAX_THREADS,
+        ttl=settings.CHECKPOINT_MEMORY_TTL,
+        keep_checkpoints=settings.CHECKPOINT_MEMORY_KEEP,
+        serde=get_serde(),
+    )
+
+
+def _backend() -> str:
+    backend = settings.CHECKPOINTER_BACKEND.lower()
+    if backend not in CHECKPOINTER_BACKENDS:
+        raise CheckpointerUnavailable(
+            f"Unknown CHECKPOINTER_BACKEND '{settings.CHECKPOINTER_BACKEND}', "
+            f"expected one of {CHECKPOINTER_BACKENDS}"
+        )
+    return backend
+
+
+async def _open_postgres() -> BaseCheckpointSaver:
+    """Open a connection pool and an ``AsyncPostgresSaver`` on it."""
+    global _pool
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError as e:
+        raise CheckpointerUnavailable(
+            "CHECKPOINTER_BACKEND=postgres requires: pip install 'hydroagent[postgres]'"
+        ) from e
+
+    # psycopg uses plain postgresql:// URLs (no SQLAlchemy driver suffix)
+    conninfo = settings.CHECKPOINTER_URL or settings.DATABASE_URL.replace("postgresql+psycopg2://", "postgresql://")
+    pool = AsyncConnectionPool(
+        conninfo=conninfo,
+        min_size=settings.CHECKPOINTER_POOL_MIN_SIZE,
+        max_size=settings.CHECKPOINTER_POOL_MAX_SIZE,
+        timeout=settings.CHECKPOINTER_POOL_TIMEOUT,
+        # Settings required by AsyncPostgresSaver
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=False,
+    )
+    try:
+        await pool.open(wait=True, timeout=settings.CHECKPOINTER_POOL_TIMEOUT)
+        saver = AsyncPostgresSaver(pool, serde=get_serde())
+        await saver.setup()
+    except Exception as e:
+        await pool.close()
+        raise CheckpointerUnavailable(f"Cannot open PostgreSQL checkpointer: {e}") from e
+
+    _pool = pool
+    return saver
+
+
+async def _open_redis() -> BaseCheckpointSaver:
+    """Open a bounded connection pool and an ``AsyncRedisSaver`` on it."""
+    global _pool
+    try:
+        from langgraph.checkpoint.redis.aio import AsyncRedisSaver
+        from redis.asyncio import BlockingConnectionPool, Redis
+    except ImportError as e:
+        raise CheckpointerUnavailable(
+            "CHECKPOINTER_BACKEND=redis requires: pip install 'hydroagent[redis]'"
+        ) from e
+
+    pool = BlockingConnectionPool.from_url(
+        settings.CHECKPOINTER_URL or settings.REDIS_URL,
+        max_connections=settings.CHECKPOINTER_POOL_MAX_SIZE,
+        timeout=settings.CHECKPOINTER_POOL_TIMEOUT,
+    )
+    client = Redis(connection_pool=pool)
+    try:
+        await client.ping()
+        saver = AsyncRedisSaver(redis_client=client)
+        await saver.asetup()
+    except Exception as e:
+        await client.aclose()
+        await pool.disconnect()
+        raise CheckpointerUnavailable(f"Cannot open Redis checkpointer: {e}") from e
 
+    _pool = client
+    return saver
+
+
+async def open_checkpointer() -> BaseCheckpointSaver:
+    """Open the configured checkpointer and its connection pool (app startup).
+
+    Returns:
+        Checkpointer instance
+
+    Raises:
+        CheckpointerUnavailable: If the backend is missing or unreachable
+    """
+    global _checkpointer
+    if _checkpointer is not None:
+        return _checkpointer
+
+    backend = _backend()
+    if backend == "memory":
+        _checkpointer = _memory_saver()
+        return _checkpointer
+
+    saver = await _open_postgres() if backend == "postgres" else await _open_redis()
+    if settings.CHECKPOINT_CACHE:
+        saver = TieredCheckpointSaver(
+            saver,
+            max_threads=settings.CHECKPOINT_CACHE_MAX_THREADS,
+            max_checkpoints=settings.CHECKPOINT_CACHE_MAX_CHECKPOINTS,
+            ttl=settings.CHECKPOINT_CACHE_TTL,
+            write_behind=settings.CHECKPOINT_WRITE_BEHIND,
+            max_pending=settings.CHECKPOINT_WRITE_QUEUE,
+        )
+    _checkpointer = saver
+    return _checkpointer
+
+
+def get_checkpointer() -> BaseCheckpointSaver:
+    """Get the configured checkpointer.
+
+    The in-memory backend is created on demand; persistent backends must have
+    been opened with ``open_checkpointer()`` first.
 
-def get_checkpointer():
-    """Get the appropriate checkpointer based on configuration.
-    
     Returns:
-        Checkpointer instance (PostgresSaver, RedisSaver, or MemorySaver)
+        Checkpointer instance (AsyncPostgresSaver or AsyncRedisSaver, possibly behind
+        TieredCheckpointSaver, or BoundedMemorySaver)
+
+    Raises:
+        CheckpointerUnavailable: If a persistent backend has not been opened
     """
-    # Try PostgreSQL first
-    if settings.DATABASE_URL and "postgresql" in settings.DATABASE_URL.lower():
-        try:
-            from langgraph.checkpoint.postgres import PostgresSaver
-            return PostgresSaver.from_conn_string(settings.DATABASE_URL)
-        except ImportError:
-            # Package not installed, fall through
-            pass
-        except Exception:
-            # Connection failed, fall through
-            pass
-
-    # Try Redis
-    if settings.REDIS_URL and "redis" in settings.REDIS_URL.lower():
-        try:
-            from langgraph.checkpoint.redis import RedisSaver
-            return RedisSaver.from_conn_string(settings.REDIS_URL)
-        except ImportError:
-            # Package not installed, fall through
-            pass
-        except Exception:
-            # Connection failed, fall through
-            pass
-
-    # Default to in-memory (for development)
-    return MemorySaver()
+    global _checkpointer
+    if _checkpointer is not None:
+        return _checkpointer
+
+    backend = _backend()
+    if backend != "memory":
+        raise CheckpointerUnavailable(
+            f"The {backend} checkpointer is not open; await open_checkpointer() at startup"
+        )
+    _checkpointer = _memory_saver()
+    return _checkpointer
+
+
+async def check_checkpointer() -> Dict[str, Any]:
+    """Health check: round-trip to the checkpoint store.
+
+    Returns:
+        Dictionary with ``backend``, ``ok`` and (on failure) ``error``, plus
+        pool statistics for PostgreSQL
+    """
+    backend = settings.CHECKPOINTER_BACKEND.lower()
+    status: Dict[str, Any] = {"backend": backend, "ok": True}
+    if _checkpointer is None:
+        if backend != "memory":
+            status.update(ok=False, error="not open")
+        return status
+
+    try:
+        if backend == "postgres":
+            async with _pool.connection(timeout=settings.CHECKPOINTER_POOL_TIMEOUT) as conn:
+                await conn.execute("SELECT 1")
+            status["pool"] = _pool.get_stats()
+        elif backend == "redis":
+            await _pool.ping()
+    except Exception as e:
+        status.update(ok=False, error=str(e))
+    return status
+
+
+def get_checkpointer_stats() -> Dict[str, Any]:
+    """Checkpointer counters for the metrics endpoint."""
+    stats: Dict[str, Any] = {"backend": settings.CHECKPOINTER_BACKEND.lower()}
+    serde = getattr(_checkpointer, "serde", None)
+    if isinstance(serde, CompressedSerializer):
+        stats["serde"] = serde.get_stats()
+    if isinstance(_checkpointer, TieredCheckpointSaver):
+        stats["cache"] = _checkpointer.get_stats()
+    elif isinstance(_checkpointer, BoundedMemorySaver):
+        stats["memory"] = _checkpointer.get_stats()
+    return stats
+
 
+async def close_checkpointer() -> None:
+    """Flush pending writes and close the checkpointer's connection pool (app shutdown)."""
+    global _checkpointer, _pool
+    saver, pool, _pool, _checkpointer = _checkpointer, _pool, None, None
+    if isinstance(saver, TieredCheckpointSaver):
+        await saver.aclose()
+    if pool is None:
+        return
+    if hasattr(pool, "aclose"):
+        # redis.asyncio client: also disconnects its pool
+        await pool.aclose(close_connection_pool=True)
+    else:
+        await pool.close()
@@ -0,0 +1,398 @@
+"""Response cache for chat models, with exact and semantic lookup.
+
+The caches implement LangChain's ``BaseCache`` and are passed to the chat
+model as ``cache=...``, so every ``ainvoke`` of the model (including those made
+by the ``create_agent`` graph) checks the cache before calling the provider.
+
+Exact mode keys on the normalized message history plus the model
+configuration string LangChain provides (model name, parameters and bound
+tool schemas). Message IDs, tool call IDs, provider metadata and whitespace
+differences are ignored. Semantic mode additionally matches a new user
+question against earlier ones by embedding similarity, provided everything
+before the question is identical.
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from src.config import settings
+from src.storage.cache import CacheStats, LRUCache
+
+if TYPE_CHECKING:
+    from src.storage.vector_index import VectorIndex
+
+
+def _normalize_text(value: Any) -> Any:
+    """Collapse whitespace in strings (recursively for content blocks)."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_normalize_text(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _normalize_text(v) for k, v in value.items() if k != "id"}
+    return value
+
+
+def normalize_messages(prompt: str) -> List[Dict[str, Any]]:
+    """Reduce a serialized message list to the parts that affect the answer.
+
+    Args:
+        prompt: Message list serialized by LangChain (``dumps(messages)``)
+
+    Returns:
+        List of ``{"type", "content", "name", "tool_calls"}`` dictionaries
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return [{"type": "raw", "content": _normalize_text(prompt)}]
+    if not isinstance(messages, list):
+        messages = [messages]
+
+    normalized = []
+    for message in messages:
+        kwargs = message.get("kwargs", message) if isinstance(message, dict) else {"content": message}
+        normalized.append({
+            "type": kwargs.get("type"),
+            "content": _normalize_text(kwargs.get("content", "")),
+            "name": kwargs.get("name"),
+            "tool_calls": [
+                {"name": call.get("name"), "args": call.get("args")}
+                for call in kwargs.get("tool_calls") or []
+            ],
+        })
+    return normalized
+
+
+def _digest(*parts: Any) -> str:
+    """Stable hash of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache(BaseCache):
+    """Base chat-model cache: key normalization, semantic index and stats.
+
+    Subclasses provide storage through ``_get``/``_set``/``_clear`` (and the
+    async variants when they have a native async client).
+    """
+
+    def __init__(
+        self,
+        embeddings: Optional[Any] = None,
+        semantic_threshold: float = 0.95,
+        semantic_max_entries: int = 10_000,
+    ):
+        """Initialize cache.
+
+        Args:
+            embeddings: Optional LangChain ``Embeddings``; enables semantic mode
+            semantic_threshold: Minimum cosine similarity for a semantic hit
+            semantic_max_entries: Maximum questions kept in the semantic index
+        """
+        self.embeddings = embeddings
+        self.semantic_threshold = semantic_threshold
+        self.semantic_max_entries = semantic_max_entries
+        self.stats = CacheStats()
+        self.semantic_hits = 0
+        self.saved_tokens = 0
+
+        # Lookup time (and question embedding) of misses awaiting their update
+        self._pending = LRUCache(max_entries=4096, ttl=600)
+        # Semantic index: bucket (history + config) -> (index, exact key per row)
+        self._semantic: Dict[str, Tuple["VectorIndex", List[str]]] = {}
+        self._semantic_count = 0
+        self._lock = threading.Lock()
+
+    # -- storage hooks ---------------------------------------------------
+
+    def _get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        raise NotImplementedError
+
+    def _clear(self) -> None:
+        raise NotImplementedError
+
+    async def _aget(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        return self._get(key)
+
+    async def _aset(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._set(key, value)
+
+    # -- keys ------------------------------------------------------------
+
+    def _keys(self, prompt: str, llm_string: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """Exact key, semantic bucket and question text for a prompt."""
+        messages = normalize_messages(prompt)
+        key = _digest(llm_string, messages)
+
+        if self.embeddings is None or not messages or messages[-1]["type"] != "human":
+            return key, None, None
+        question = messages[-1]["content"]
+        if not isinstance(question, str) or not question:
+            return key, None, None
+        return key, _digest(llm_string, messages[:-1]), question
+
+    def _semantic_match(self, bucket: str, embedding: List[float]) -> Optional[str]:
+        """Exact key of the most similar earlier question in a bucket."""
+        with self._lock:
+            entry = self._semantic.get(bucket)
+            if entry is None:
+                return None
+            index, keys = entry
+            hits = index.search(embedding, limit=1, threshold=self.semantic_threshold)
+            return keys[hits[0][0]] if hits else None
+
+    def _semantic_add(self, bucket: str, embedding: List[float], key: str) -> None:
+        """Remember a question for semantic lookup."""
+        with self._lock:
+            if self._semantic_count >= self.semantic_max_entries:
+                # Crude bound: start over rather than track per-entry recency
+                self._semantic.clear()
+                self._semantic_count = 0
+            entry = self._semantic.get(bucket)
+            if entry is None:
+                # NumPy is loaded only when the semantic cache is used
+                from src.storage.vector_index import VectorIndex
+
+                entry = self._semantic[bucket] = (VectorIndex(initial_capacity=16), [])
+            index, keys = entry
+            index.add(embedding)
+            keys.append(key)
+            self._semantic_count += 1
+
+    def _record_hit(self, value: RETURN_VAL_TYPE, semantic: bool = False) -> None:
+        """Count a hit and the tokens it saved."""
+        self.stats.record_hit()
+        if semantic:
+            self.semantic_hits += 1
+        for generation in value:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                self.saved_tokens += usage.get("total_tokens", 0)
+
+    # -- BaseCache -------------------------------------------------------
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up a cached response."""
+        key, bucket, question = self._keys(prompt, llm_string)
+        value = self._get(key)
+        if value is not None:
+            self._record_hit(value)
+            return value
+
+        embedding = None
+        if bucket is not None:
+            embedding = self.embeddings.embed_query(question)
+            match = self._semantic_match(bucket, embedding)
+            value = self._get(match) if match else None
+            if value is not None:
+                self._record_hit(value, semantic=True)
+                return value
+
+        self.stats.record_miss()
+        self._pending.set(key, (time.monotonic(), bucket, embedding))
+        return None
+
+    async def alookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Async look up a cached response."""
+        key, bucket, question = self._keys(prompt, llm_string)
+        value = await self._aget(key)
+        if value is not None:
+            self._record_hit(value)
+            return value
+
+        embedding = None
+        if bucket is not None:
+            embedding = await self.embeddings.aembed_query(question)
+            match = self._semantic_match(bucket, embedding)
+            value = await self._aget(match) if match else None
+            if value is not None:
+                self._record_hit(value, semantic=True)
+                return value
+
+        self.stats.record_miss()
+        self._pending.set(key, (time.monotonic(), bucket, embedding))
+        return None
+
+    def _after_update(self, key: str) -> None:
+        """Account miss latency and index the question semantically."""
+        self.stats.record_store()
+        pending = self._pending.pop(key)
+        if pending is None:
+            return
+        started, bucket, embedding = pending
+        self.stats.record_miss_latency(time.monotonic() - started)
+        if bucket is not None and embedding is not None:
+            self._semantic_add(bucket, embedding, key)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Store a response."""
+        key = _digest(llm_string, normalize_messages(prompt))
+        self._set(key, return_val)
+        self._after_update(key)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        """Async store a response."""
+        key = _digest(llm_string, normalize_messages(prompt))
+        await self._aset(key, return_val)
+        self._after_update(key)
+
+    def clear(self, **kwargs: Any) -> None:
+        """Drop all cached responses."""
+        self._clear()
+        with self._lock:
+            self._semantic.clear()
+            self._semantic_count = 0
+
+    async def aclear(self, **kwargs: Any) -> None:
+        """Async drop all cached responses."""
+        self.clear(**kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, saved provider time and tokens."""
+        return {
+            **self.stats.as_dict(),
+            "semantic_hits": self.semantic_hits,
+            "saved_tokens": self.saved_tokens,
+        }
+
+
+class InMemoryLLMCache(LLMCache):
+    """In-process LRU response cache with TTL."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = 3600, **kwargs: Any):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached responses
+            ttl: Time-to-live in seconds (None for no expiry)
+            **kwargs: Semantic options (see ``LLMCache``)
+        """
+        super().__init__(**kwargs)
+        self._data = LRUCache(max_entries=max_entries, ttl=ttl, stats=self.stats)
+
+    def _get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        return self._data.get(key)
+
+    def _set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._data.set(key, value)
+
+    def _clear(self) -> None:
+        self._data.clear()
+
+
+class RedisLLMCache(LLMCache):
+    """Response cache shared across workers through Redis.
+
+    Entries expire after ``ttl``; LRU eviction is delegated to the Redis
+    server (configure ``maxmemory`` with ``maxmemory-policy allkeys-lru``).
+    The semantic index, if enabled, is kept per process and resolves to
+    exact keys stored in Redis.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl: Optional[float] = 3600,
+        prefix: str = "hydroagent:llm:",
+        **kwargs: Any,
+    ):
+        """Initialize cache.
+
+        Args:
+            redis_url: Redis connection URL (defaults to ``settings.REDIS_URL``)
+            ttl: Time-to-live in seconds (None for no expiry)
+            prefix: Key prefix
+            **kwargs: Semantic options (see ``LLMCache``)
+        """
+        import redis
+        import redis.asyncio as aioredis
+
+        super().__init__(**kwargs)
+        url = redis_url or settings.REDIS_URL
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+        self._aclient = aioredis.Redis.from_url(url)
+
+    def _ex(self) -> Optional[int]:
+        return int(self.ttl) if self.ttl else None
+
+    def _get(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        raw = self._client.get(self.prefix + key)
+        return loads(raw.decode("utf-8")) if raw is not None else None
+
+    def _set(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        self._client.set(self.prefix + key, dumps(value), ex=self._ex())
+
+    async def _aget(self, key: str) -> Optional[RETURN_VAL_TYPE]:
+        raw = await self._aclient.get(self.prefix + key)
+        return loads(raw.decode("utf-8")) if raw is not None else None
+
+    async def _aset(self, key: str, value: RETURN_VAL_TYPE) -> None:
+        await self._aclient.set(self.prefix + key, dumps(value), ex=self._ex())
+
+    def _clear(self) -> None:
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get the configured chat-model response cache.
+
+    Controlled by ``LLM_CACHE_MODE`` (``off``, ``exact`` or ``semantic``) and
+    ``LLM_CACHE_BACKEND`` (``memory`` or ``redis``).
+
+    Returns:
+        Shared cache instance, or None if caching is off
+    """
+    global _llm_cache
+    mode = settings.LLM_CACHE_MODE.lower()
+    if mode == "off":
+        return None
+    if mode not in ("exact", "semantic"):
+        raise ValueError(f"Unknown LLM_CACHE_MODE '{settings.LLM_CACHE_MODE}'")
+
+    if _llm_cache is None:
+        options: Dict[str, Any] = {}
+        if mode == "semantic":
+            options["embeddings"] = _get_cache_embeddings()
+            options["semantic_threshold"] = settings.LLM_CACHE_SEMANTIC_THRESHOLD
+
+        if settings.LLM_CACHE_BACKEND.lower() == "redis":
+            _llm_cache = RedisLLMCache(ttl=settings.LLM_CACHE_TTL, **options)
+        else:
+            _llm_cache = InMemoryLLMCache(
+                max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+                ttl=settings.LLM_CACHE_TTL,
+                **options,
+            )
+    return _llm_cache
+
+
+def _get_cache_embeddings():
+    """Embedding model used by the semantic cache."""
+    if not settings.LLM_CACHE_EMBEDDING_MODEL:
+        raise ValueError("LLM_CACHE_MODE=semantic requires LLM_CACHE_EMBEDDING_MODEL")
+
+    from langchain_openai import OpenAIEmbeddings
+
+    if settings.CSTCLOUD_API_KEY:
+        return OpenAIEmbeddings(
+            model=settings.LLM_CACHE_EMBEDDING_MODEL,
+            api_key=settings.CSTCLOUD_API_KEY,
+            base_url=settings.CSTCLOUD_BASE_URL,
+        )
+    return OpenAIEmbeddings(model=settings.LLM_CACHE_EMBEDDING_MODEL, api_key=settings.OPENAI_API_KEY)
@@ -1,22 +1,108 @@
 """Long-term memory management using RAG (Retrieval-Augmented Generation)."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
+import uuid
 
 from src.config import settings
+from src.storage.ann import IVFIndex
+from src.storage.bm25 import BM25Index
+from src.storage.memory_store import MemoryStore, MmapMemoryStore
+from src.storage.vector_index import normalize
 
 
 class MemoryManager:
-    """Manages long-term memory for the agent using vector storage and RAG."""
+    """Manages long-term memory for the agent using vector storage and RAG.
 
-    def __init__(self, vector_store: Optional[Any] = None):
+    Memories are kept column-wise in a ``MemoryStore`` (process RAM) or, when
+    ``path`` is given, a persistent ``MmapMemoryStore``. An ID -> slot index
+    gives O(1) lookup; deletes leave a tombstone, and in-memory stores are
+    compacted automatically once tombstones dominate.
+
+    Embedding search is exact by default. With an ``IVFIndex`` passed as
+    ``ann`` it becomes approximate once the collection reaches the index's
+    ``min_train_size``. Keyword search is ranked with an incrementally
+    maintained BM25 index, and ``mode="hybrid"`` fuses both scores.
+    """
+
+    SEARCH_MODES = ("auto", "vector", "keyword", "hybrid")
+
+    def __init__(
+        self,
+        vector_store: Optional[Any] = None,
+        embeddings: Optional[Any] = None,
+        path: Optional[str] = None,
+        ann: Optional[IVFIndex] = None,
+        hybrid_alpha: float = 0.5,
+        compact_ratio: float = 0.25,
+        compact_min: int = 1024,
+    ):
         """Initialize memory manager.
-        
+
         Args:
             vector_store: Optional vector store instance (e.g., Chroma, Pinecone)
+            embeddings: Optional LangChain ``Embeddings`` used to embed memories
+                and queries when no pre-computed embedding is given
+            path: Optional directory of a persistent memory-mapped store
+                (defaults to ``settings.MEMORY_STORE_PATH``; in-memory if unset)
+            ann: Optional approximate nearest-neighbour index for embedding search
+            hybrid_alpha: Weight of the embedding score in hybrid search
+                (the normalized BM25 score gets ``1 - hybrid_alpha``)
+            compact_ratio: Fraction of tombstoned slots that triggers compaction
+            compact_min: Minimum number of tombstones before compacting
         """
         self.vector_store = vector_store
-        self.memories: List[Dict[str, Any]] = []
+        self.embeddings = embeddings
+        self.ann = ann
+        self.hybrid_alpha = hybrid_alpha
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+
+        path = path or settings.MEMORY_STORE_PATH
+        self._store: Union[MemoryStore, MmapMemoryStore] = (
+            MmapMemoryStore(path) if path else MemoryStore()
+        )
+        # Rewriting a persistent store is left to explicit ``compact()`` calls
+        self._auto_compact = not path
+
+        # Search indexes keyed by slot; rebuilt if the store is compacted elsewhere
+        self._bm25 = BM25Index()
+        self._index_generation = self._store.generation
+
+    def __len__(self) -> int:
+        """Number of stored (non-deleted) memories."""
+        return len(self._store)
+
+    def _check_generation(self) -> None:
+        """Drop slot-keyed indexes if another process compacted the store."""
+        if self._store.generation != self._index_generation:
+            self._bm25 = BM25Index(k1=self._bm25.k1, b=self._bm25.b)
+            if self.ann is not None:
+                self.ann.reset()
+            self._index_generation = self._store.generation
+
+    def _prepare_bm25(self) -> None:
+        """Index memories appended since the BM25 index was last updated."""
+        self._check_generation()
+        for slot, content in self._store.iter_contents(self._bm25.indexed_upto):
+            self._bm25.add(slot, content)
+
+    def _prepare_ann(self) -> bool:
+        """Train or catch up the ANN index; return whether it can serve queries."""
+        if self.ann is None:
+            return False
+        self._check_generation()
+        matrix, valid = self._store.vectors()
+        if self.ann.needs_training(self._store.vector_count):
+            self.ann.train(matrix, valid)
+        else:
+            self.ann.sync(matrix, valid)
+        return self.ann.is_trained
+
+    @property
+    def memories(self) -> List[Dict[str, Any]]:
+        """All stored memories, materialized as dictionaries."""
+        return self.get_all_memories()
 
     async def store_memory(
         self,
@@ -25,25 +111,29 @@ class MemoryManager:
         embedding: Optional[List[float]] = None,
     ) -> str:
         """Store a memory with optional embedding.
-        
+
         Args:
             content: Memory content to store
             metadata: Optional metadata dictionary
             embedding: Optional pre-computed embedding vector
-            
+
         Returns:
             Memory ID
         """
-        memory_id = f"mem_{datetime.now().timestamp()}"
-        memory = {
-            "id": memory_id,
-            "content": content,
-            "metadata": metadata or {},
-            "timestamp": datetime.now().isoformat(),
-            "embedding": embedding,
-        }
+        if embedding is None and self.embeddings is not None:
+            embedding = (await self.embeddings.aembed_documents([content]))[0]
+
+        memory_id = f"mem_{uuid.uuid4().hex}"
+        slot = self._store.append(memory_id, content, metadata, datetime.now().timestamp(), embedding)
 
-        self.memories.append(memory)
+        # Incremental BM25 insert (a lagging index catches up on the next keyword search)
+        if self._bm25.indexed_upto == slot:
+            self._bm25.add(slot, content)
+
+        # Incremental insert into an already trained ANN index
+        if self.ann is not None and self.ann.is_trained and embedding:
+            matrix, valid = self._store.vectors()
+            self.ann.sync(matrix, valid)
 
         # Store in vector store if available
         if self.vector_store and embedding:
@@ -57,62 +147,146 @@ class MemoryManager:
         query: str,
         limit: int = 5,
         threshold: float = 0.7,
+        query_embedding: Optional[List[float]] = None,
+        mode: str = "auto",
     ) -> List[Dict[str, Any]]:
         """Search memories by similarity.
-        
+
+        Modes:
+            - ``vector``: cosine similarity over stored embeddings
+            - ``keyword``: BM25 ranking of the query terms
+            - ``hybrid``: ``hybrid_alpha * cosine + (1 - hybrid_alpha) * BM25``
+              with BM25 scores normalized to [0, 1] over the candidates
+            - ``auto``: ``vector`` if a query embedding is given (or can be
+              computed with ``embeddings``), otherwise ``keyword``
+
+        Vector and hybrid modes fall back to keyword search when no query
+        embedding or no stored embedding is available.
+
         Args:
             query: Search query
             limit: Maximum number of results
-            threshold: Similarity threshold
-            
+            threshold: Minimum cosine similarity (vector mode only)
+            query_embedding: Optional pre-computed query embedding
+            mode: Search mode (see above)
+
         Returns:
-            List of relevant memories
+            List of relevant memories, best first, each with a ``score`` key
         """
-        # Simple keyword-based search (can be enhanced with embeddings)
-        results = []
-        query_lower = query.lower()
+        if mode not in self.SEARCH_MODES:
+            raise ValueError(f"Unknown search mode '{mode}', expected one of {self.SEARCH_MODES}")
+
+        has_vectors = self._store.vector_count > 0
+        if mode != "keyword" and query_embedding is None and self.embeddings is not None and has_vectors:
+            query_embedding = await self.embeddings.aembed_query(query)
+        if mode == "auto" or query_embedding is None or not has_vectors:
+            mode = "vector" if query_embedding is not None and has_vectors else "keyword"
+
+        if mode == "vector":
+            hits = self._vector_search(query_embedding, limit, threshold)
+        elif mode == "keyword":
+            hits = self._keyword_search(query, limit)
+        else:
+            hits = self._hybrid_search(query, query_embedding, limit)
+
+        return [{**self._store.record(slot), "score": score} for slot, score in hits]
+
+    def _vector_search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        threshold: Optional[float],
+    ) -> List[Tuple[int, float]]:
+        """Embedding top-k (ANN when available, exact otherwise)."""
+        if self._prepare_ann():
+            matrix, valid = self._store.vectors()
+            return self.ann.search(query_embedding, matrix, valid, limit=limit, threshold=threshold)
+        return self._store.search(query_embedding, limit=limit, threshold=threshold)
+
+    def _keyword_search(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """BM25 top-k, skipping memories deleted by other processes."""
+        self._prepare_bm25()
+        hits = self._bm25.search(query, limit=limit)
+        return [(slot, score) for slot, score in hits if self._store.is_live(slot)]
+
+    def _hybrid_search(
+        self,
+        query: str,
+        query_embedding: List[float],
+        limit: int,
+    ) -> List[Tuple[int, float]]:
+        """Fuse embedding and BM25 scores over the union of both candidate sets."""
+        pool = max(4 * limit, 20)
+        vector_hits = dict(self._vector_search(query_embedding, pool, None))
+        keyword_hits = dict(self._keyword_search(query, pool))
 
-        for memory in self.memories:
-            content_lower = memory["content"].lower()
-            if query_lower in content_lower:
-                results.append(memory)
+        max_keyword = max(keyword_hits.values(), default=0.0) or 1.0
+        q = normalize(query_embedding)
+        fused = []
+        for slot in vector_hits.keys() | keyword_hits.keys():
+            cosine = vector_hits.get(slot)
+            if cosine is None:
+                embedding = self._store.embedding(slot)
+                cosine = float(embedding @ q) if embedding is not None else 0.0
+            score = self.hybrid_alpha * cosine + (1 - self.hybrid_alpha) * keyword_hits.get(slot, 0.0) / max_keyword
+            fused.append((slot, score))
 
-        return results[:limit]
+        fused.sort(key=lambda hit: hit[1], reverse=True)
+        return fused[:limit]
 
     async def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific memory by ID.
-        
+
         Args:
             memory_id: Memory identifier
-            
+
         Returns:
             Memory dictionary or None if not found
         """
-        for memory in self.memories:
-            if memory["id"] == memory_id:
-                return memory
-        return None
+        slot = self._store.slot_of(memory_id)
+        if slot is None:
+            return None
+        return self._store.record(slot)
 
     async def delete_memory(self, memory_id: str) -> bool:
         """Delete a memory by ID.
-        
+
         Args:
             memory_id: Memory identifier
-            
+
         Returns:
             True if deleted, False if not found
         """
-        for i, memory in enumerate(self.memories):
-            if memory["id"] == memory_id:
-                self.memories.pop(i)
-                return True
-        return False
+        slot = self._store.slot_of(memory_id)
+        if slot is None:
+            return False
+
+        if slot < self._bm25.indexed_upto:
+            self._bm25.delete(slot, self._store.content(slot))
+        self._store.delete(slot)
+
+        tombstones = self._store.tombstones
+        if (
+            self._auto_compact
+            and tombstones >= self.compact_min
+            and tombstones > self.compact_ratio * self._store.slot_count
+        ):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Drop tombstoned slots from the underlying store."""
+        if self._store.tombstones:
+            keep = self._store.compact()
+            self._bm25.remap(keep)
+            if self.ann is not None:
+                self.ann.remap(keep)
+            self._index_generation = self._store.generation
 
     def get_all_memories(self) -> List[Dict[str, Any]]:
         """Get all stored memories.
-        
+
         Returns:
             List of all memories
         """
-        return self.memories.copy()
-
+        return [self._store.record(slot) for slot in self._store.live_slots()]
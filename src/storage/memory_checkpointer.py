@@ -0,0 +1,300 @@
+"""Bounded in-memory checkpointer.
+
+LangGraph's ``MemorySaver`` keeps every checkpoint of every thread for the
+life of the process. ``BoundedMemorySaver`` is a drop-in replacement with a
+memory budget, so development servers and single-node deployments do not
+grow until they run out of memory:
+
+- ``keep_checkpoints``: only the last K checkpoints of each thread namespace
+  are retained (plus the ancestors delta channels still need, see below)
+- ``ttl``: threads idle for longer are evicted as a whole
+- ``max_threads`` / ``max_bytes``: least recently used threads are evicted
+  while either budget is exceeded
+
+Sizes are the serialized (possibly compressed) bytes of checkpoints, blobs
+and pending writes, which is what dominates the saver's footprint.
+
+Delta channels (``DeltaChannel``, see ``src.agent.state``) rebuild their
+value by walking a checkpoint's ancestors back to the last snapshot. Pruning
+therefore keeps every ancestor of a retained checkpoint until each of its
+delta channels reaches a snapshot blob, so retained state always reloads
+completely; ``CHECKPOINT_SNAPSHOT_INTERVAL`` bounds that chain.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterator, Mapping, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import MemorySaver
+
+WriteKey = Tuple[str, str, str]
+BlobKey = Tuple[str, str, str, Any]
+
+
+class _CheckpointInfo:
+    """What pruning needs to know about a stored checkpoint, without deserializing it."""
+
+    __slots__ = ("parent", "versions", "delta", "size")
+
+    def __init__(self, parent: Optional[str], versions: ChannelVersions, delta: FrozenSet[str], size: int):
+        self.parent = parent
+        self.versions = versions
+        # Delta channels not snapshotted at this checkpoint
+        self.delta = delta
+        self.size = size
+
+
+class _ThreadUsage:
+    """Stored keys and byte size of one thread."""
+
+    __slots__ = ("checkpoints", "writes", "blobs", "bytes", "last_access")
+
+    def __init__(self):
+        # checkpoint_ns -> checkpoint_id -> info
+        self.checkpoints: Dict[str, Dict[str, _CheckpointInfo]] = {}
+        self.writes: Dict[WriteKey, int] = {}
+        self.blobs: Dict[BlobKey, int] = {}
+        self.bytes = 0
+        self.last_access = time.monotonic()
+
+
+class BoundedMemorySaver(MemorySaver):
+    """``MemorySaver`` with checkpoint retention, idle TTL and an LRU memory budget."""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: Optional[int] = None,
+        max_threads: Optional[int] = None,
+        ttl: Optional[float] = None,
+        keep_checkpoints: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        """Initialize bounded saver.
+
+        Args:
+            max_bytes: Budget for serialized checkpoint data (None for no limit)
+            max_threads: Maximum number of stored threads (None for no limit)
+            ttl: Seconds a thread is kept without being read or written (None for no expiry)
+            keep_checkpoints: Checkpoints retained per thread namespace (None keeps all)
+            **kwargs: Passed to ``MemorySaver`` (e.g. ``serde``)
+        """
+        super().__init__(**kwargs)
+        if keep_checkpoints is not None and keep_checkpoints < 1:
+            raise ValueError("keep_checkpoints must be at least 1")
+        self.max_bytes = max_bytes
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self.keep_checkpoints = keep_checkpoints
+        # Least recently used thread first
+        self._threads: "OrderedDict[str, _ThreadUsage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._counters = {"expired": 0, "evicted": 0, "pruned_checkpoints": 0}
+
+    # -- bookkeeping ----------------------------------------------------------
+
+    def _usage(self, thread_id: str) -> _ThreadUsage:
+        usage = self._threads.get(thread_id)
+        if usage is None:
+            usage = self._threads[thread_id] = _ThreadUsage()
+        else:
+            self._threads.move_to_end(thread_id)
+            usage.last_access = time.monotonic()
+        return usage
+
+    def _resize(self, usage: _ThreadUsage, delta: int) -> None:
+        usage.bytes += delta
+        self._bytes += delta
+
+    def _drop_thread(self, thread_id: str) -> None:
+        usage = self._threads.pop(thread_id)
+        self.storage.pop(thread_id, None)
+        for key in usage.writes:
+            self.writes.pop(key, None)
+        for key in usage.blobs:
+            self.blobs.pop(key, None)
+        self._bytes -= usage.bytes
+
+    def _expire(self) -> None:
+        """Evict threads idle for longer than ``ttl`` (oldest first)."""
+        if self.ttl is None:
+            return
+        deadline = time.monotonic() - self.ttl
+        while self._threads:
+            thread_id, usage = next(iter(self._threads.items()))
+            if usage.last_access > deadline:
+                break
+            self._drop_thread(thread_id)
+            self._counters["expired"] += 1
+
+    def _evict(self, current: str) -> None:
+        """Evict least recently used threads until the budgets are met."""
+        while len(self._threads) > 1:
+            over_threads = self.max_threads is not None and len(self._threads) > self.max_threads
+            over_bytes = self.max_bytes is not None and self._bytes > self.max_bytes
+            if not (over_threads or over_bytes):
+                break
+            thread_id = next(iter(self._threads))
+            if thread_id == current:
+                # The thread being written is never evicted by its own write
+                break
+            self._drop_thread(thread_id)
+            self._counters["evicted"] += 1
+
+    def _blob_is_seed(self, thread_id: str, checkpoint_ns: str, channel: str, version: Any) -> bool:
+        blob = self.blobs.get((thread_id, checkpoint_ns, channel, version))
+        return blob is not None and blob[0] != "empty"
+
+    def _prune(self, thread_id: str, checkpoint_ns: str, usage: _ThreadUsage) -> None:
+        """Keep the last ``keep_checkpoints`` checkpoints and the ancestors their delta channels need."""
+        index = usage.checkpoints.get(checkpoint_ns, {})
+        if self.keep_checkpoints is None or len(index) <= self.keep_checkpoints:
+            return
+
+        keep = set(sorted(index, reverse=True)[: self.keep_checkpoints])
+        # Same walk as get_delta_channel_history: a channel is resolved at the
+        # first ancestor holding a real blob for it (or not having it at all)
+        visited: Dict[str, FrozenSet[str]] = {}
+        for checkpoint_id in sorted(keep, reverse=True):
+            needed = index[checkpoint_id].delta
+            current = index[checkpoint_id].parent
+            while needed and current in index and not needed <= visited.get(current, frozenset()):
+                visited[current] = visited.get(current, frozenset()) | needed
+                keep.add(current)
+                info = index[current]
+                needed = frozenset(
+                    channel
+                    for channel in needed
+                    if channel in info.versions
+                    and not self._blob_is_seed(thread_id, checkpoint_ns, channel, info.versions[channel])
+                )
+                current = info.parent
+
+        stored = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [c for c in index if c not in keep]:
+            info = index.pop(checkpoint_id)
+            del stored[checkpoint_id]
+            self._resize(usage, -info.size)
+            key = (thread_id, checkpoint_ns, checkpoint_id)
+            self.writes.pop(key, None)
+            self._resize(usage, -usage.writes.pop(key, 0))
+            self._counters["pruned_checkpoints"] += 1
+
+        referenced = {
+            (thread_id, checkpoint_ns, channel, version)
+            for info in index.values()
+            for channel, version in info.versions.items()
+        }
+        for key in [k for k in usage.blobs if k[1] == checkpoint_ns and k not in referenced]:
+            self.blobs.pop(key, None)
+            self._resize(usage, -usage.blobs.pop(key))
+
+    def _writes_size(self, key: WriteKey) -> int:
+        return sum(len(write[2][1]) for write in self.writes.get(key, {}).values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Current memory use and eviction counters."""
+        with self._lock:
+            return {
+                "threads": len(self._threads),
+                "checkpoints": sum(
+                    len(index) for usage in self._threads.values() for index in usage.checkpoints.values()
+                ),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_threads": self.max_threads,
+                **self._counters,
+            }
+
+    # -- MemorySaver ------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire()
+            # MemorySaver's defaultdict would otherwise store an empty entry per unknown thread
+            if thread_id not in self.storage:
+                return None
+            if thread_id in self._threads:
+                self._usage(thread_id)
+            return super().get_tuple(config)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        if config is not None and config["configurable"]["thread_id"] not in self.storage:
+            return iter(())
+        return super().list(config, filter=filter, before=before, limit=limit)
+
+    def get_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]) -> Mapping[str, Any]:
+        with self._lock:
+            return super().get_delta_channel_history(config=config, channels=channels)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        with self._lock:
+            self._expire()
+            saved_config = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = saved_config["configurable"]["thread_id"]
+            checkpoint_ns = saved_config["configurable"]["checkpoint_ns"]
+            usage = self._usage(thread_id)
+
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                self._resize(usage, len(self.blobs[key][1]) - usage.blobs.get(key, 0))
+                usage.blobs[key] = len(self.blobs[key][1])
+
+            stored, stored_metadata, parent = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            index = usage.checkpoints.setdefault(checkpoint_ns, {})
+            previous = index.get(checkpoint["id"])
+            info = _CheckpointInfo(
+                parent=parent,
+                versions=dict(checkpoint["channel_versions"]),
+                delta=frozenset(metadata.get("counters_since_delta_snapshot") or ()),
+                size=len(stored[1]) + len(stored_metadata[1]),
+            )
+            self._resize(usage, info.size - (previous.size if previous is not None else 0))
+            index[checkpoint["id"]] = info
+
+            self._prune(thread_id, checkpoint_ns, usage)
+            self._evict(thread_id)
+            return saved_config
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        key = (configurable["thread_id"], configurable.get("checkpoint_ns", ""), configurable["checkpoint_id"])
+        with self._lock:
+            self._expire()
+            super().put_writes(config, writes, task_id, task_path)
+            usage = self._usage(key[0])
+            size = self._writes_size(key)
+            self._resize(usage, size - usage.writes.get(key, 0))
+            usage.writes[key] = size
+            self._evict(key[0])
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            if thread_id in self._threads:
+                self._drop_thread(thread_id)
+            else:
+                super().delete_thread(thread_id)
@@ -0,0 +1,527 @@
+"""Storage backends for long-term memories.
+
+``MemoryStore`` keeps memories column-wise in process RAM. ``MmapMemoryStore``
+persists the same columns to disk: embeddings in an append-only file that is
+memory-mapped for search, and content/metadata in an append-only record file
+addressed through a memory-mapped offset table. Opening a store only maps the
+files, so a multi-GB store is ready in milliseconds and its pages are shared
+by every process that maps it.
+
+Both backends address memories by *slot* (insertion position). Deleting a
+memory leaves a tombstone; ``compact()`` drops tombstones and returns the kept
+slots so callers can remap anything keyed by slot.
+"""
+
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import json
+import mmap
+import os
+
+import numpy as np
+
+from src.storage.vector_index import VectorIndex, normalize, top_k_cosine
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locking, single process only
+    fcntl = None
+
+
+class MemoryStore:
+    """In-process columnar memory storage."""
+
+    def __init__(self):
+        """Initialize an empty store."""
+        # A slot with ``_ids[slot] is None`` is a tombstone
+        self._ids: List[Optional[str]] = []
+        self._contents: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict[str, Any]]] = []
+        self._timestamps = array("d")
+        self._index = VectorIndex()
+        self._slot_by_id: Dict[str, int] = {}
+        self.tombstones = 0
+        # Bumped by every compaction (slots are renumbered)
+        self.generation = 0
+
+    def __len__(self) -> int:
+        """Number of stored (non-deleted) memories."""
+        return len(self._slot_by_id)
+
+    @property
+    def slot_count(self) -> int:
+        """Number of slots, including tombstones."""
+        return len(self._ids)
+
+    @property
+    def vector_count(self) -> int:
+        """Number of searchable embeddings."""
+        return self._index.active_count
+
+    def append(
+        self,
+        memory_id: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]],
+        timestamp: float,
+        embedding: Optional[Sequence[float]] = None,
+    ) -> int:
+        """Append a memory and return its slot."""
+        slot = self._index.add(embedding if embedding is not None and len(embedding) else None)
+        self._ids.append(memory_id)
+        self._contents.append(content)
+        self._metadata.append(metadata or None)
+        self._timestamps.append(timestamp)
+        self._slot_by_id[memory_id] = slot
+        return slot
+
+    def slot_of(self, memory_id: str) -> Optional[int]:
+        """Get the slot of a memory ID, or None if unknown or deleted."""
+        return self._slot_by_id.get(memory_id)
+
+    def delete(self, slot: int) -> None:
+        """Tombstone a slot."""
+        memory_id = self._ids[slot]
+        if memory_id is None:
+            return
+        del self._slot_by_id[memory_id]
+        self._ids[slot] = None
+        self._contents[slot] = None
+        self._metadata[slot] = None
+        self._index.delete(slot)
+        self.tombstones += 1
+
+    def is_live(self, slot: int) -> bool:
+        """Whether a slot holds a non-deleted memory."""
+        return self._ids[slot] is not None
+
+    def content(self, slot: int) -> Optional[str]:
+        """Get the content of a slot (None for tombstones)."""
+        return self._contents[slot]
+
+    def embedding(self, slot: int) -> Optional[np.ndarray]:
+        """Get the normalized embedding of a slot, if any."""
+        return self._index.get(slot)
+
+    def record(self, slot: int) -> Dict[str, Any]:
+        """Materialize the memory stored in a slot as a dictionary."""
+        embedding = self._index.get(slot)
+        return {
+            "id": self._ids[slot],
+            "content": self._contents[slot],
+            "metadata": dict(self._metadata[slot] or {}),
+            "timestamp": datetime.fromtimestamp(self._timestamps[slot]).isoformat(),
+            "embedding": embedding.tolist() if embedding is not None else None,
+        }
+
+    def live_slots(self) -> List[int]:
+        """Slots of non-deleted memories, in insertion order."""
+        return [slot for slot, memory_id in enumerate(self._ids) if memory_id is not None]
+
+    def iter_contents(self, start: int = 0) -> Iterator[Tuple[int, str]]:
+        """Iterate over (slot, content) of non-deleted memories from slot ``start``."""
+        for slot in range(start, len(self._contents)):
+            content = self._contents[slot]
+            if content is not None:
+                yield slot, content
+
+    def vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Embedding matrix (row = slot) and mask of slots with a live embedding."""
+        return self._index.arrays()
+
+    def search(
+        self,
+        query: Sequence[float],
+        limit: int,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """Exact cosine top-k over stored embeddings, as (slot, score) tuples."""
+        return self._index.search(query, limit=limit, threshold=threshold)
+
+    def compact(self) -> List[int]:
+        """Drop tombstones; old slot ``keep[i]`` becomes slot ``i``.
+
+        Returns:
+            The kept (old) slots, in order
+        """
+        keep = self.live_slots()
+        self._ids = [self._ids[slot] for slot in keep]
+        self._contents = [self._contents[slot] for slot in keep]
+        self._metadata = [self._metadata[slot] for slot in keep]
+        self._timestamps = array("d", (self._timestamps[slot] for slot in keep))
+        self._index.compact(keep)
+        self._slot_by_id = {memory_id: slot for slot, memory_id in enumerate(self._ids)}
+        self.tombstones = 0
+        self.generation += 1
+        return keep
+
+
+# Per-slot flags in the mmap store
+_FLAG_DELETED = 1
+_FLAG_VECTOR = 2
+
+
+class MmapMemoryStore:
+    """Persistent, memory-mapped columnar memory storage.
+
+    Directory layout (``<gen>`` is bumped by every compaction)::
+
+        manifest.json          {"generation", "dim", "id_width"}
+        ids.<gen>.bin          fixed-width memory IDs, one per slot
+        flags.<gen>.u8         per-slot flags (deleted, has vector)
+        ends.<gen>.u64         end offset of each slot's record
+        records.<gen>.jsonl    {"content", "metadata", "timestamp"} per slot
+        vectors.<gen>.f32      normalized float32 embeddings, one row per slot
+
+    All files are append-only except ``flags`` (updated in place on delete).
+    ``ends`` is written last, so its length is the committed slot count seen
+    by readers. Appends from several processes are serialized with an
+    advisory file lock where available; readers pick up new slots through
+    ``refresh()``, which search and lookups call automatically.
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None, id_width: int = 36):
+        """Open (or create) a store directory.
+
+        Args:
+            path: Store directory
+            dim: Embedding dimension (inferred from the first embedding if None)
+            id_width: Maximum memory ID length in bytes
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.path / "manifest.json"
+        self._lock_path = self.path / "lock"
+
+        if self._manifest_path.exists():
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+        else:
+            manifest = {"generation": 0, "dim": dim, "id_width": id_width}
+            self._write_manifest(manifest)
+
+        self._generation = -1
+        self._manifest_mtime = 0.0
+        self._records: Any = b""
+        self._id_index: Optional[Dict[str, int]] = None
+        self._id_index_size = 0
+        self._open(manifest)
+
+    # -- file handling ---------------------------------------------------
+
+    def _file(self, name: str, generation: Optional[int] = None) -> Path:
+        """Path of a data file for a generation."""
+        stem, ext = name.split(".")
+        gen = self._generation if generation is None else generation
+        return self.path / f"{stem}.{gen}.{ext}"
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Atomically replace the manifest."""
+        tmp = self._manifest_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, self._manifest_path)
+
+    def _open(self, manifest: Dict[str, Any]) -> None:
+        """Map the files of the manifest's generation."""
+        self._generation = manifest["generation"]
+        self.dim: Optional[int] = manifest["dim"]
+        self.id_width: int = manifest["id_width"]
+        self._manifest_mtime = self._manifest_path.stat().st_mtime
+        for name in ("ids.bin", "flags.u8", "ends.u64", "records.jsonl", "vectors.f32"):
+            self._file(name).touch(exist_ok=True)
+        self._id_index = None
+        self._id_index_size = 0
+        self._size = -1
+        self._remap()
+
+    @staticmethod
+    def _map(path: Path, dtype: Any, mode: str = "r", shape: Optional[Tuple[int, ...]] = None):
+        """Memory-map a file, returning an empty array for empty files."""
+        if os.path.getsize(path) == 0 or (shape is not None and shape[0] == 0):
+            return np.zeros((0,) + tuple(shape[1:] if shape else ()), dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode=mode, shape=shape)
+
+    def _remap(self) -> None:
+        """Re-map files if other writers (or this one) appended slots."""
+        size = os.path.getsize(self._file("ends.u64")) // 8
+        if size == self._size:
+            return
+
+        self._size = size
+        self._ends = self._map(self._file("ends.u64"), np.uint64, shape=(size,))
+        self._ids = self._map(self._file("ids.bin"), f"S{self.id_width}", shape=(size,))
+        self._flags = self._map(self._file("flags.u8"), np.uint8, mode="r+", shape=(size,))
+
+        rows = 0
+        if self.dim:
+            rows = min(size, os.path.getsize(self._file("vectors.f32")) // (4 * self.dim))
+        self._vectors = self._map(self._file("vectors.f32"), np.float32, shape=(rows, self.dim or 0))
+
+        self._close_records()
+        records_path = self._file("records.jsonl")
+        if os.path.getsize(records_path):
+            with open(records_path, "rb") as f:
+                self._records = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_records(self) -> None:
+        """Release the record file mapping."""
+        if isinstance(self._records, mmap.mmap):
+            self._records.close()
+        self._records = b""
+
+    def close(self) -> None:
+        """Release file mappings."""
+        self._close_records()
+
+    def refresh(self) -> None:
+        """Pick up appends and compactions made by other processes."""
+        mtime = self._manifest_path.stat().st_mtime
+        if mtime != self._manifest_mtime:
+            manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+            if manifest["generation"] != self._generation:
+                self._open(manifest)
+                return
+            self.dim = manifest["dim"]
+            self._manifest_mtime = mtime
+        self._remap()
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive advisory lock serializing writers across processes."""
+        with open(self._lock_path, "a+") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # -- store API -------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Number of stored (non-deleted) memories."""
+        self.refresh()
+        return int((self._flags & _FLAG_DELETED == 0).sum())
+
+    @property
+    def slot_count(self) -> int:
+        """Number of slots, including tombstones."""
+        return self._size
+
+    @property
+    def generation(self) -> int:
+        """File generation, bumped by every compaction (slots are renumbered)."""
+        return self._generation
+
+    @property
+    def tombstones(self) -> int:
+        """Number of deleted slots."""
+        return int((self._flags & _FLAG_DELETED != 0).sum())
+
+    @property
+    def vector_count(self) -> int:
+        """Number of searchable embeddings."""
+        return int((self._flags == _FLAG_VECTOR).sum())
+
+    def append(
+        self,
+        memory_id: str,
+        content: str,
+        metadata: Optional[Dict[str, Any]],
+        timestamp: float,
+        embedding: Optional[Sequence[float]] = None,
+    ) -> int:
+        """Append a memory and return its slot."""
+        encoded_id = memory_id.encode("utf-8")
+        if len(encoded_id) > self.id_width:
+            raise ValueError(f"Memory ID longer than {self.id_width} bytes: {memory_id!r}")
+
+        record = json.dumps(
+            {"content": content, "metadata": metadata or None, "timestamp": timestamp},
+            ensure_ascii=False,
+        ).encode("utf-8") + b"\n"
+
+        with self._locked():
+            slot = self._size
+            flags = 0
+
+            if embedding is not None and len(embedding):
+                vector = normalize(embedding)
+                if self.dim is None:
+                    self.dim = vector.shape[0]
+                    self._write_manifest(
+                        {"generation": self._generation, "dim": self.dim, "id_width": self.id_width}
+                    )
+                    self._manifest_mtime = self._manifest_path.stat().st_mtime
+                elif vector.shape[0] != self.dim:
+                    raise ValueError(f"Embedding dimension {vector.shape[0]} does not match store dimension {self.dim}")
+
+                with open(self._file("vectors.f32"), "ab") as f:
+                    # Pad slots stored before this one that have no embedding
+                    rows = f.tell() // (4 * self.dim)
+                    if rows < slot:
+                        f.write(np.zeros((slot - rows, self.dim), dtype=np.float32).tobytes())
+                    f.write(vector.tobytes())
+                flags |= _FLAG_VECTOR
+
+            with open(self._file("records.jsonl"), "ab") as f:
+                f.write(record)
+                end = f.tell()
+            with open(self._file("ids.bin"), "ab") as f:
+                f.write(encoded_id.ljust(self.id_width, b"\0"))
+            with open(self._file("flags.u8"), "ab") as f:
+                f.write(bytes([flags]))
+            # Commit point: readers only see slots covered by ``ends``
+            with open(self._file("ends.u64"), "ab") as f:
+                f.write(np.uint64(end).tobytes())
+
+            self._remap()
+
+        if self._id_index is not None:
+            self._extend_id_index()
+        return slot
+
+    def _extend_id_index(self) -> None:
+        """Index IDs of slots appended since the last lookup."""
+        for slot in range(self._id_index_size, self._size):
+            if not self._flags[slot] & _FLAG_DELETED:
+                self._id_index[self._ids[slot].decode("utf-8")] = slot
+        self._id_index_size = self._size
+
+    def slot_of(self, memory_id: str) -> Optional[int]:
+        """Get the slot of a memory ID, or None if unknown or deleted.
+
+        The ID -> slot dict is built lazily on first lookup so that opening a
+        store stays cheap.
+        """
+        self.refresh()
+        if self._id_index is None:
+            self._id_index = {}
+            self._id_index_size = 0
+        self._extend_id_index()
+
+        slot = self._id_index.get(memory_id)
+        if slot is not None and self._flags[slot] & _FLAG_DELETED:
+            del self._id_index[memory_id]
+            return None
+        return slot
+
+    def delete(self, slot: int) -> None:
+        """Tombstone a slot (in place, visible to every process mapping the store)."""
+        if self._flags[slot] & _FLAG_DELETED:
+            return
+        self._flags[slot] |= _FLAG_DELETED
+        self._flags.flush()
+        if self._id_index is not None:
+            self._id_index.pop(self._ids[slot].decode("utf-8"), None)
+
+    def _load_record(self, slot: int) -> Dict[str, Any]:
+        """Decode a slot's record from the record file."""
+        start = int(self._ends[slot - 1]) if slot else 0
+        return json.loads(self._records[start:int(self._ends[slot])])
+
+    def is_live(self, slot: int) -> bool:
+        """Whether a slot holds a non-deleted memory."""
+        return not self._flags[slot] & _FLAG_DELETED
+
+    def content(self, slot: int) -> Optional[str]:
+        """Get the content of a slot (None for tombstones)."""
+        if self._flags[slot] & _FLAG_DELETED:
+            return None
+        return self._load_record(slot)["content"]
+
+    def embedding(self, slot: int) -> Optional[np.ndarray]:
+        """Get the normalized embedding of a slot, if any."""
+        if self._flags[slot] != _FLAG_VECTOR:
+            return None
+        return np.array(self._vectors[slot])
+
+    def record(self, slot: int) -> Dict[str, Any]:
+        """Materialize the memory stored in a slot as a dictionary."""
+        data = self._load_record(slot)
+        embedding = self.embedding(slot)
+        return {
+            "id": self._ids[slot].decode("utf-8"),
+            "content": data["content"],
+            "metadata": dict(data["metadata"] or {}),
+            "timestamp": datetime.fromtimestamp(data["timestamp"]).isoformat(),
+            "embedding": embedding.tolist() if embedding is not None else None,
+        }
+
+    def live_slots(self) -> List[int]:
+        """Slots of non-deleted memories, in insertion order."""
+        self.refresh()
+        return np.flatnonzero(self._flags & _FLAG_DELETED == 0).tolist()
+
+    def iter_contents(self, start: int = 0) -> Iterator[Tuple[int, str]]:
+        """Iterate over (slot, content) of non-deleted memories from slot ``start``."""
+        self.refresh()
+        for slot in (start + np.flatnonzero(self._flags[start:] & _FLAG_DELETED == 0)).tolist():
+            yield slot, self._load_record(slot)["content"]
+
+    def vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Embedding matrix (row = slot) and mask of slots with a live embedding."""
+        self.refresh()
+        rows = self._vectors.shape[0]
+        return self._vectors, self._flags[:rows] == _FLAG_VECTOR
+
+    def search(
+        self,
+        query: Sequence[float],
+        limit: int,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """Exact cosine top-k over stored embeddings, as (slot, score) tuples."""
+        matrix, valid = self.vectors()
+        if matrix.shape[0] == 0:
+            return []
+        return top_k_cosine(matrix, valid, query, limit, threshold)
+
+    def compact(self) -> List[int]:
+        """Rewrite the store without tombstones as a new generation.
+
+        Processes still mapping the previous generation keep reading it until
+        their next ``refresh()``.
+
+        Returns:
+            The kept (old) slots, in order
+        """
+        with self._locked():
+            keep = np.flatnonzero(self._flags & _FLAG_DELETED == 0)
+            old_generation = self._generation
+            new_generation = old_generation + 1
+
+            def new_file(name: str) -> Path:
+                return self._file(name, new_generation)
+
+            self._ids[keep].tofile(new_file("ids.bin"))
+            self._flags[keep].tofile(new_file("flags.u8"))
+            rows = self._vectors.shape[0]
+            vector_keep = keep[keep < rows]
+            self._vectors[vector_keep].tofile(new_file("vectors.f32"))
+
+            ends = np.empty(len(keep), dtype=np.uint64)
+            with open(new_file("records.jsonl"), "wb") as f:
+                for i, slot in enumerate(keep):
+                    start = int(self._ends[slot - 1]) if slot else 0
+                    f.write(self._records[start:int(self._ends[slot])])
+                    ends[i] = f.tell()
+            ends.tofile(new_file("ends.u64"))
+
+            self._write_manifest(
+                {"generation": new_generation, "dim": self.dim, "id_width": self.id_width}
+            )
+            self._open(json.loads(self._manifest_path.read_text(encoding="utf-8")))
+
+            # Open mappings of other processes keep the old inodes alive on POSIX
+            for name in ("ids.bin", "flags.u8", "ends.u64", "records.jsonl", "vectors.f32"):
+                try:
+                    self._file(name, old_generation).unlink()
+                except OSError:
+                    pass
+
+        return keep.tolist()
@@ -0,0 +1,215 @@
+"""Result cache for SQL queries issued by the database tool.
+
+Entries are keyed by database, normalized SQL text (whitespace, letter case
+outside quotes and trailing semicolons are ignored), bind parameters and row
+limit, and are bounded by a TTL and a memory budget.
+
+Invalidation is table-level and uses generations: every table read by a
+cached query has a generation counter, recorded in the entry when the query
+starts. ``invalidate_tables()`` bumps the counters, which makes every entry
+that read those tables stale in O(1), including results of queries that were
+still running at the time. Writes executed through the tool invalidate the
+tables they modify automatically; other writers (ETL jobs, admin endpoints)
+call ``invalidate_tables()``.
+
+Table names are extracted with a lightweight SQL scan (``FROM``/``JOIN``
+clauses and the targets of ``INSERT``/``UPDATE``/``DELETE``/DDL), which covers
+the queries the agent issues; views and functions that read other tables
+are not resolved.
+"""
+
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional, Tuple
+import json
+import re
+import threading
+
+from src.config import settings
+from src.storage.cache import CacheStats, LRUCache
+
+# Quoted literals/identifiers are kept verbatim by normalization
+_QUOTED = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")
+_NAME = r"((?:\"[^\"]+\"|[\w$]+)(?:\s*\.\s*(?:\"[^\"]+\"|[\w$]+))*)"
+_READ_CLAUSE = re.compile(r"\b(?:from|join)\s+", re.I)
+_TABLE = re.compile(rf"{_NAME}(?:\s+(?:as\s+)?(?!(?:where|join|on|using|group|order|limit|having|union|"
+                    rf"inner|left|right|full|cross|natural|lateral|window|offset|fetch|for)\b)\w+)?\s*(,\s*)?", re.I)
+_WRITE_TABLES = re.compile(
+    rf"\b(?:insert\s+into|update|delete\s+from|truncate(?:\s+table)?|merge\s+into|"
+    rf"(?:alter|drop|create)\s+table(?:\s+if\s+(?:not\s+)?exists)?)\s+{_NAME}",
+    re.I,
+)
+_WRITE_KEYWORDS = re.compile(r"\b(insert|update|delete|merge|truncate|alter|drop|create|grant|revoke)\b", re.I)
+
+
+def normalize_sql(sql: str) -> str:
+    """Normalize SQL text for cache keys.
+
+    Whitespace is collapsed and text outside quotes is lowercased; string
+    literals and quoted identifiers are kept as written.
+    """
+    parts = _QUOTED.split(sql.strip().rstrip(";").strip())
+    return "".join(
+        part if i % 2 else " ".join(part.split()).lower()
+        for i, part in enumerate(parts)
+    )
+
+
+def _table_name(name: str) -> str:
+    """Unqualified, unquoted, lowercase table name (``public."Stations"`` -> ``stations``)."""
+    last = re.split(r"\s*\.\s*", name.strip())[-1]
+    return last.strip('"').lower()
+
+
+def _strip_literals(sql: str) -> str:
+    return _QUOTED.sub(lambda m: m.group(0) if m.group(0).startswith('"') else "''", sql)
+
+
+def read_tables(sql: str) -> FrozenSet[str]:
+    """Tables a query reads (``FROM`` lists and ``JOIN`` clauses)."""
+    sql = _strip_literals(sql)
+    tables = set()
+    for clause in _READ_CLAUSE.finditer(sql):
+        pos = clause.end()
+        # "FROM a x, b AS y" lists several tables; subqueries are scanned on their own
+        while (match := _TABLE.match(sql, pos)) is not None:
+            tables.add(_table_name(match.group(1)))
+            if not match.group(2):
+                break
+            pos = match.end()
+    return frozenset(tables)
+
+
+def written_tables(sql: str) -> FrozenSet[str]:
+    """Tables a statement modifies (DML targets and DDL)."""
+    return frozenset(_table_name(m.group(1)) for m in _WRITE_TABLES.finditer(_strip_literals(sql)))
+
+
+def is_read_only(sql: str) -> bool:
+    """Whether a statement only reads (cacheable)."""
+    stripped = _strip_literals(sql).lstrip().lower()
+    return stripped.startswith(("select", "with", "values")) and not _WRITE_KEYWORDS.search(stripped)
+
+
+class QueryCache:
+    """TTL + memory-bounded LRU of query results with table-level invalidation."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 1024,
+        ttl: Optional[float] = 300.0,
+        max_bytes: Optional[int] = None,
+    ):
+        """Initialize cache.
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl: Seconds a result stays valid (None for no expiry)
+            max_bytes: Memory budget for cached results (approximate)
+        """
+        self.stats = CacheStats()
+        self._entries = LRUCache(max_entries=max_entries, ttl=ttl, max_bytes=max_bytes, stats=self.stats)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.invalidations = 0
+
+    @staticmethod
+    def key(
+        database: str,
+        sql: str,
+        params: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> Hashable:
+        """Cache key of a query."""
+        encoded = json.dumps(params or {}, sort_keys=True, ensure_ascii=False, default=str)
+        return database, normalize_sql(sql), encoded, limit
+
+    def snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        """Current generations of tables (taken before running a query)."""
+        with self._lock:
+            return tuple(sorted((t, self._generations.get(t, 0)) for t in tables))
+
+    def _is_current(self, generations: Tuple[Tuple[str, int], ...]) -> bool:
+        with self._lock:
+            return all(self._generations.get(t, 0) == g for t, g in generations)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Cached result, or None (counted as a miss) if absent, expired or invalidated."""
+        entry = self._entries.get(key)
+        if entry is not None and not self._is_current(entry[0]):
+            self._entries.pop(key)
+            entry = None
+        if entry is None:
+            self.stats.record_miss()
+            return None
+        self.stats.record_hit()
+        return entry[1]
+
+    def set(
+        self,
+        key: Hashable,
+        result: Dict[str, Any],
+        generations: Tuple[Tuple[str, int], ...],
+        seconds: Optional[float] = None,
+    ) -> None:
+        """Store a result.
+
+        Args:
+            key: Key from ``key()``
+            result: Query result
+            generations: ``snapshot()`` of the tables read, taken before the query ran
+            seconds: Query time, credited as saved time on later hits
+        """
+        if seconds is not None:
+            self.stats.record_miss_latency(seconds)
+        if not self._is_current(generations):
+            return
+        self._entries.set(key, (generations, result))
+        self.stats.record_store()
+
+    def invalidate_tables(self, *tables: str) -> None:
+        """Make every cached result that read any of these tables stale."""
+        with self._lock:
+            for table in tables:
+                name = _table_name(table)
+                self._generations[name] = self._generations.get(name, 0) + 1
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate, saved query time and cache size."""
+        return {
+            **self.stats.as_dict(),
+            "entries": len(self._entries),
+            "bytes": self._entries.size_bytes,
+            "invalidations": self.invalidations,
+        }
+
+
+_query_cache: Optional[QueryCache] = None
+
+
+def get_query_cache() -> Optional[QueryCache]:
+    """Get the shared query result cache.
+
+    Returns:
+        Shared cache instance, or None if ``DB_CACHE`` is off
+    """
+    global _query_cache
+    if not settings.DB_CACHE:
+        return None
+    if _query_cache is None:
+        _query_cache = QueryCache(
+            max_entries=settings.DB_CACHE_MAX_ENTRIES,
+            ttl=settings.DB_CACHE_TTL,
+            max_bytes=settings.DB_CACHE_MAX_BYTES,
+        )
+    return _query_cache
+
+
+def invalidate_tables(*tables: str) -> None:
+    """Invalidation hook for writers outside the database tool."""
+    cache = get_query_cache()
+    if cache is not None:
+        cache.invalidate_tables(*tables)
@@ -0,0 +1,87 @@
+"""Compressed checkpoint serialization.
+
+``CompressedSerializer`` is LangGraph's msgpack ``JsonPlusSerializer`` with a
+compression step: payloads above ``min_size`` are compressed with zstd (zlib,
+with a warning, if ``zstandard`` is missing) and tagged by suffixing the type,
+e.g. ``msgpack+zstd``. Untagged payloads written before compression was
+enabled still load.
+"""
+
+import logging
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODECS = ("zstd", "zlib")
+
+
+class CompressedSerializer(JsonPlusSerializer):
+    """Msgpack checkpoint serializer with zstd/zlib compression."""
+
+    def __init__(self, codec: str = "zstd", level: Optional[int] = None, min_size: int = 512, **kwargs: Any):
+        """Initialize serializer.
+
+        Args:
+            codec: 'zstd' or 'zlib' ('zstd' falls back to 'zlib' if zstandard is missing)
+            level: Compression level (codec default if None)
+            min_size: Payloads smaller than this many bytes are stored uncompressed
+            **kwargs: Passed to ``JsonPlusSerializer``
+        """
+        super().__init__(**kwargs)
+        if codec not in CODECS:
+            raise ValueError(f"Unknown checkpoint compression '{codec}', expected one of {CODECS}")
+        if codec == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed; compressing checkpoints with zlib instead of zstd")
+            codec = "zlib"
+        self.codec = codec
+        self.level = level
+        self.min_size = min_size
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.level if self.level is not None else 3).compress(data)
+        return zlib.compress(data, self.level if self.level is not None else 6)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> bytes:
+        if codec == "zlib":
+            return zlib.decompress(data)
+        if zstandard is None:
+            raise RuntimeError("Checkpoint is zstd-compressed: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = super().dumps_typed(obj)
+        self.raw_bytes += len(data)
+        if len(data) >= self.min_size:
+            compressed = self._compress(data)
+            if len(compressed) < len(data):
+                type_, data = f"{type_}+{self.codec}", compressed
+        self.stored_bytes += len(data)
+        return type_, data
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        base, _, codec = type_.rpartition("+")
+        if base and codec in CODECS:
+            return super().loads_typed((base, self._decompress(codec, payload)))
+        return super().loads_typed(data)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Bytes serialized vs. bytes stored."""
+        return {
+            "codec": self.codec,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "ratio": round(self.raw_bytes / self.stored_bytes, 2) if self.stored_bytes else None,
+        }
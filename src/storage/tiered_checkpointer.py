@@ -0,0 +1,493 @@
+"""Two-tier checkpointer: in-process hot cache over a persistent saver.
+
+``TieredCheckpointSaver`` keeps the most recent checkpoints of recently
+active threads in a size-bounded LRU, so the next turn of a conversation
+handled by the same worker does not reload its state from Postgres/Redis.
+Reads fall through to the backing saver on a miss. Writes land in the cache
+immediately and are persisted asynchronously (write-behind) by background
+workers. The workers keep each thread's writes in order. ``flush()`` (called
+on shutdown) waits until everything is durable; ``flush(thread_id)`` (before
+listing or deleting a thread) waits only for that thread's writes.
+
+Threads with writes that are not yet persisted are pinned in memory and
+never evicted, so reads always see the latest state. The cache assumes
+session affinity: a thread's turns are handled by one worker process at a
+time, and ``ttl`` bounds how long another process's writes can go unseen.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from typing import Any, AsyncIterator, Collection, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    copy_checkpoint,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+from src.storage.cache import CacheStats, LRUCache
+
+logger = logging.getLogger(__name__)
+
+ThreadKey = Tuple[str, str]
+
+
+class _ThreadEntry:
+    """Recent checkpoints (and their pending writes) of one thread namespace."""
+
+    __slots__ = ("checkpoints", "writes", "complete", "pending", "history", "drained")
+
+    def __init__(self, complete: bool):
+        self.checkpoints: Dict[str, CheckpointTuple] = {}
+        self.writes: Dict[str, Dict[Tuple[str, int], Tuple[str, str, Any, str]]] = {}
+        # Whether the newest cached checkpoint is the thread's latest
+        self.complete = complete
+        # Write-behind operations not yet persisted, per checkpoint ID
+        self.pending: Dict[str, int] = {}
+        # (checkpoint ID, delta-channel history) of the last resolved checkpoint
+        self.history: Optional[Tuple[str, Mapping[str, Any]]] = None
+        # Set (and cleared) when ``pending`` empties; created by ``flush(thread_id)``
+        self.drained: Optional[asyncio.Event] = None
+
+    def get(self, checkpoint_id: Optional[str]) -> Optional[CheckpointTuple]:
+        """Cached tuple for a checkpoint ID (None for the latest, if known)."""
+        if checkpoint_id is None:
+            if not self.complete or not self.checkpoints:
+                return None
+            checkpoint_id = max(self.checkpoints)
+        saved = self.checkpoints.get(checkpoint_id)
+        if saved is None:
+            return None
+        stored = self.writes.get(checkpoint_id, {})
+        writes = [stored[k][:3] for k in sorted(stored, key=lambda k: writes_sort_key(stored[k][3], *k))]
+        return saved._replace(pending_writes=writes)
+
+    def trim(self, keep: int) -> None:
+        """Forget the oldest persisted checkpoints beyond ``keep``."""
+        excess = len(self.checkpoints) - keep
+        if excess <= 0:
+            return
+        # Keep unpersisted checkpoints, the memoized one and the newest one
+        ordered = sorted(self.checkpoints)
+        protected = {ordered[-1], self.history[0] if self.history is not None else None}
+        for checkpoint_id in ordered:
+            if excess <= 0:
+                break
+            if checkpoint_id in self.pending or checkpoint_id in protected:
+                continue
+            del self.checkpoints[checkpoint_id]
+            self.writes.pop(checkpoint_id, None)
+            excess -= 1
+
+
+def _thread_key(config: RunnableConfig) -> ThreadKey:
+    configurable = config["configurable"]
+    return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+
+class TieredCheckpointSaver(BaseCheckpointSaver):
+    """LRU hot cache with read-through and write-behind over another saver."""
+
+    def __init__(
+        self,
+        backend: BaseCheckpointSaver,
+        max_threads: Optional[int] = 1024,
+        max_checkpoints: int = 8,
+        ttl: Optional[float] = 300.0,
+        write_behind: bool = True,
+        max_pending: int = 1024,
+        workers: int = 4,
+        retries: int = 3,
+    ):
+        """Initialize tiered saver.
+
+        Args:
+            backend: Persistent saver (e.g. AsyncPostgresSaver)
+            max_threads: Maximum number of cached thread namespaces
+            max_checkpoints: Checkpoints kept per cached thread
+            ttl: Seconds a cached thread stays valid without use (None for no expiry)
+            write_behind: Persist writes in the background (False for write-through)
+            max_pending: Bound of each write queue; writers wait when it is full
+            workers: Number of background writers (a thread always uses the same one)
+            retries: Attempts per background write before it is dropped and logged
+        """
+        super().__init__(serde=backend.serde)
+        self.backend = backend
+        self.max_checkpoints = max_checkpoints
+        self.write_behind = write_behind
+        self.max_pending = max_pending
+        self.n_workers = workers
+        self.retries = retries
+        self.stats = CacheStats()
+        self._threads = LRUCache(max_entries=max_threads, ttl=ttl, stats=self.stats)
+        self._dirty: Dict[ThreadKey, _ThreadEntry] = {}
+        # Containers are shared with clones from ``with_allowlist``
+        self._queues: List[asyncio.Queue] = []
+        self._workers: List[asyncio.Task] = []
+        self._counters = {"persisted": 0, "write_errors": 0}
+
+    # -- cache helpers ------------------------------------------------------
+
+    def _entry(self, key: ThreadKey) -> Optional[_ThreadEntry]:
+        entry = self._dirty.get(key)
+        return entry if entry is not None else self._threads.get(key)
+
+    def _cached(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        entry = self._entry(_thread_key(config))
+        found = entry.get(get_checkpoint_id(config)) if entry is not None else None
+        if found is not None:
+            self.stats.record_hit()
+        return found
+
+    def _remember(self, config: RunnableConfig, found: Optional[CheckpointTuple], started: float) -> None:
+        """Record a miss and cache the tuple loaded from the backend."""
+        self.stats.record_miss(time.monotonic() - started)
+        # Tuples with pending writes (interrupted steps) are rare; don't cache them
+        if found is None or found.pending_writes:
+            return
+        key = _thread_key(config)
+        entry = self._entry(key)
+        if entry is None:
+            entry = _ThreadEntry(complete=False)
+            self._threads.set(key, entry)
+        entry.checkpoints[found.config["configurable"]["checkpoint_id"]] = found
+        if get_checkpoint_id(config) is None:
+            entry.complete = True
+        entry.trim(self.max_checkpoints)
+
+    def _put_local(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata
+    ) -> Tuple[_ThreadEntry, RunnableConfig]:
+        thread_id, checkpoint_ns = key = _thread_key(config)
+        parent_id = get_checkpoint_id(config)
+        next_config: RunnableConfig = {
+            "configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"]}
+        }
+        entry = self._entry(key)
+        if entry is None:
+            entry = _ThreadEntry(complete=True)
+            self._threads.set(key, entry)
+        # The checkpoint being written is the thread's newest
+        entry.complete = True
+        entry.checkpoints[checkpoint["id"]] = CheckpointTuple(
+            config=next_config,
+            checkpoint=checkpoint,
+            metadata=get_checkpoint_metadata(config, metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id
+                else None
+            ),
+        )
+        entry.trim(self.max_checkpoints)
+        return entry, next_config
+
+    def _put_writes_local(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str
+    ) -> Optional[_ThreadEntry]:
+        """Add writes to a cached checkpoint; returns its entry (None if not cached)."""
+        entry = self._entry(_thread_key(config))
+        checkpoint_id = get_checkpoint_id(config)
+        if entry is None or checkpoint_id not in entry.checkpoints:
+            return None
+        stored = entry.writes.setdefault(checkpoint_id, {})
+        # Same replacement rules as the savers: special channels overwrite, others don't
+        for idx, (channel, value) in enumerate(writes):
+            write_key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            if write_key[1] >= 0 and write_key in stored:
+                continue
+            stored[write_key] = (task_id, channel, value, task_path)
+        return entry
+
+    def _forget_thread(self, thread_id: str) -> None:
+        for key in list(self._threads.keys()):
+            if key[0] == thread_id:
+                self._threads.pop(key)
+        for key in [k for k in self._dirty if k[0] == thread_id]:
+            del self._dirty[key]
+
+    # -- write-behind -------------------------------------------------------
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        for _ in range(self.n_workers):
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+            self._queues.append(queue)
+            self._workers.append(asyncio.ensure_future(self._worker(queue)))
+
+    async def _enqueue(self, key: ThreadKey, entry: _ThreadEntry, checkpoint_id: str, fn, *args: Any) -> None:
+        self._ensure_workers()
+        entry.pending[checkpoint_id] = entry.pending.get(checkpoint_id, 0) + 1
+        self._dirty[key] = entry
+        await self._queues[hash(key) % len(self._queues)].put((key, entry, checkpoint_id, fn, args))
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            key, entry, checkpoint_id, fn, args = await queue.get()
+            try:
+                await self._persist(fn, args)
+            finally:
+                remaining = entry.pending.get(checkpoint_id, 1) - 1
+                if remaining:
+                    entry.pending[checkpoint_id] = remaining
+                else:
+                    entry.pending.pop(checkpoint_id, None)
+                if not entry.pending:
+                    if self._dirty.get(key) is entry:
+                        del self._dirty[key]
+                    if entry.drained is not None:
+                        entry.drained.set()
+                        entry.drained = None
+                queue.task_done()
+
+    async def _persist(self, fn, args: Tuple[Any, ...]) -> None:
+        for attempt in range(self.retries):
+            try:
+                await fn(*args)
+                self._counters["persisted"] += 1
+                return
+            except Exception:
+                if attempt == self.retries - 1:
+                    self._counters["write_errors"] += 1
+                    logger.exception("Dropping checkpoint write after %d attempts", self.retries)
+                    return
+                await asyncio.sleep(0.1 * 2**attempt)
+
+    async def flush(self, thread_id: Optional[str] = None) -> None:
+        """Wait until pending writes have been persisted.
+
+        Args:
+            thread_id: Only wait for this thread's writes (None for all threads)
+        """
+        if thread_id is None:
+            await asyncio.gather(*(queue.join() for queue in self._queues))
+            return
+        for key, entry in [(k, e) for k, e in self._dirty.items() if k[0] == thread_id]:
+            if entry.pending:
+                if entry.drained is None:
+                    entry.drained = asyncio.Event()
+                await entry.drained.wait()
+
+    async def aclose(self) -> None:
+        """Flush pending writes and stop the background writers."""
+        await self.flush()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rate and write-behind counters."""
+        return {
+            **self.stats.as_dict(),
+            "cached_threads": len(self._threads),
+            "dirty_threads": len(self._dirty),
+            "pending_writes": sum(queue.qsize() for queue in self._queues),
+            **self._counters,
+        }
+
+    # -- BaseCheckpointSaver (async) ----------------------------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        found = self._cached(config)
+        if found is not None:
+            return found
+        started = time.monotonic()
+        found = await self.backend.aget_tuple(config)
+        self._remember(config, found, started)
+        return found
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        checkpoint = copy_checkpoint(checkpoint)
+        entry, next_config = self._put_local(config, checkpoint, metadata)
+        if self.write_behind:
+            await self._enqueue(
+                _thread_key(config), entry, checkpoint["id"], self.backend.aput, config, checkpoint, metadata, new_versions
+            )
+        else:
+            await self.backend.aput(config, checkpoint, metadata, new_versions)
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        entry = self._put_writes_local(config, writes, task_id, task_path)
+        # Writes to uncached checkpoints go straight to the backend, which has them
+        if self.write_behind and entry is not None:
+            await self._enqueue(
+                _thread_key(config), entry, get_checkpoint_id(config), self.backend.aput_writes, config, writes, task_id, task_path
+            )
+        else:
+            await self.backend.aput_writes(config, writes, task_id, task_path)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self.flush(config["configurable"].get("thread_id") if config else None)
+        async for item in self.backend.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aget_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]) -> Mapping[str, Any]:
+        key = _thread_key(config)
+        entry = self._entry(key)
+        target = entry.get(get_checkpoint_id(config)) if entry is not None else None
+        if target is None or key not in self._dirty:
+            # The backend has the whole chain
+            result = await self.backend.aget_delta_channel_history(config=config, channels=channels)
+        else:
+            result = await self._walk_delta_history(entry, target, channels)
+        if target is not None:
+            # Lets the next turn's walk stop here
+            entry.history = (target.config["configurable"]["checkpoint_id"], result)
+        return result
+
+    async def _walk_delta_history(
+        self, entry: _ThreadEntry, target: CheckpointTuple, channels: Sequence[str]
+    ) -> Dict[str, Any]:
+        """Delta-channel history walking cached checkpoints.
+
+        Stops at the most recent checkpoint whose history is memoized, or at
+        the first persisted one (the backend resolves the rest in one call).
+        """
+        collected: Dict[str, List[Any]] = {channel: [] for channel in channels}
+        seeds: Dict[str, Any] = {}
+        remaining = set(channels)
+        older: Mapping[str, Any] = {}
+        cursor = target.parent_config
+        while cursor is not None and remaining:
+            cursor_id = get_checkpoint_id(cursor)
+            found = entry.get(cursor_id)
+            persisted = found is None
+            if persisted:
+                found = await self.backend.aget_tuple(cursor)
+                if found is None:
+                    break
+            for write in reversed(found.pending_writes or []):
+                if write[1] in remaining:
+                    collected[write[1]].append(write)
+            for channel in list(remaining):
+                if channel in found.checkpoint["channel_values"]:
+                    seeds[channel] = found.checkpoint["channel_values"][channel]
+                    remaining.discard(channel)
+
+            memo = entry.history[1] if entry.history is not None and entry.history[0] == cursor_id else None
+            if remaining and memo is not None and remaining <= memo.keys():
+                older = memo
+                break
+            if persisted:
+                if remaining:
+                    older = await self.backend.aget_delta_channel_history(config=cursor, channels=list(remaining))
+                break
+            cursor = found.parent_config
+
+        result: Dict[str, Any] = {}
+        for channel in channels:
+            writes = list(reversed(collected[channel]))
+            if channel in remaining and channel in older:
+                result[channel] = {**older[channel], "writes": [*older[channel]["writes"], *writes]}
+            else:
+                result[channel] = {"writes": writes}
+                if channel in seeds:
+                    result[channel]["seed"] = seeds[channel]
+        return result
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self.flush(thread_id)
+        self._forget_thread(thread_id)
+        await self.backend.adelete_thread(thread_id)
+
+    # -- BaseCheckpointSaver (sync, write-through) --------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        found = self._cached(config)
+        if found is not None:
+            return found
+        started = time.monotonic()
+        found = self.backend.get_tuple(config)
+        self._remember(config, found, started)
+        return found
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        checkpoint = copy_checkpoint(checkpoint)
+        self.backend.put(config, checkpoint, metadata, new_versions)
+        return self._put_local(config, checkpoint, metadata)[1]
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        self.backend.put_writes(config, writes, task_id, task_path)
+        self._put_writes_local(config, writes, task_id, task_path)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        return self.backend.list(config, filter=filter, before=before, limit=limit)
+
+    def get_delta_channel_history(self, *, config: RunnableConfig, channels: Sequence[str]) -> Mapping[str, Any]:
+        if _thread_key(config) in self._dirty:
+            return super().get_delta_channel_history(config=config, channels=channels)
+        return self.backend.get_delta_channel_history(config=config, channels=channels)
+
+    def delete_thread(self, thread_id: str) -> None:
+        self._forget_thread(thread_id)
+        self.backend.delete_thread(thread_id)
+
+    # -- delegation ---------------------------------------------------------
+
+    @property
+    def config_specs(self) -> list:
+        return self.backend.config_specs
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        return self.backend.get_next_version(current, channel)
+
+    def with_allowlist(self, extra_allowlist: Collection[Tuple[str, ...]]) -> "TieredCheckpointSaver":
+        backend = self.backend.with_allowlist(extra_allowlist)
+        if backend is self.backend:
+            return self
+        clone = copy.copy(self)
+        clone.backend = backend
+        clone.serde = backend.serde
+        return clone
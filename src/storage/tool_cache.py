@@ -0,0 +1,204 @@
+"""Memoization of tool results.
+
+Tools declare whether their results may be reused (``BaseTool.cacheable`` and
+``cache_ttl`` for registry tools, ``cacheable()`` for LangChain tools).
+Results of cacheable tools are stored under the tool name and the
+canonicalized arguments (defaults filled in, keys sorted), so a repeated
+call such as ``get_weather("北京")`` within its TTL is answered without
+running the tool again. Error results are never stored.
+
+Backends:
+
+- ``memory``: per-process LRU with an entry and memory budget
+- ``redis``: shared by all workers; entries expire after their TTL and
+  eviction is left to the Redis server (``maxmemory-policy allkeys-lru``)
+
+Hit rates and saved time are tracked per tool.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+import hashlib
+import json
+import logging
+import time
+
+from src.config import settings
+from src.storage.cache import CacheStats, LRUCache
+
+logger = logging.getLogger(__name__)
+
+TOOL_CACHE_BACKENDS = ("memory", "redis")
+
+_MISSING = object()
+
+
+def canonical_args(args: Mapping[str, Any]) -> str:
+    """Canonical JSON form of tool arguments (sorted keys, compact)."""
+    return json.dumps(args, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class ToolCache:
+    """Tool result cache with per-tool statistics."""
+
+    def __init__(
+        self,
+        backend: str = "memory",
+        ttl: Optional[float] = 300.0,
+        max_entries: Optional[int] = 2048,
+        max_bytes: Optional[int] = None,
+        redis_url: Optional[str] = None,
+        prefix: str = "hydroagent:tool:",
+    ):
+        """Initialize cache.
+
+        Args:
+            backend: 'memory' or 'redis'
+            ttl: Default time-to-live in seconds for tools without their own TTL
+            max_entries: Maximum number of entries (memory backend)
+            max_bytes: Memory budget in bytes (memory backend)
+            redis_url: Redis connection URL (defaults to ``settings.REDIS_URL``)
+            prefix: Redis key prefix
+        """
+        if backend not in TOOL_CACHE_BACKENDS:
+            raise ValueError(f"Unknown tool cache backend '{backend}', expected one of {TOOL_CACHE_BACKENDS}")
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self._stats: Dict[str, CacheStats] = {}
+        self._entries: Optional[LRUCache] = None
+        self._redis = None
+        if backend == "redis":
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.Redis.from_url(redis_url or settings.REDIS_URL)
+        else:
+            self._entries = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def stats_for(self, tool_name: str) -> CacheStats:
+        """Counters of one tool."""
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = CacheStats()
+        return stats
+
+    @staticmethod
+    def key(tool_name: str, args: Mapping[str, Any]) -> str:
+        """Cache key of a call."""
+        digest = hashlib.sha256(canonical_args(args).encode("utf-8")).hexdigest()
+        return f"{tool_name}:{digest}"
+
+    async def aget(self, tool_name: str, key: str) -> Tuple[bool, Any]:
+        """Look up a result.
+
+        Returns:
+            ``(found, value)``; backend errors count as misses
+        """
+        value: Any = _MISSING
+        if self._entries is not None:
+            value = self._entries.get(key, _MISSING)
+        else:
+            try:
+                raw = await self._redis.get(self.prefix + key)
+                if raw is not None:
+                    value = json.loads(raw)
+            except Exception as e:
+                logger.warning("Tool cache read failed: %s", e)
+
+        stats = self.stats_for(tool_name)
+        if value is _MISSING:
+            stats.record_miss()
+            return False, None
+        stats.record_hit()
+        return True, value
+
+    async def aset(
+        self,
+        tool_name: str,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        seconds: Optional[float] = None,
+    ) -> None:
+        """Store a result.
+
+        Args:
+            tool_name: Tool the result belongs to
+            key: Key from ``key()``
+            value: Tool result
+            ttl: Time-to-live in seconds (defaults to ``self.ttl``)
+            seconds: Execution time of the call, credited as saved time on later hits
+        """
+        stats = self.stats_for(tool_name)
+        if seconds is not None:
+            stats.record_miss_latency(seconds)
+        ttl = self.ttl if ttl is None else ttl
+        if self._entries is not None:
+            self._entries.set(key, value, ttl=ttl)
+        else:
+            try:
+                payload = json.dumps(value, ensure_ascii=False)
+                await self._redis.set(self.prefix + key, payload, ex=int(ttl) if ttl else None)
+            except Exception as e:
+                # Non-JSON results and Redis outages only cost the cache entry
+                logger.warning("Tool cache write failed: %s", e)
+                return
+        stats.record_store()
+
+    async def memoize(
+        self,
+        tool_name: str,
+        args: Mapping[str, Any],
+        fn: Callable[[], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        cache_if: Callable[[Any], bool] = lambda value: True,
+    ) -> Any:
+        """Return the cached result of a call, or run ``fn`` and cache its result.
+
+        Args:
+            tool_name: Tool name
+            args: Canonicalized call arguments
+            fn: Zero-argument coroutine function running the tool
+            ttl: Time-to-live in seconds (defaults to ``self.ttl``)
+            cache_if: Whether a result may be stored (e.g. not errors)
+
+        Returns:
+            Tool result
+        """
+        key = self.key(tool_name, args)
+        found, value = await self.aget(tool_name, key)
+        if found:
+            return value
+        started = time.monotonic()
+        value = await fn()
+        if cache_if(value):
+            await self.aset(tool_name, key, value, ttl=ttl, seconds=time.monotonic() - started)
+        return value
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-tool hit rates and saved time."""
+        stats: Dict[str, Any] = {"backend": self.backend, "tools": {n: s.as_dict() for n, s in self._stats.items()}}
+        if self._entries is not None:
+            stats.update(entries=len(self._entries), bytes=self._entries.size_bytes)
+        return stats
+
+
+_tool_cache: Optional[ToolCache] = None
+
+
+def get_tool_cache() -> Optional[ToolCache]:
+    """Get the shared tool result cache.
+
+    Returns:
+        Shared cache instance, or None if ``TOOL_CACHE`` is off
+    """
+    global _tool_cache
+    if not settings.TOOL_CACHE:
+        return None
+    if _tool_cache is None:
+        _tool_cache = ToolCache(
+            backend=settings.TOOL_CACHE_BACKEND.lower(),
+            ttl=settings.TOOL_CACHE_TTL,
+            max_entries=settings.TOOL_CACHE_MAX_ENTRIES,
+            max_bytes=settings.TOOL_CACHE_MAX_BYTES,
+        )
+    return _tool_cache
@@ -0,0 +1,223 @@
+"""Exact cosine-similarity index over a contiguous NumPy embedding matrix."""
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class VectorIndex:
+    """Row-addressed embedding index with brute-force cosine top-k search.
+
+    Vectors are stored L2-normalized in a single contiguous float32 matrix, so a
+    query is one matrix-vector product followed by ``argpartition``. Rows are
+    never moved on delete; deleted rows are masked out of searches.
+    """
+
+    def __init__(self, dim: Optional[int] = None, initial_capacity: int = 1024):
+        """Initialize vector index.
+
+        Args:
+            dim: Embedding dimension (inferred from the first vector if None)
+            initial_capacity: Number of rows to pre-allocate
+        """
+        self.dim = dim
+        self._capacity = max(1, initial_capacity)
+        self._size = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._valid = np.zeros(self._capacity, dtype=bool)
+        if dim is not None:
+            self._matrix = np.zeros((self._capacity, dim), dtype=np.float32)
+
+    def __len__(self) -> int:
+        """Number of rows (including deleted ones)."""
+        return self._size
+
+    @property
+    def active_count(self) -> int:
+        """Number of searchable rows."""
+        return int(self._valid[: self._size].sum())
+
+    def _grow(self, min_capacity: int) -> None:
+        """Grow storage (amortized doubling) to hold at least ``min_capacity`` rows."""
+        new_capacity = self._capacity
+        while new_capacity < min_capacity:
+            new_capacity *= 2
+        if new_capacity == self._capacity:
+            return
+
+        valid = np.zeros(new_capacity, dtype=bool)
+        valid[: self._size] = self._valid[: self._size]
+        self._valid = valid
+
+        if self._matrix is not None:
+            matrix = np.zeros((new_capacity, self.dim), dtype=np.float32)
+            matrix[: self._size] = self._matrix[: self._size]
+            self._matrix = matrix
+
+        self._capacity = new_capacity
+
+    def add(self, vector: Optional[Sequence[float]] = None) -> int:
+        """Append a row.
+
+        Args:
+            vector: Embedding vector, or None to reserve a non-searchable row
+
+        Returns:
+            Row number of the new entry
+        """
+        if self._size >= self._capacity:
+            self._grow(self._size + 1)
+
+        row = self._size
+        self._size += 1
+
+        if vector is None:
+            return row
+
+        arr = normalize(vector)
+        if self._matrix is None:
+            self.dim = arr.shape[0]
+            self._matrix = np.zeros((self._capacity, self.dim), dtype=np.float32)
+        elif arr.shape[0] != self.dim:
+            raise ValueError(f"Embedding dimension {arr.shape[0]} does not match index dimension {self.dim}")
+
+        self._matrix[row] = arr
+        self._valid[row] = True
+        return row
+
+    def delete(self, row: int) -> bool:
+        """Exclude a row from future searches.
+
+        Args:
+            row: Row number
+
+        Returns:
+            True if the row was searchable, False otherwise
+        """
+        if 0 <= row < self._size and self._valid[row]:
+            self._valid[row] = False
+            return True
+        return False
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Views of the used part of the matrix and of the searchable-row mask.
+
+        Returns:
+            Tuple of (matrix, valid) arrays with one entry per row
+        """
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32), self._valid[:0]
+        return self._matrix[: self._size], self._valid[: self._size]
+
+    def get(self, row: int) -> Optional[np.ndarray]:
+        """Get the (normalized) vector stored at a row.
+
+        Args:
+            row: Row number
+
+        Returns:
+            Vector copy, or None if the row holds no searchable vector
+        """
+        if 0 <= row < self._size and self._valid[row]:
+            return self._matrix[row].copy()
+        return None
+
+    def compact(self, keep: Sequence[int]) -> None:
+        """Rebuild storage keeping only the given rows, in the given order.
+
+        Row ``keep[i]`` becomes row ``i``; all other rows are dropped.
+
+        Args:
+            keep: Row numbers to keep
+        """
+        keep_arr = np.asarray(keep, dtype=np.int64)
+        size = keep_arr.shape[0]
+        capacity = max(1, size)
+
+        valid = np.zeros(capacity, dtype=bool)
+        valid[:size] = self._valid[keep_arr]
+        if self._matrix is not None:
+            matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            matrix[:size] = self._matrix[keep_arr]
+            self._matrix = matrix
+
+        self._valid = valid
+        self._size = size
+        self._capacity = capacity
+
+    def search(
+        self,
+        query: Sequence[float],
+        limit: int = 5,
+        threshold: Optional[float] = None,
+    ) -> List[Tuple[int, float]]:
+        """Find the most similar rows to a query vector.
+
+        Args:
+            query: Query embedding
+            limit: Maximum number of results
+            threshold: Minimum cosine similarity (inclusive)
+
+        Returns:
+            List of (row, score) tuples sorted by descending score
+        """
+        if self._matrix is None or self._size == 0:
+            return []
+        return top_k_cosine(
+            self._matrix[: self._size], self._valid[: self._size], query, limit, threshold
+        )
+
+
+def normalize(vector: Sequence[float]) -> np.ndarray:
+    """Convert a vector to a unit-length float32 array."""
+    arr = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(arr))
+    if norm > 0:
+        arr = arr / norm
+    return arr
+
+
+def top_k_cosine(
+    matrix: np.ndarray,
+    valid: np.ndarray,
+    query: Sequence[float],
+    limit: int,
+    threshold: Optional[float] = None,
+) -> List[Tuple[int, float]]:
+    """Exact cosine top-k over a matrix of normalized row vectors.
+
+    Args:
+        matrix: (n, dim) float32 matrix of unit-length rows
+        valid: (n,) boolean mask of searchable rows
+        query: Query embedding
+        limit: Maximum number of results
+        threshold: Minimum cosine similarity (inclusive)
+
+    Returns:
+        List of (row, score) tuples sorted by descending score
+    """
+    n = matrix.shape[0]
+    if n == 0 or limit <= 0:
+        return []
+
+    q = normalize(query)
+    if q.shape[0] != matrix.shape[1]:
+        raise ValueError(f"Query dimension {q.shape[0]} does not match index dimension {matrix.shape[1]}")
+
+    scores = matrix @ q
+    scores[~valid] = -np.inf
+
+    k = min(limit, n)
+    if k < n:
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(n)
+    top = top[np.argsort(-scores[top], kind="stable")]
+
+    results = []
+    for row in top:
+        score = float(scores[row])
+        if score == -np.inf or (threshold is not None and score < threshold):
+            break
+        results.append((int(row), score))
+    return results
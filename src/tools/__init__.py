@@ -1,13 +1,26 @@
-"""Tools module - Function calling tools for the agent."""
-
-from src.tools.base import BaseTool, tool_registry, get_all_tools
-from src.tools.example_tools import get_weather, calculate, get_current_time
-
-__all__ = [
-    "BaseTool",
-    "tool_registry",
-    "get_all_tools",
-    "get_weather",
-    "calculate",
-    "get_current_time",
-]
+"""Tools module - Function calling tools for the agent.
+
+Exports are resolved on first access, so tool modules (and their
+dependencies, e.g. NumPy or SQLAlchemy) load only when a tool is used.
+"""
+
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "BaseTool": "src.tools.base",
+    "tool_registry": "src.tools.base",
+    "get_all_tools": "src.tools.base",
+    "get_weather": "src.tools.example_tools",
+    "calculate": "src.tools.example_tools",
+    "get_current_time": "src.tools.example_tools",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module), name)
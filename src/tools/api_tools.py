@@ -4,6 +4,7 @@ from typing import Any, Dict, Optional
 import httpx
 
 from src.tools.base import BaseTool, register_tool
+from src.tools.http_client import get_http_client
 
 
 class HTTPRequestTool(BaseTool):
@@ -11,6 +12,12 @@ class HTTPRequestTool(BaseTool):
 
     name = "http_request"
     description = "Make HTTP requests to external APIs. Supports GET, POST, PUT, DELETE methods."
+    cacheable = True
+    cache_ttl = 60.0
+
+    def is_cacheable(self, arguments: Dict[str, Any]) -> bool:
+        """Only GET requests are reused; other methods may change remote state."""
+        return str(arguments.get("method", "GET")).upper() == "GET"
 
     async def execute(
         self,
@@ -19,6 +26,7 @@ class HTTPRequestTool(BaseTool):
         headers: Optional[Dict[str, str]] = None,
         params: Optional[Dict[str, Any]] = None,
         json_data: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
     ) -> Dict[str, Any]:
         """Execute an HTTP request.
         
@@ -28,26 +36,29 @@ class HTTPRequestTool(BaseTool):
             headers: Request headers
             params: Query parameters
             json_data: JSON body for POST/PUT requests
+            timeout: Request timeout in seconds (defaults to the shared client's)
             
         Returns:
             Dictionary containing response data
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.request(
-                    method=method.upper(),
-                    url=url,
-                    headers=headers or {},
-                    params=params,
-                    json=json_data,
-                )
-                response.raise_for_status()
-
-                return {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "body": response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text,
-                }
+            # Pooled client: connections are reused across calls
+            client = get_http_client()
+            response = await client.request(
+                method=method.upper(),
+                url=url,
+                headers=headers or {},
+                params=params,
+                json=json_data,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            )
+            response.raise_for_status()
+
+            return {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "body": response.json() if response.headers.get("content-type", "").startswith("application/json") else response.text,
+            }
         except httpx.HTTPError as e:
             return {
                 "error": f"HTTP error: {str(e)}",
@@ -1,7 +1,9 @@
 """Base tool class and registry for function calling."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
+import inspect
+
 from langchain_core.tools import BaseTool as LangChainBaseTool
 
 
@@ -9,10 +11,26 @@ class BaseTool(ABC):
     """Base class for all agent tools.
     
     Tools should inherit from this class and implement the execute method.
+    Tools whose results depend only on their arguments set ``cacheable`` (and
+    optionally ``cache_ttl``) so that ``call`` memoizes them. ``execution``
+    selects where ``execute`` runs: on the event loop ('async'), or on its own
+    event loop in the shared thread or process pool ('thread', 'process';
+    see ``src.tools.execution``).
     """
 
     name: str
     description: str
+    cacheable: bool = False
+    cache_ttl: Optional[float] = None
+    execution: str = "async"
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if cls.execution == "process":
+            from src.tools.execution import PROCESS_TOOL_MODULES
+
+            # Worker processes import the module when they start
+            PROCESS_TOOL_MODULES.add(cls.__module__)
 
     @abstractmethod
     async def execute(self, **kwargs: Any) -> Any:
@@ -26,15 +44,81 @@ class BaseTool(ABC):
         """
         pass
 
-    def to_langchain_tool(self) -> LangChainBaseTool:
-        """Convert to LangChain tool format."""
-        from langchain_core.tools import tool
-        
-        @tool(name=self.name, description=self.description)
-        async def tool_func(**kwargs: Any) -> Any:
+    def is_cacheable(self, arguments: Dict[str, Any]) -> bool:
+        """Whether the result of a call with these arguments may be reused.
+
+        Args:
+            arguments: Canonicalized call arguments (defaults filled in)
+        """
+        return self.cacheable
+
+    def canonical_arguments(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Call arguments bound to ``execute``'s signature, defaults filled in."""
+        try:
+            bound = inspect.signature(self.execute).bind(**kwargs)
+        except TypeError:
+            return dict(kwargs)
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+    async def _execute(self, **kwargs: Any) -> Any:
+        """Run ``execute`` under the tool's execution policy."""
+        if self.execution == "async":
             return await self.execute(**kwargs)
-        
-        return tool_func
+        from src.tools.execution import get_tool_pools, run_tool_execute
+
+        return await get_tool_pools().run(self.execution, run_tool_execute, self, kwargs)
+
+    async def call(self, **kwargs: Any) -> Any:
+        """Execute the tool under its execution policy, through the tool result cache if it is cacheable.
+
+        Args:
+            **kwargs: Tool-specific parameters
+
+        Returns:
+            Tool execution result
+        """
+        from src.storage.tool_cache import get_tool_cache
+
+        cache = get_tool_cache()
+        if cache is None or not self.cacheable:
+            return await self._execute(**kwargs)
+        arguments = self.canonical_arguments(kwargs)
+        if not self.is_cacheable(arguments):
+            return await self._execute(**kwargs)
+        return await cache.memoize(
+            self.name,
+            arguments,
+            lambda: self._execute(**kwargs),
+            ttl=self.cache_ttl,
+            cache_if=lambda result: not (isinstance(result, dict) and "error" in result),
+        )
+
+    def to_langchain_tool(self) -> LangChainBaseTool:
+        """Convert to LangChain tool format (calls go through ``call``)."""
+        from langchain_core.tools import StructuredTool
+        from langchain_core.tools.base import create_schema_from_function
+
+        return StructuredTool.from_function(
+            coroutine=self.call,
+            name=self.name,
+            description=self.description,
+            args_schema=create_schema_from_function(self.name, self.execute),
+        )
+
+
+def cacheable(ttl: Optional[float] = None) -> Callable[[LangChainBaseTool], LangChainBaseTool]:
+    """Mark a LangChain tool as cacheable (applied on top of ``@tool``).
+
+    Args:
+        ttl: Time-to-live of its results in seconds (defaults to ``TOOL_CACHE_TTL``)
+    """
+
+    def decorate(tool: LangChainBaseTool) -> LangChainBaseTool:
+        tool.metadata = {**(tool.metadata or {}), "cacheable": True, "cache_ttl": ttl}
+        return tool
+
+    return decorate
 
 
 # Tool registry
@@ -1,11 +1,86 @@
-"""Database query and data manipulation tools."""
+"""Database query and data manipulation tools.
 
-from typing import Any, Dict, List, Optional
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+Queries run on a SQLAlchemy ``AsyncEngine`` (asyncpg for PostgreSQL), so a
+slow query only suspends its own request instead of blocking the event loop.
+Engines are shared per database URL, with a bounded connection pool, and
+disposed on shutdown (``dispose_engines``).
+
+Rows are streamed from a server-side cursor in batches, and fetching stops as
+soon as the row or byte budget is reached. Values are collected per column
+and returned column-major, compactly rendered, or as a summary when they
+exceed the token budget (``src.tools.result_encoding``). On PostgreSQL the query timeout is
+also set as ``statement_timeout``, so the server cancels the query itself.
+
+Results of read-only queries are cached (``src.storage.query_cache``);
+statements that may modify tables bypass the cache and invalidate the cached
+results of those tables.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 from src.tools.base import BaseTool, register_tool
 from src.config import settings
+from src.storage.query_cache import QueryCache, get_query_cache, is_read_only, read_tables, written_tables
+from src.tools.result_encoding import encode_table
+
+# Synchronous driver -> async driver used by the tool
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+_engines: Dict[str, AsyncEngine] = {}
+
+
+def to_async_url(database_url: str) -> str:
+    """Rewrite a database URL to use an async driver (asyncpg, aiosqlite)."""
+    scheme, sep, rest = database_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+def get_async_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """Get the shared async engine for a database URL.
+
+    Args:
+        database_url: Database connection URL (defaults to DATABASE_URL)
+
+    Returns:
+        AsyncEngine with a pool sized by the DB_POOL_* settings
+    """
+    url = to_async_url(database_url or settings.DATABASE_URL)
+    engine = _engines.get(url)
+    if engine is None:
+        kwargs: Dict[str, Any] = {}
+        if not url.startswith("sqlite"):
+            kwargs = {
+                "pool_size": settings.DB_POOL_SIZE,
+                "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+                "pool_timeout": settings.DB_POOL_TIMEOUT,
+                "pool_recycle": settings.DB_POOL_RECYCLE,
+                "pool_pre_ping": True,
+            }
+        engine = _engines[url] = create_async_engine(url, **kwargs)
+    return engine
+
+
+async def dispose_engines() -> None:
+    """Close the connection pools of all shared engines (app shutdown)."""
+    engines = list(_engines.values())
+    _engines.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
+def _row_size(row: Any) -> int:
+    """Approximate size of a row in the tool result (characters of its values)."""
+    return sum(len(str(value)) for value in row)
 
 
 class DatabaseQueryTool(BaseTool):
@@ -14,47 +89,147 @@ class DatabaseQueryTool(BaseTool):
     name = "database_query"
     description = "Execute SQL queries on the database. Use with caution and validate queries."
 
-    def __init__(self, database_url: Optional[str] = None):
+    def __init__(
+        self,
+        database_url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        cache: Optional[QueryCache] = None,
+        token_budget: Optional[int] = None,
+    ):
         """Initialize database query tool.
-        
+
         Args:
             database_url: Database connection URL
+            timeout: Query timeout in seconds (defaults to DB_QUERY_TIMEOUT)
+            max_bytes: Result size budget; fetching stops beyond it (defaults to DB_MAX_RESULT_BYTES)
+            batch_size: Rows fetched from the cursor per round trip (defaults to DB_FETCH_SIZE)
+            cache: Result cache (defaults to the shared cache, None if DB_CACHE is off)
+            token_budget: Estimated tokens above which a summary is returned instead of all
+                values (defaults to DB_RESULT_TOKEN_BUDGET)
         """
         self.database_url = database_url or settings.DATABASE_URL
-        self._engine: Optional[Engine] = None
+        self.timeout = timeout if timeout is not None else settings.DB_QUERY_TIMEOUT
+        self.max_bytes = max_bytes if max_bytes is not None else settings.DB_MAX_RESULT_BYTES
+        self.batch_size = batch_size or settings.DB_FETCH_SIZE
+        self.cache = cache if cache is not None else get_query_cache()
+        self.token_budget = token_budget if token_budget is not None else settings.DB_RESULT_TOKEN_BUDGET
 
     @property
-    def engine(self) -> Engine:
-        """Get or create database engine."""
-        if self._engine is None:
-            self._engine = create_engine(self.database_url)
-        return self._engine
+    def engine(self) -> AsyncEngine:
+        """Shared async engine for this tool's database."""
+        return get_async_engine(self.database_url)
+
+    async def _fetch(self, query: str, limit: int, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        async with self.engine.connect() as conn:
+            if conn.dialect.name == "postgresql" and self.timeout:
+                # Cancelled by the server, even if this client goes away
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.timeout * 1000)}"))
+
+            result = await conn.stream(text(query), params, execution_options={"yield_per": self.batch_size})
+            columns = list(result.keys())
+            data: List[List[Any]] = [[] for _ in columns]
+            row_count = 0
+            size = 0
+            truncated: Optional[str] = None
+            try:
+                async for batch in result.partitions(self.batch_size):
+                    for row in batch:
+                        if row_count >= limit:
+                            truncated = "rows"
+                            break
+                        size += _row_size(row)
+                        if self.max_bytes and size > self.max_bytes:
+                            truncated = "bytes"
+                            break
+                        for values, value in zip(data, row):
+                            values.append(value)
+                        row_count += 1
+                    if truncated:
+                        break
+            finally:
+                # Closes the server-side cursor without reading the remaining rows
+                await result.close()
+
+        output = encode_table(
+            columns,
+            data,
+            token_budget=self.token_budget,
+            digits=settings.DB_RESULT_FLOAT_DIGITS,
+            sample_rows=settings.DB_RESULT_SAMPLE_ROWS,
+        )
+        if truncated:
+            output["truncated"] = truncated
+        return output
+
+    async def _write(self, query: str, limit: int, params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run a statement that may modify data in a transaction committed on success."""
+        async with self.engine.begin() as conn:
+            if conn.dialect.name == "postgresql" and self.timeout:
+                await conn.execute(text(f"SET LOCAL statement_timeout = {int(self.timeout * 1000)}"))
+
+            result = await conn.execute(text(query), params)
+            output: Dict[str, Any] = {"rowcount": result.rowcount}
+            if result.returns_rows:
+                # e.g. INSERT ... RETURNING
+                columns = list(result.keys())
+                rows = result.fetchmany(limit)
+                output.update(encode_table(columns, [list(values) for values in zip(*rows)] or [[] for _ in columns]))
+            return output
+
+    async def _run(self, statement: Awaitable[Dict[str, Any]]) -> Dict[str, Any]:
+        # Client-side bound in case the server does not enforce the timeout
+        timeout = self.timeout + 1 if self.timeout else None
+        return await asyncio.wait_for(statement, timeout)
 
-    async def execute(self, query: str, limit: int = 100) -> Dict[str, Any]:
+    async def execute(self, query: str, limit: int = 100, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute a SQL query.
-        
+
         Args:
             query: SQL query string
             limit: Maximum number of rows to return
-            
+            params: Bind parameters for ``:name`` placeholders in the query
+
         Returns:
-            Dictionary containing query results
+            Column-major query results (``columns``, ``types``, per-column ``data``)
+            or, above the token budget, a ``summary`` with ``head``/``tail`` samples;
+            ``truncated`` is 'rows' or 'bytes' when more rows were available than
+            the budget allows; for statements that modify data, ``rowcount``
         """
         try:
-            # Add LIMIT if not present (safety measure)
+            query = query.strip().rstrip(";")
+            if not is_read_only(query):
+                # Never cached; results over the written tables become stale once the
+                # write has committed (invalidating earlier would let a concurrent
+                # read cache pre-write rows under the new generation)
+                try:
+                    return await self._run(self._write(query, limit, params))
+                finally:
+                    if self.cache is not None:
+                        self.cache.invalidate_tables(*written_tables(query))
+
+            # Add LIMIT if not present (safety measure); one extra row detects truncation
             if "LIMIT" not in query.upper():
-                query = f"{query} LIMIT {limit}"
-
-            with self.engine.connect() as conn:
-                result = conn.execute(text(query))
-                rows = result.fetchall()
-                columns = result.keys()
-
-                return {
-                    "columns": list(columns),
-                    "rows": [dict(zip(columns, row)) for row in rows],
-                    "row_count": len(rows),
-                }
+                query = f"{query} LIMIT {limit + 1}"
+
+            cache = self.cache
+            if cache is None:
+                return await self._run(self._fetch(query, limit, params))
+
+            key = cache.key(self.database_url, query, params, limit)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            generations = cache.snapshot(read_tables(query))
+            started = time.monotonic()
+            result = await self._run(self._fetch(query, limit, params))
+            cache.set(key, result, generations, seconds=time.monotonic() - started)
+            return result
+        except asyncio.TimeoutError:
+            return {
+                "error": f"Query timed out after {self.timeout}s",
+            }
         except Exception as e:
             return {
                 "error": str(e),
@@ -63,4 +238,3 @@ class DatabaseQueryTool(BaseTool):
 
 # Register tools
 # register_tool(DatabaseQueryTool())
-
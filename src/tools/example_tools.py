@@ -1,8 +1,16 @@
 """Example tools for the agent using LangChain's @tool decorator."""
 
+import json
+from typing import Dict, List, Optional, Union
+
 from langchain.tools import tool
 
+from src.tools.base import cacheable
+from src.tools.execution import execution_policy
+
 
+@cacheable(ttl=600)
+@execution_policy("thread")
 @tool
 def get_weather(city: str) -> str:
     """Get weather for a given city.
@@ -17,24 +25,35 @@ def get_weather(city: str) -> str:
     return f"It's always sunny in {city}!"
 
 
+@cacheable()
+@execution_policy("process")
 @tool
-def calculate(expression: str) -> str:
-    """Calculate a mathematical expression.
+def calculate(expression: str, variables: Optional[Dict[str, Union[float, List[float]]]] = None) -> str:
+    """Calculate a mathematical expression, optionally over arrays of values.
     
     Args:
-        expression: A mathematical expression to evaluate (e.g., "2 + 2", "10 * 5")
+        expression: Arithmetic expression (e.g., "2 + 2", "sqrt(x) * 10", "sum(q) * 86400").
+            Supports + - * / // % **, comparisons, and the functions abs, sqrt, exp, log,
+            log10, log2, sin, cos, tan, asin, acos, atan, atan2, hypot, floor, ceil, round,
+            clip, where, min, max, sum, mean, cumsum; constants pi and e
+        variables: Values of the variables used in the expression; a list applies the
+            expression to every element (e.g., {"cfs": [120, 135, 150]} with "cfs * 0.0283168")
         
     Returns:
-        The result of the calculation as a string
+        The result as a string (a JSON list for array results)
     """
+    # NumPy is loaded on the first calculation
+    from src.tools.expression import ExpressionError, evaluate
+
     try:
-        # 注意：生产环境应该使用更安全的计算方法
-        result = eval(expression)
-        return str(result)
-    except Exception as e:
-        return f"Error calculating '{expression}': {str(e)}"
+        result = evaluate(expression, variables)
+    except ExpressionError as e:
+        return f"Error calculating '{expression}': {e}"
+    # Full precision: integers exact, floats in their shortest round-trip form
+    return json.dumps(result) if isinstance(result, list) else str(result)
 
 
+@execution_policy("thread")
 @tool
 def get_current_time() -> str:
     """Get the current time.
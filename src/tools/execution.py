@@ -0,0 +1,496 @@
+"""Execution policies and worker pools for blocking and CPU-bound tools.
+
+A tool declares where its work runs:
+
+- ``async``: on the event loop (coroutine tools doing non-blocking I/O)
+- ``thread``: in the shared thread pool (blocking I/O, C extensions releasing the GIL)
+- ``process``: in the shared process pool (pure-Python CPU work, untrusted
+  computations that may never finish)
+
+The pools are created by the application lifespan (``init_tool_pools``) and
+shut down with it (``shutdown_tool_pools``); the warm-up starts the worker
+processes, which import the process tools' modules, before the first request.
+Each policy has a concurrency limit equal to its worker count; calls beyond it
+wait, and the wait is reported as queue time. A call holds its slot until its
+work has stopped, even if the caller timed out. Each worker process runs one
+call at a time; a process call that is cancelled or times out while running
+has its own worker terminated and replaced in the background, so a runaway
+computation costs one worker and leaves the other calls alone.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from langchain_core.tools import BaseTool as LangChainBaseTool
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_POLICIES = ("async", "thread", "process")
+
+
+class _PolicyStats:
+    """Counters of one execution policy."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.running = 0
+        self.waiting = 0
+        self.queue_seconds = 0.0
+        self.max_queue_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "running": self.running,
+            "waiting": self.waiting,
+            "avg_queue_seconds": round(self.queue_seconds / self.calls, 6) if self.calls else 0.0,
+            "max_queue_seconds": round(self.max_queue_seconds, 6),
+        }
+
+
+# Modules of process-policy tools, imported by each worker process when it starts
+PROCESS_TOOL_MODULES: Set[str] = set()
+
+
+def _worker_main(conn: Any, preload: Tuple[str, ...]) -> None:
+    """Worker process loop: import ``preload``, report ready, then run ``(fn, args)``
+    requests until told to stop (``None``)."""
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            # The call that needs the module reports the error
+            pass
+    conn.send((True, None))
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        fn, args = request
+        try:
+            reply: Tuple[bool, Any] = (True, fn(*args))
+        except BaseException as e:
+            reply = (False, e)
+        try:
+            conn.send(reply)
+        except Exception as e:
+            # Unpicklable result or exception
+            conn.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+
+
+class WorkerExited(RuntimeError):
+    """The worker process died (or was killed) while running a call."""
+
+
+class _Worker:
+    """One worker process and its pipe."""
+
+    def __init__(self, context: Any, preload: Tuple[str, ...]):
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, preload), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+        self.exited = False
+
+    @property
+    def usable(self) -> bool:
+        """Whether the process and its pipe are still there."""
+        return not self.exited and not self.conn.closed and self.process.is_alive()
+
+    def _exited(self) -> WorkerExited:
+        self.exited = True
+        return WorkerExited("Tool worker process exited")
+
+    def _recv(self) -> Tuple[bool, Any]:
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            raise self._exited() from None
+
+    def wait_ready(self) -> None:
+        """Wait until the worker has imported its modules."""
+        if not self.ready:
+            self._recv()
+            self.ready = True
+
+    def call(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+        self.wait_ready()
+        try:
+            self.conn.send((fn, args))
+        except OSError:
+            raise self._exited() from None
+        ok, value = self._recv()
+        if not ok:
+            raise value
+        return value
+
+    def kill(self) -> None:
+        self.process.terminate()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class _ProcessCall:
+    """State shared between a process call and the thread waiting on its worker."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.worker: Optional[_Worker] = None
+        self.cancelled = False
+
+
+class ProcessWorkers:
+    """Worker processes that can be killed individually.
+
+    ``ProcessPoolExecutor`` marks the whole pool broken when one worker dies,
+    failing every other call; here each call has a worker to itself, and a
+    cancelled call only replaces its own worker. Workers import
+    ``PROCESS_TOOL_MODULES`` when they start; ``start()`` spawns all of them
+    ahead of the first call, and killed workers are replaced in the background.
+    """
+
+    def __init__(self, size: int, start_method: Optional[str] = "spawn"):
+        self.size = size
+        self._context = multiprocessing.get_context(start_method)
+        self._idle: List[_Worker] = []
+        self._busy: List[_Worker] = []
+        self._spawning = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self.killed = 0
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, tuple(sorted(PROCESS_TOOL_MODULES)))
+
+    def _add_idle(self) -> None:
+        """Spawn one worker, wait until it is ready and make it available."""
+        try:
+            worker = self._spawn()
+            worker.wait_ready()
+        except Exception:
+            logger.exception("Could not start a tool worker process")
+            return
+        finally:
+            with self._lock:
+                self._spawning -= 1
+        with self._lock:
+            # A call may have spawned a worker of its own meanwhile
+            if not self._closed and len(self._idle) + len(self._busy) < self.size:
+                self._idle.append(worker)
+                return
+        worker.stop()
+
+    def _reserve(self, n: int) -> int:
+        """Claim up to ``n`` spawns without exceeding ``size``; returns the number claimed."""
+        with self._lock:
+            if self._closed:
+                return 0
+            n = max(0, min(n, self.size - len(self._idle) - len(self._busy) - self._spawning))
+            self._spawning += n
+            return n
+
+    def start(self) -> None:
+        """Spawn workers up to ``size`` and wait until they are ready (blocking)."""
+        threads = [threading.Thread(target=self._add_idle, daemon=True) for _ in range(self._reserve(self.size))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _refill(self) -> None:
+        """Replace a lost worker in the background."""
+        if self._reserve(1):
+            threading.Thread(target=self._add_idle, name="tool-worker-spawn", daemon=True).start()
+
+    def _checkout(self) -> _Worker:
+        while True:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            if worker is None:
+                worker = self._spawn()
+            elif not worker.usable:
+                worker.kill()
+                continue
+            with self._lock:
+                self._busy.append(worker)
+            return worker
+
+    def _release(self, worker: _Worker, reuse: bool) -> None:
+        with self._lock:
+            if worker in self._busy:
+                self._busy.remove(worker)
+            reuse = reuse and not self._closed
+            if reuse:
+                self._idle.append(worker)
+        if not reuse:
+            worker.kill()
+
+    def call(self, state: _ProcessCall, fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+        """Run ``fn(*args)`` in a worker (blocking; called from a thread)."""
+        worker = self._checkout()
+        with state.lock:
+            if state.cancelled:
+                self._release(worker, reuse=True)
+                raise RuntimeError("Tool call cancelled")
+            state.worker = worker
+        try:
+            result = worker.call(fn, args)
+        except BaseException:
+            # Reuse after an error raised by the tool, never a dead worker
+            if worker.usable:
+                self._release(worker, reuse=True)
+            else:
+                self._release(worker, reuse=False)
+                if not state.cancelled:
+                    # Died on its own; a cancelled call's worker is replaced by ``cancel``
+                    self._refill()
+            raise
+        self._release(worker, reuse=True)
+        return result
+
+    def cancel(self, state: _ProcessCall) -> bool:
+        """Kill the worker running a call (if it has started). Returns whether one was killed."""
+        with state.lock:
+            state.cancelled = True
+            worker = state.worker
+        if worker is None or not worker.usable:
+            return False
+        with self._lock:
+            if worker in self._busy:
+                self._busy.remove(worker)
+        # The thread waiting on the worker sees the pipe close and cleans up
+        worker.process.terminate()
+        self.killed += 1
+        self._refill()
+        return True
+
+    @property
+    def alive(self) -> int:
+        """Started worker processes."""
+        with self._lock:
+            return len(self._idle) + len(self._busy)
+
+    def shutdown(self) -> None:
+        """Stop idle workers and kill busy ones."""
+        with self._lock:
+            self._closed = True
+            idle, busy = self._idle, self._busy
+            self._idle, self._busy = [], []
+        for worker in busy:
+            worker.process.terminate()
+        for worker in idle:
+            worker.stop()
+
+
+class ToolPools:
+    """Thread and process pools the tool layer offloads work into."""
+
+    def __init__(
+        self,
+        thread_workers: Optional[int] = None,
+        process_workers: Optional[int] = None,
+        start_method: Optional[str] = "spawn",
+    ):
+        """Initialize pools.
+
+        Args:
+            thread_workers: Threads (and concurrent thread-policy calls); default ``min(32, cpus + 4)``
+            process_workers: Worker processes (and concurrent process-policy calls); default CPU count
+            start_method: multiprocessing start method of the workers (None for the platform default)
+        """
+        cpus = os.cpu_count() or 1
+        self.thread_workers = thread_workers or min(32, cpus + 4)
+        self.process_workers = process_workers or cpus
+        self.start_method = start_method
+        self._threads = ThreadPoolExecutor(self.thread_workers, thread_name_prefix="tool")
+        self._processes = ProcessWorkers(self.process_workers, start_method)
+        # Threads waiting on worker processes (one per running process call)
+        self._waiters = ThreadPoolExecutor(self.process_workers, thread_name_prefix="tool-process")
+        self._limits = {
+            "thread": asyncio.Semaphore(self.thread_workers),
+            "process": asyncio.Semaphore(self.process_workers),
+        }
+        self._stats = {policy: _PolicyStats() for policy in self._limits}
+
+    async def run(self, policy: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` under an execution policy.
+
+        Args:
+            policy: 'thread' or 'process' ('async' is not offloaded)
+            fn: Function to run (picklable for 'process')
+            *args: Positional arguments (picklable for 'process')
+
+        Returns:
+            Result of ``fn``
+        """
+        if policy not in self._limits:
+            raise ValueError(f"Unknown execution policy '{policy}', expected one of {EXECUTION_POLICIES[1:]}")
+        stats = self._stats[policy]
+        queued = time.monotonic()
+        stats.waiting += 1
+        try:
+            await self._limits[policy].acquire()
+        finally:
+            stats.waiting -= 1
+        waited = time.monotonic() - queued
+        stats.calls += 1
+        stats.queue_seconds += waited
+        stats.max_queue_seconds = max(stats.max_queue_seconds, waited)
+
+        stats.running += 1
+        loop = asyncio.get_running_loop()
+        call = _ProcessCall()
+        try:
+            if policy == "thread":
+                future = self._threads.submit(fn, *args)
+            else:
+                future = self._waiters.submit(self._processes.call, call, fn, args)
+        except BaseException:
+            self._release(policy)
+            raise
+        # The slot is free when the work has stopped, not when the caller gives up waiting
+        future.add_done_callback(lambda _: self._release_threadsafe(loop, policy))
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            stats.cancelled += 1
+            # A running thread cannot be stopped; a running process can (only its own worker)
+            if policy == "process":
+                self._processes.cancel(call)
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+
+    def _release(self, policy: str) -> None:
+        self._stats[policy].running -= 1
+        self._limits[policy].release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop, policy: str) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release, policy)
+        except RuntimeError:
+            # Loop closed (shutdown)
+            pass
+
+    def start(self) -> None:
+        """Spawn the worker processes ahead of the first call (blocking; see ``ProcessWorkers.start``)."""
+        self._processes.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-policy calls, queue times and pool sizes."""
+        return {
+            "thread": {**self._stats["thread"].as_dict(), "workers": self.thread_workers},
+            "process": {
+                **self._stats["process"].as_dict(),
+                "workers": self.process_workers,
+                "alive": self._processes.alive,
+                "killed": self._processes.killed,
+            },
+        }
+
+    def shutdown(self) -> None:
+        """Stop both pools without waiting for running tasks."""
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        self._processes.shutdown()
+        self._waiters.shutdown(wait=False, cancel_futures=True)
+
+
+_pools: Optional[ToolPools] = None
+
+
+def get_tool_pools() -> ToolPools:
+    """Get the shared pools, creating them on first use (scripts, tests)."""
+    global _pools
+    if _pools is None:
+        _pools = ToolPools(
+            thread_workers=settings.TOOL_THREAD_WORKERS,
+            process_workers=settings.TOOL_PROCESS_WORKERS,
+            start_method=settings.TOOL_PROCESS_START_METHOD,
+        )
+    return _pools
+
+
+async def init_tool_pools() -> ToolPools:
+    """Create the shared pools (called from the application lifespan)."""
+    return get_tool_pools()
+
+
+async def shutdown_tool_pools() -> None:
+    """Shut down the shared pools."""
+    global _pools
+    if _pools is not None:
+        _pools.shutdown()
+        _pools = None
+
+
+def run_tool_execute(tool: Any, kwargs: Dict[str, Any]) -> Any:
+    """Worker-side entry: run a registry tool's ``execute`` on a fresh event loop."""
+    return asyncio.run(tool.execute(**kwargs))
+
+
+def _call_tool_function(module: str, name: str, kwargs: Dict[str, Any]) -> Any:
+    """Worker-side entry: call the function behind a module-level LangChain tool.
+
+    The decorated function is not picklable by reference (its module attribute
+    is the tool object), so the worker looks the tool up and calls ``tool.func``.
+    """
+    return getattr(importlib.import_module(module), name).func(**kwargs)
+
+
+def execution_policy(policy: str) -> Callable[[LangChainBaseTool], LangChainBaseTool]:
+    """Run a sync LangChain tool in the shared thread or process pool (applied on top of ``@tool``).
+
+    Args:
+        policy: 'async', 'thread' or 'process'; 'process' requires a module-level tool
+    """
+    if policy not in EXECUTION_POLICIES:
+        raise ValueError(f"Unknown execution policy '{policy}', expected one of {EXECUTION_POLICIES}")
+
+    def decorate(tool: LangChainBaseTool) -> LangChainBaseTool:
+        tool.metadata = {**(tool.metadata or {}), "execution": policy}
+        func = getattr(tool, "func", None)
+        if policy == "async" or func is None:
+            return tool
+
+        if policy == "thread":
+
+            async def offloaded(**kwargs: Any) -> Any:
+                return await get_tool_pools().run("thread", lambda: func(**kwargs))
+
+        else:
+            PROCESS_TOOL_MODULES.add(func.__module__)
+
+            async def offloaded(**kwargs: Any) -> Any:
+                return await get_tool_pools().run("process", _call_tool_function, func.__module__, func.__name__, kwargs)
+
+        tool.coroutine = offloaded
+        return tool
+
+    return decorate
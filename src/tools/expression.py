@@ -0,0 +1,262 @@
+"""Safe arithmetic expression engine for the ``calculate`` tool.
+
+Expressions are parsed once and checked against a whitelist of syntax
+(numbers, variables, arithmetic and comparison operators, calls of the
+functions in ``FUNCTIONS``); anything else — attributes, subscripts,
+lambdas, comprehensions, keyword arguments — is rejected before evaluation.
+Compiled forms are cached by expression string.
+
+Evaluation is vectorized with NumPy: a variable may be a scalar or a
+sequence, so ``flow * 0.0283168`` converts a whole series in one pass and
+``sum(q)`` adds up many gauges. Integer literals stay exact integers
+(``2**53 + 1``); a power whose result would exceed ``CALCULATE_MAX_INT_BITS``
+is refused, so ``9**9**9`` fails fast instead of running an unbounded
+big-integer computation. Division by zero, invalid operations (``sqrt(-1)``),
+the mean of an empty list and scalar overflow are errors; overflow inside an
+array gives ``inf``. Each evaluation has a size budget: expression length, syntax
+nodes, input elements, and nodes × elements (the number of element
+operations, which bounds the evaluation time). Inputs and array literals
+are at most one-dimensional, so broadcasting never produces more elements
+than the largest input (a column times a row would be an outer product).
+"""
+
+import ast
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from src.config import settings
+
+Number = Union[int, float]
+VariableValue = Union[Number, Sequence[Number]]
+
+
+class ExpressionError(ValueError):
+    """Invalid expression, or an evaluation outside the budget."""
+
+
+def _reduce(elementwise: Callable, reduction: Callable) -> Callable:
+    """``f(values)`` reduces one array; ``f(a, b, ...)`` applies elementwise."""
+
+    def apply(*args: Any) -> Any:
+        if not args:
+            raise ExpressionError("Expected at least one argument")
+        if len(args) == 1:
+            return reduction(args[0])
+        result = args[0]
+        for arg in args[1:]:
+            result = elementwise(result, arg)
+        return result
+
+    return apply
+
+
+def _mean(values: Any) -> Any:
+    if np.size(values) == 0:
+        raise ExpressionError("mean of an empty list")
+    return np.mean(values)
+
+
+def _pow(base: Any, exponent: Any) -> Any:
+    """``base ** exponent``, refusing integer results beyond ``CALCULATE_MAX_INT_BITS``."""
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0 and abs(base) > 1:
+        if exponent * base.bit_length() > settings.CALCULATE_MAX_INT_BITS:
+            raise ExpressionError(f"Integer result exceeds {settings.CALCULATE_MAX_INT_BITS} bits")
+    result = base**exponent
+    if isinstance(result, complex):
+        raise ExpressionError("Result is not a real number")
+    return result
+
+
+FUNCTIONS: Dict[str, Callable] = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "log2": np.log2,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "asin": np.arcsin,
+    "acos": np.arccos,
+    "atan": np.arctan,
+    "atan2": np.arctan2,
+    "hypot": np.hypot,
+    "floor": np.floor,
+    "ceil": np.ceil,
+    "round": lambda x, digits=0: np.round(x, int(digits)),
+    "clip": np.clip,
+    "where": np.where,
+    "min": _reduce(np.minimum, np.min),
+    "max": _reduce(np.maximum, np.max),
+    "sum": np.sum,
+    "mean": _mean,
+    "cumsum": np.cumsum,
+}
+
+CONSTANTS: Dict[str, float] = {"pi": float(np.pi), "e": float(np.e)}
+
+_OPERATORS = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+    ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+)  # fmt: skip
+_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple) + _OPERATORS
+
+
+class CompiledExpression:
+    """A validated, compiled expression."""
+
+    def __init__(self, source: str, code: Any, variables: FrozenSet[str], nodes: int):
+        self.source = source
+        self.variables = variables
+        self.nodes = nodes
+        self._code = code
+
+    def evaluate(self, variables: Optional[Mapping[str, VariableValue]] = None, max_elements: Optional[int] = None) -> Any:
+        """Evaluate with scalar or array variables (arrays are broadcast elementwise).
+
+        Args:
+            variables: Values of the expression's variables
+            max_elements: Maximum elements per input (defaults to ``CALCULATE_MAX_ELEMENTS``)
+
+        Returns:
+            NumPy scalar or array
+        """
+        variables = variables or {}
+        missing = self.variables - variables.keys()
+        if missing:
+            raise ExpressionError(f"Missing value for variable(s): {', '.join(sorted(missing))}")
+
+        max_elements = max_elements or settings.CALCULATE_MAX_ELEMENTS
+        namespace: Dict[str, Any] = {**FUNCTIONS, **CONSTANTS, "_array": _array, "_pow": _pow}
+        elements = 1
+        for name in self.variables:
+            try:
+                value = np.asarray(variables[name], dtype=np.float64)
+            except (TypeError, ValueError) as e:
+                raise ExpressionError(f"Variable '{name}' is not numeric: {e}") from None
+            if value.ndim > 1:
+                raise ExpressionError(f"Variable '{name}' must be a number or a flat list of numbers")
+            if value.size > max_elements:
+                raise ExpressionError(f"Variable '{name}' has {value.size} elements, the limit is {max_elements}")
+            elements = max(elements, value.size)
+            namespace[name] = value
+        if self.nodes * elements > settings.CALCULATE_MAX_OPERATIONS:
+            raise ExpressionError("Evaluation exceeds the operation budget; split the input into smaller batches")
+
+        # Division by zero and invalid operations raise FloatingPointError (an ArithmeticError)
+        with np.errstate(divide="raise", invalid="raise", over="ignore", under="ignore"):
+            try:
+                result = eval(self._code, {"__builtins__": {}}, namespace)
+            except (ArithmeticError, IndexError, TypeError, ValueError) as e:
+                raise ExpressionError(str(e)) from None
+        if np.ndim(result) == 0 and isinstance(result, (float, np.floating)) and not np.isfinite(result):
+            raise ExpressionError("Result overflows")
+        return result
+
+
+def _array(items: Sequence[Any]) -> np.ndarray:
+    array = np.asarray(items, dtype=np.float64)
+    if array.ndim > 1:
+        raise ExpressionError("Nested lists are not supported")
+    return array
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Turns list/tuple literals into float arrays, so ``[1, 2] * 3`` is elementwise,
+    and ``a ** b`` into the size-checked ``_pow(a, b)``."""
+
+    def visit_List(self, node: ast.expr) -> ast.AST:
+        self.generic_visit(node)
+        return ast.copy_location(ast.Call(ast.Name("_array", ast.Load()), [ast.List(node.elts, ast.Load())], []), node)
+
+    visit_Tuple = visit_List
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if not isinstance(node.op, ast.Pow):
+            return node
+        return ast.copy_location(ast.Call(ast.Name("_pow", ast.Load()), [node.left, node.right], []), node)
+
+
+class _Validator(ast.NodeVisitor):
+    """Rejects syntax outside the whitelist and collects variable names."""
+
+    def __init__(self):
+        self.variables = set()
+        self.nodes = 0
+
+    def generic_visit(self, node: ast.AST) -> None:
+        if not isinstance(node, _NODES):
+            raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+        self.nodes += 1
+        super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Unsupported constant: {node.value!r}")
+        self.nodes += 1
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id.startswith("_"):
+            raise ExpressionError(f"Invalid name: {node.id}")
+        if node.id in FUNCTIONS:
+            raise ExpressionError(f"Function used as a value: {node.id}")
+        if node.id not in CONSTANTS:
+            self.variables.add(node.id)
+        self.nodes += 1
+
+    def visit_Compare(self, node: ast.Compare) -> None:
+        if len(node.ops) != 1:
+            raise ExpressionError("Chained comparisons are not supported")
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            raise ExpressionError(f"Unknown function: {ast.unparse(node.func)}")
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        self.nodes += 1
+        for arg in node.args:
+            self.visit(arg)
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str) -> CompiledExpression:
+    """Parse, validate and compile an expression (cached by expression string).
+
+    Args:
+        source: Expression, e.g. ``"sum(q) * 86400"``
+
+    Returns:
+        Compiled expression
+    """
+    source = source.strip()
+    if len(source) > settings.CALCULATE_MAX_LENGTH:
+        raise ExpressionError(f"Expression longer than {settings.CALCULATE_MAX_LENGTH} characters")
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+    validator = _Validator()
+    validator.visit(tree)
+    tree = ast.fix_missing_locations(_Rewriter().visit(tree))
+    code = compile(tree, "<expression>", "eval")
+    return CompiledExpression(source, code, frozenset(validator.variables), validator.nodes)
+
+
+def evaluate(source: str, variables: Optional[Mapping[str, VariableValue]] = None) -> Any:
+    """Compile (cached) and evaluate an expression.
+
+    Args:
+        source: Expression
+        variables: Scalar or array values of its variables
+
+    Returns:
+        Python number, bool or list (JSON-serializable)
+    """
+    result = compile_expression(source).evaluate(variables)
+    return np.asarray(result).tolist()
@@ -0,0 +1,135 @@
+"""Process-wide pooled HTTP client shared by HTTP-based tools.
+
+The client is opened by the application lifespan (``init_http_client``) and
+closed on shutdown (``close_http_client``). Tools call ``get_http_client()``,
+which also creates the client lazily when used outside the app (scripts,
+tests). Connections are kept alive and reused across tool calls; an optional
+per-host limit keeps one slow host from taking the whole pool.
+"""
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+from src.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that releases a per-host slot when closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release()
+                self._release = None
+
+
+class HostLimitedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper limiting concurrent requests per host.
+
+    A slot is held from sending the request until the response body is
+    closed, i.e. for as long as the pooled connection is in use.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        """Initialize transport.
+
+        Args:
+            transport: Underlying (pooling) transport
+            max_per_host: Maximum concurrent requests per host
+        """
+        self._transport = transport
+        self.max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+
+        await semaphore.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            semaphore.release()
+            raise
+        if isinstance(response.stream, httpx.ByteStream):
+            # Body already in memory: the connection is free again
+            semaphore.release()
+            return response
+        response.stream = _ReleasingStream(response.stream, semaphore.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Build a pooled client from settings.
+
+    Returns:
+        Configured ``httpx.AsyncClient``
+    """
+    if settings.HTTP2_ENABLED:
+        try:
+            import h2  # noqa: F401
+        except ImportError as e:
+            raise ImportError("HTTP2_ENABLED requires the 'h2' package: pip install 'httpx[http2]'") from e
+
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    transport: httpx.AsyncBaseTransport = httpx.AsyncHTTPTransport(
+        limits=limits,
+        http2=settings.HTTP2_ENABLED,
+        retries=1,
+    )
+    if settings.HTTP_MAX_CONNECTIONS_PER_HOST:
+        transport = HostLimitedTransport(transport, settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.HTTP_TIMEOUT, connect=settings.HTTP_CONNECT_TIMEOUT),
+        follow_redirects=True,
+    )
+
+
+async def init_http_client() -> httpx.AsyncClient:
+    """Open the shared client (called from the application lifespan)."""
+    return get_http_client()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared client, creating it on first use.
+
+    Returns:
+        Shared ``httpx.AsyncClient``
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,169 @@
+"""Compact encoding of tabular tool results for the LLM context.
+
+Query results are sent to the model as JSON, so their size is paid for in
+tokens on every later turn. ``encode_table`` renders them column-major:
+
+- column names (and a type per column) appear once; values are per-column arrays
+- values are rendered compactly by type: integral floats and decimals as integers,
+  midnight datetimes as dates, binary data as a size; numbers stay exact
+  (shortest round-trip form; decimals a float cannot hold exactly as strings)
+- a column holding one repeated value becomes ``{"constant": v, "count": n}``, and
+  an evenly spaced datetime column (typical for hydrological time series)
+  becomes ``{"start": t0, "step_seconds": s, "count": n}``
+
+When the encoded table exceeds the token budget, it is replaced by a summary:
+per-column counts, min/max/mean rounded to significant digits (or distinct
+values for text) and the first and last rows.
+"""
+
+import json
+import math
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Optional, Sequence
+
+
+def estimate_tokens(value: Any) -> int:
+    """Approximate token count of a JSON-serialized value (~4 characters per token)."""
+    return len(json.dumps(value, ensure_ascii=False, default=str)) // 4
+
+
+def compact_value(value: Any, digits: Optional[int] = None) -> Any:
+    """JSON-friendly, short rendering of a database value.
+
+    Args:
+        value: Value returned by the database driver
+        digits: Significant digits kept for floating-point numbers (None for exact values)
+
+    Returns:
+        JSON-serializable value
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, Decimal):
+        if value == value.to_integral_value():
+            return int(value)
+        if digits is None and Decimal(repr(float(value))) != value:
+            # More digits than a float holds
+            return str(value)
+        return compact_value(float(value), digits)
+    if isinstance(value, float):
+        if not math.isfinite(value):
+            return str(value)
+        if digits is not None:
+            value = float(f"{value:.{digits}g}")
+        return int(value) if value.is_integer() and abs(value) < 2**53 else value
+    if isinstance(value, datetime):
+        if value.tzinfo is None and value.time() == time.min:
+            return value.date().isoformat()
+        return value.isoformat(timespec="seconds" if not value.microsecond else "auto")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    return str(value)
+
+
+def column_type(values: Sequence[Any]) -> str:
+    """Type name of a column, from its non-null values."""
+    kinds = {type(v) for v in values if v is not None}
+    if not kinds:
+        return "null"
+    if kinds <= {bool}:
+        return "bool"
+    if kinds <= {int}:
+        return "int"
+    if kinds <= {int, float, Decimal}:
+        return "float"
+    if kinds <= {datetime}:
+        return "datetime"
+    if kinds <= {date}:
+        return "date"
+    if kinds <= {str}:
+        return "text"
+    return "mixed" if len(kinds) > 1 else next(iter(kinds)).__name__
+
+
+def encode_column(values: Sequence[Any], digits: Optional[int] = None) -> Any:
+    """Column-major encoding of one column (see module docstring)."""
+    if len(values) > 2:
+        first = values[0]
+        if all(v == first for v in values):
+            return {"constant": compact_value(first, digits), "count": len(values)}
+        if all(isinstance(v, datetime) for v in values):
+            step = values[1] - values[0]
+            if step and all(b - a == step for a, b in zip(values[1:], values[2:])):
+                return {"start": compact_value(first, digits), "step_seconds": step.total_seconds(), "count": len(values)}
+    return [compact_value(v, digits) for v in values]
+
+
+def summarize_column(values: Sequence[Any], digits: int = 6) -> Dict[str, Any]:
+    """Count, nulls and min/max/mean (numbers), min/max (dates) or distinct values (other)."""
+    present = [v for v in values if v is not None]
+    summary: Dict[str, Any] = {"count": len(present), "nulls": len(values) - len(present)}
+    if not present:
+        return summary
+    kind = column_type(present)
+    if kind in ("int", "float"):
+        numbers = [float(v) for v in present]
+        summary.update(
+            min=compact_value(min(numbers), digits),
+            max=compact_value(max(numbers), digits),
+            mean=compact_value(sum(numbers) / len(numbers), digits),
+        )
+    elif kind in ("datetime", "date"):
+        summary.update(min=compact_value(min(present), digits), max=compact_value(max(present), digits))
+    else:
+        distinct = {compact_value(v, digits) if not isinstance(v, (list, dict)) else str(v) for v in present}
+        summary["distinct"] = len(distinct)
+        if len(distinct) <= 10:
+            summary["values"] = sorted(distinct, key=str)
+    return summary
+
+
+def encode_table(
+    columns: Sequence[str],
+    data: Sequence[Sequence[Any]],
+    token_budget: Optional[int] = None,
+    digits: int = 6,
+    sample_rows: int = 5,
+) -> Dict[str, Any]:
+    """Encode a query result column-major, or as a summary if it is too large.
+
+    Args:
+        columns: Column names
+        data: Values per column (``data[i]`` holds the values of ``columns[i]``)
+        token_budget: Estimated tokens above which the summary is returned (None for no limit)
+        digits: Significant digits of the summary statistics
+        sample_rows: Rows shown at the start and end of a summary
+
+    Returns:
+        ``{"columns", "types", "data", "row_count"}``, or ``{"columns", "types",
+        "row_count", "summary", "head", "tail", "note"}`` in summary mode
+    """
+    row_count = len(data[0]) if data else 0
+    types = [column_type(values) for values in data]
+    result: Dict[str, Any] = {
+        "columns": list(columns),
+        "types": types,
+        "data": [encode_column(values) for values in data],
+        "row_count": row_count,
+    }
+    if token_budget is None or row_count <= 2 * sample_rows or estimate_tokens(result) <= token_budget:
+        return result
+
+    return {
+        "columns": list(columns),
+        "types": types,
+        "row_count": row_count,
+        "summary": [summarize_column(values, digits) for values in data],
+        "head": [encode_column(values[:sample_rows]) for values in data],
+        "tail": [encode_column(values[-sample_rows:]) for values in data],
+        "note": (
+            f"{row_count} rows exceed the {token_budget}-token result budget; showing per-column "
+            f"statistics and the first/last {sample_rows} rows. Filter or aggregate in SQL for exact values."
+        ),
+    }
+
@@ -1,9 +1,9 @@
 """Search-related tools (e.g., Google Search, web scraping)."""
 
-from typing import Any, Optional
-import httpx
+from typing import Any, Dict, Optional
 
 from src.tools.base import BaseTool, register_tool
+from src.tools.http_client import get_http_client
 
 
 class GoogleSearchTool(BaseTool):
@@ -11,6 +11,8 @@ class GoogleSearchTool(BaseTool):
 
     name = "google_search"
     description = "Search the web using Google. Useful for finding current information."
+    cacheable = True
+    cache_ttl = 3600.0
 
     def __init__(self, api_key: Optional[str] = None, search_engine_id: Optional[str] = None):
         """Initialize Google Search tool.
@@ -45,10 +47,9 @@ class GoogleSearchTool(BaseTool):
             "num": num_results,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        response = await get_http_client().get(url, params=params)
+        response.raise_for_status()
+        data = response.json()
 
         return {
             "query": query,
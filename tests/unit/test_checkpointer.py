@@ -0,0 +1,101 @@
+"""Unit tests for checkpointer configuration."""
+
+from itertools import count
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.agent.state import DeltaAgentState
+from src.config import settings
+from src.storage import checkpointer
+from src.storage.checkpointer import (
+    CheckpointerUnavailable,
+    check_checkpointer,
+    close_checkpointer,
+    get_checkpointer,
+    open_checkpointer,
+)
+from src.storage.serde import CompressedSerializer
+
+
+@pytest.fixture(autouse=True)
+def reset_checkpointer(monkeypatch):
+    """Start every test without an open checkpointer."""
+    monkeypatch.setattr(checkpointer, "_checkpointer", None)
+    monkeypatch.setattr(checkpointer, "_pool", None)
+
+
+async def test_memory_backend_lifecycle(monkeypatch):
+    """The memory backend opens, reports healthy and closes."""
+    monkeypatch.setattr(settings, "CHECKPOINTER_BACKEND", "memory")
+
+    saver = await open_checkpointer()
+    assert isinstance(saver, MemorySaver)
+    assert get_checkpointer() is saver
+    assert await check_checkpointer() == {"backend": "memory", "ok": True}
+
+    await close_checkpointer()
+    assert checkpointer._checkpointer is None
+
+
+async def test_persistent_backend_fails_loudly(monkeypatch):
+    """A persistent backend that was not opened is an error, not a MemorySaver."""
+    monkeypatch.setattr(settings, "CHECKPOINTER_BACKEND", "postgres")
+
+    with pytest.raises(CheckpointerUnavailable):
+        get_checkpointer()
+    status = await check_checkpointer()
+    assert status["ok"] is False
+
+    monkeypatch.setattr(settings, "CHECKPOINTER_BACKEND", "sqlite")
+    with pytest.raises(CheckpointerUnavailable):
+        await open_checkpointer()
+
+
+def test_compressed_serializer_round_trip():
+    """Large payloads are compressed and tagged; uncompressed data still loads."""
+    serde = CompressedSerializer(codec="zlib", min_size=64)
+    value = {"messages": ["水文站 observation " * 50], "step": 3}
+
+    type_, data = serde.dumps_typed(value)
+    assert type_ == "msgpack+zlib"
+    assert serde.loads_typed((type_, data)) == value
+    assert serde.get_stats()["ratio"] > 5
+
+    # Payloads written without compression (or below min_size) load unchanged
+    assert serde.loads_typed(JsonPlusSerializer().dumps_typed(value)) == value
+    assert serde.dumps_typed({"a": 1})[0] == "msgpack"
+
+
+def _stored_bytes(saver):
+    return sum(len(blob[1]) for blob in saver.blobs.values()) + sum(
+        len(write[2][1]) for writes in saver.writes.values() for write in writes.values()
+    )
+
+
+async def test_delta_state_shrinks_checkpoints_and_reloads():
+    """Delta-encoded history stores less per step and rebuilds the same messages."""
+
+    def build(saver, state_schema):
+        replies = (AIMessage(content=f"answer {i} " + "detail " * 100) for i in count())
+        return create_agent(model=GenericFakeChatModel(messages=replies), checkpointer=saver, state_schema=state_schema)
+
+    config = {"configurable": {"thread_id": "t"}}
+    savers = {}
+    for name, schema in (("full", None), ("delta", DeltaAgentState)):
+        saver = savers[name] = MemorySaver(serde=CompressedSerializer(codec="zlib"))
+        agent = build(saver, schema)
+        for i in range(30):
+            await agent.ainvoke({"messages": [{"role": "user", "content": f"q{i}"}]}, config=config)
+
+    assert _stored_bytes(savers["delta"]) * 5 < _stored_bytes(savers["full"])
+
+    # A fresh graph on the same saver rebuilds the full history
+    state = await build(savers["delta"], DeltaAgentState).aget_state(config)
+    messages = state.values["messages"]
+    assert len(messages) == 60
+    assert [m.content for m in messages[:3:2]] == ["q0", "q1"]
@@ -0,0 +1,191 @@
+"""Unit tests for agent concurrency controls."""
+
+import asyncio
+
+import pytest
+
+from src.agent.concurrency import (
+    AdmissionController,
+    AdmissionRejected,
+    KeyedLock,
+    SingleFlight,
+    normalize_input,
+)
+
+
+async def test_single_flight_coalesces_concurrent_calls():
+    """Concurrent calls with one key share a single execution."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "answer"
+
+    results = await asyncio.gather(*(flight.do("q", work) for _ in range(5)))
+    assert results == ["answer"] * 5
+    assert calls == 1
+    assert flight.get_stats() == {"in_flight": 0, "executions": 1, "coalesced": 4}
+
+    # Once finished, the next call runs again
+    await flight.do("q", work)
+    assert calls == 2
+
+
+async def test_single_flight_propagates_errors_and_survives_cancellation():
+    """Errors reach every waiter; a cancelled waiter does not cancel the work."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 42
+
+    leader = asyncio.ensure_future(flight.do("s", slow))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(flight.do("s", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == 42
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+def test_normalize_input():
+    """Whitespace differences do not split coalescing keys."""
+    assert normalize_input("  北京  天气 ") == "北京 天气"
+
+
+async def test_keyed_lock_serializes_turns_in_order():
+    """Work on one key runs one at a time, in arrival order; keys are released."""
+    locks = KeyedLock(max_pending=3)
+    order = []
+
+    async def turn(name):
+        async with locks.hold("session"):
+            order.append(f"{name}-start")
+            await asyncio.sleep(0.01)
+            order.append(f"{name}-end")
+
+    tasks = [asyncio.ensure_future(turn(n)) for n in "abc"]
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected):
+        async with locks.hold("session"):
+            pass
+    await asyncio.gather(*tasks)
+
+    assert order == ["a-start", "a-end", "b-start", "b-end", "c-start", "c-end"]
+    assert len(locks) == 0
+
+
+async def test_admission_controller_bounds_concurrency_and_queue():
+    """Callers beyond concurrency + queue depth are rejected with Retry-After."""
+    admission = AdmissionController(max_concurrency=1, max_queue=1)
+    release = asyncio.Event()
+
+    async def hold():
+        async with admission.admit():
+            await release.wait()
+
+    running = asyncio.ensure_future(hold())
+    queued = asyncio.ensure_future(hold())
+    await asyncio.sleep(0)
+    assert admission.get_stats()["active"] == 1
+    assert admission.get_stats()["waiting"] == 1
+
+    with pytest.raises(AdmissionRejected) as exc_info:
+        async with admission.admit():
+            pass
+    assert exc_info.value.retry_after >= 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert admission.get_stats()["admitted"] == 2
+    assert admission.get_stats()["rejected"] == 1
+
+
+async def test_admission_controller_queue_timeout():
+    """Waiting longer than the queue timeout is rejected."""
+    admission = AdmissionController(max_concurrency=1, max_queue=5, queue_timeout=0.01)
+    async with admission.admit():
+        with pytest.raises(AdmissionRejected):
+            async with admission.admit():
+                pass
+    assert admission.waiting == 0
+
+
+async def test_anonymous_requests_are_serialized_on_the_default_thread(monkeypatch):
+    """Requests without a session share the "default" thread, so they take its lock too."""
+    import httpx
+    from langchain_core.messages import AIMessage
+
+    from src import main
+
+    running = peak = 0
+    threads = []
+
+    class Agent:
+        async def ainvoke(self, state, config):
+            nonlocal running, peak
+            threads.append(config["configurable"]["thread_id"])
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return {"messages": [AIMessage(content="ok")]}
+
+    monkeypatch.setattr(main, "_agent", Agent())
+    monkeypatch.setattr(main.settings, "AGENT_COALESCE_REQUESTS", False)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.post("/agent/invoke", json={"message": f"q{i}"}) for i in range(3))
+        )
+
+    assert [r.status_code for r in responses] == [200] * 3
+    assert threads == ["default"] * 3
+    assert peak == 1
+
+
+async def test_coalesced_requests_run_on_a_discarded_thread(monkeypatch):
+    """With coalescing on, identical anonymous requests share one run on a throwaway thread."""
+    import httpx
+    from langchain_core.messages import AIMessage
+    from langgraph.checkpoint.memory import InMemorySaver
+
+    from src import main
+
+    threads = []
+    deleted = []
+
+    class Saver(InMemorySaver):
+        async def adelete_thread(self, thread_id):
+            deleted.append(thread_id)
+
+    class Agent:
+        checkpointer = Saver()
+
+        async def ainvoke(self, state, config):
+            threads.append(config["configurable"]["thread_id"])
+            await asyncio.sleep(0.05)
+            return {"messages": [AIMessage(content="ok")]}
+
+    monkeypatch.setattr(main, "_agent", Agent())
+    monkeypatch.setattr(main.settings, "AGENT_COALESCE_REQUESTS", True)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.post("/agent/invoke", json={"message": "Flood level?"}) for _ in range(3))
+        )
+
+    assert [r.json() for r in responses] == [{"response": "ok", "session_id": None}] * 3
+    assert len(threads) == 1 and threads[0].startswith("stateless-")
+    assert deleted == threads
@@ -0,0 +1,131 @@
+"""Unit tests for the database query tool."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from src.storage.query_cache import QueryCache, is_read_only, read_tables, written_tables
+from src.tools import data_tools
+from src.tools.data_tools import DatabaseQueryTool, dispose_engines, get_async_engine, to_async_url
+from src.tools.result_encoding import compact_value, encode_table, estimate_tokens
+
+
+@pytest.fixture
+async def database_url(tmp_path):
+    """SQLite database with 1000 observations."""
+    url = f"sqlite:///{tmp_path / 'hydro.db'}"
+    async with get_async_engine(url).begin() as conn:
+        await conn.execute(text("CREATE TABLE obs (station TEXT, level REAL)"))
+        await conn.execute(
+            text("INSERT INTO obs VALUES (:station, :level)"),
+            [{"station": f"S{i:04d}", "level": i / 10} for i in range(1000)],
+        )
+    yield url
+    await dispose_engines()
+
+
+def test_async_urls():
+    assert to_async_url("postgresql://u:p@db:5432/hydro") == "postgresql+asyncpg://u:p@db:5432/hydro"
+    assert to_async_url("postgresql+psycopg2://u@db/hydro") == "postgresql+asyncpg://u@db/hydro"
+    assert to_async_url("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+async def test_streams_within_row_and_byte_budgets(database_url):
+    """Fetching stops at the row limit or the byte budget and reports why."""
+    tool = DatabaseQueryTool(database_url, batch_size=50)
+
+    result = await tool.execute("SELECT station, level FROM obs ORDER BY station", limit=10)
+    assert result["row_count"] == 10
+    assert result["columns"] == ["station", "level"]
+    assert [column[0] for column in result["data"]] == ["S0000", 0]
+    assert result["truncated"] == "rows"
+
+    result = await tool.execute("SELECT station FROM obs LIMIT 5", limit=10)
+    assert result["row_count"] == 5 and "truncated" not in result
+
+    small = DatabaseQueryTool(database_url, max_bytes=100)
+    result = await small.execute("SELECT station FROM obs", limit=500)
+    assert result["truncated"] == "bytes"
+    assert result["row_count"] == 20  # 5 characters per row
+
+    # One pooled engine per database
+    assert tool.engine is small.engine
+    assert len(data_tools._engines) == 1
+
+
+async def test_errors_are_returned(database_url):
+    result = await DatabaseQueryTool(database_url).execute("SELECT * FROM missing")
+    assert "error" in result
+
+
+async def test_result_cache_and_table_invalidation(database_url):
+    """Repeated queries hit the cache until a write invalidates their table."""
+    cache = QueryCache(ttl=60)
+    tool = DatabaseQueryTool(database_url, cache=cache)
+    query = "SELECT COUNT(*) AS n FROM obs WHERE level > :level"
+
+    first = await tool.execute(query, params={"level": 50})
+    again = await tool.execute("select count(*) as n\n  from OBS where level > :level;", params={"level": 50})
+    assert again is first
+    other = await tool.execute(query, params={"level": 90})
+    assert other["data"] == [[99]]
+    assert cache.get_stats()["hits"] == 1
+
+    async with get_async_engine(database_url).begin() as conn:
+        await conn.execute(text("DELETE FROM obs WHERE level > 95"))
+    cache.invalidate_tables("obs")
+    assert (await tool.execute(query, params={"level": 90}))["data"] == [[50]]
+
+    # Statements that may write are committed, bypass the cache and invalidate what they touch
+    await tool.execute("SELECT station FROM obs", limit=1)
+    assert await tool.execute(query, params={"level": 0}) == {**first, "data": [[950]]}
+    assert await tool.execute("UPDATE obs SET level = 0;") == {"rowcount": 951}
+    assert cache.get(cache.key(database_url, "SELECT station FROM obs LIMIT 2", None, 1)) is None
+    assert (await tool.execute(query, params={"level": 0}))["data"] == [[0]]
+    assert (await tool.execute("SELECT SUM(level) AS s FROM obs"))["data"] == [[0]]
+
+
+def test_table_extraction():
+    assert read_tables('SELECT * FROM stations s, public."Obs" AS o JOIN basin b ON b.id = s.basin') == {
+        "stations",
+        "obs",
+        "basin",
+    }
+    assert read_tables("SELECT 'from fake' FROM real_t") == {"real_t"}
+    assert written_tables("INSERT INTO public.stations VALUES (1)") == {"stations"}
+    assert is_read_only("SELECT 'delete' FROM t")
+    assert not is_read_only("WITH d AS (DELETE FROM t RETURNING *) SELECT * FROM d")
+
+
+def test_columnar_encoding_and_summary():
+    """Columns are encoded once and compactly; large results become a summary."""
+    start = datetime(2024, 7, 1)
+    times = [start + timedelta(hours=i) for i in range(500)]
+    levels = [12.3456789 + i / 7 for i in range(500)]
+    table = encode_table(["station", "time", "level"], [["S01"] * 500, times, levels])
+
+    assert table["types"] == ["text", "datetime", "float"]
+    assert table["data"][0] == {"constant": "S01", "count": 500}
+    assert table["data"][1] == {"start": "2024-07-01", "step_seconds": 3600.0, "count": 500}
+    assert table["data"][2][:2] == levels[:2]
+    records = [{"station": "S01", "time": t, "level": v} for t, v in zip(times, levels)]
+    assert estimate_tokens(table) * 2 < estimate_tokens(records)
+
+    summary = encode_table(["time", "level"], [times, levels], token_budget=200, sample_rows=3)
+    assert "data" not in summary and summary["row_count"] == 500
+    assert summary["summary"][0] == {"count": 500, "nulls": 0, "min": "2024-07-01", "max": "2024-07-21T19:00:00"}
+    assert summary["summary"][1]["min"] == 12.3457
+    assert summary["tail"][1] == levels[-3:]
+    assert estimate_tokens(summary) < 200
+
+
+def test_full_output_keeps_exact_numbers():
+    """Only summary statistics are rounded; full results show the database's values."""
+    amounts = [Decimal("1234.5678"), Decimal("0.1"), Decimal("12345678901234567.89"), Decimal("42")]
+    measurements = [1234567.0, 0.1 + 0.2, 2.0**60, float("nan")]
+    table = encode_table(["amount", "value"], [amounts, measurements])
+    assert table["data"][0] == [1234.5678, 0.1, "12345678901234567.89", 42]
+    assert table["data"][1] == [1234567, 0.30000000000000004, 2.0**60, "nan"]
+    assert compact_value(1234567.0, 6) == 1234570
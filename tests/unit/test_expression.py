@@ -0,0 +1,94 @@
+"""Unit tests for the calculate expression engine."""
+
+import json
+
+import pytest
+
+from src.tools.example_tools import calculate
+from src.tools.expression import ExpressionError, compile_expression, evaluate
+
+
+def test_arithmetic_and_functions():
+    assert evaluate("2 + 3 * 4") == 14
+    assert evaluate("round(sqrt(2) * pi, 3)") == 4.443
+    assert evaluate("max(3, 7, 5)") == 7
+    assert calculate.func("max()").startswith("Error calculating")
+    assert calculate.func("0.1 + 0.2") == "0.30000000000000004"
+    assert calculate.func("6 * 7") == "42"
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "__import__('os').system('true')",
+        "().__class__.__bases__",
+        "open('/etc/passwd')",
+        "[x for x in range(10)]",
+        "(lambda: 1)()",
+        "q[0]",
+        "'a' * 10",
+        "sqrt",
+        "round(x, digits=2)",
+        "_array",
+    ],
+)
+def test_rejects_unsafe_syntax(expression):
+    with pytest.raises(ExpressionError):
+        evaluate(expression, {"x": 1, "q": [1]})
+
+
+def test_runaway_numbers_fail_fast():
+    assert calculate.func("9**9**9").startswith("Error")
+    assert evaluate("10.0 ** x", {"x": [1, 400]})[1] == float("inf")
+
+
+def test_vectorized_evaluation_and_budgets(monkeypatch):
+    """One expression applies to whole arrays; inputs beyond the budget are refused."""
+    cfs = [100.0 * i for i in range(1000)]
+    cms = evaluate("cfs * 0.0283168", {"cfs": cfs})
+    assert len(cms) == 1000 and cms[10] == pytest.approx(28.3168)
+    assert evaluate("sum(q) * 86400 / 1e6", {"q": [1.5, 2.5, 4.0]}) == pytest.approx(0.6912)
+    assert evaluate("where(level > warn, level - warn, 0)", {"level": [3, 5, 9], "warn": 4}) == [0, 1, 5]
+    assert json.loads(calculate.func("[1, 2, 3] * k", {"k": 2})) == [2, 4, 6]
+
+    assert compile_expression("a + b") is compile_expression("a + b")
+    with pytest.raises(ExpressionError, match="elements"):
+        compile_expression("x * 2").evaluate({"x": cfs}, max_elements=100)
+    monkeypatch.setattr("src.tools.expression.settings.CALCULATE_MAX_OPERATIONS", 1000)
+    with pytest.raises(ExpressionError, match="budget"):
+        evaluate("x * 2", {"x": cfs})
+    assert "Missing value" in calculate.func("x + 1")
+
+
+def test_broadcasting_cannot_exceed_the_budget():
+    """A column times a row would broadcast to an outer product: inputs must be flat."""
+    n = 20000
+    with pytest.raises(ExpressionError, match="flat list"):
+        evaluate("sum(x * y)", {"x": [[i] for i in range(n)], "y": list(range(n))})
+    with pytest.raises(ExpressionError, match="Nested"):
+        evaluate("sum([[1], [2]] * y)", {"y": list(range(n))})
+    with pytest.raises(ExpressionError):
+        evaluate("x * y", {"x": [1, 2, 3], "y": [1, 2]})
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("12345678901234", "12345678901234"),
+        ("10**15+1", "1000000000000001"),
+        ("2**53+1", "9007199254740993"),
+        ("123456789*987654321", "121932631112635269"),
+        ("2**-1", "0.5"),
+    ],
+)
+def test_integers_are_exact(expression, expected):
+    assert calculate.func(expression) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["1 / 0", "x / 0", "10 // 0", "10 % 0", "mean([])", "log(0)", "sqrt(-1)", "(-8) ** (1 / 3)", "exp(1000)", "2 ** 5000"],
+)
+def test_undefined_results_are_errors(expression, capfd):
+    assert calculate.func(expression, {"x": 1.5}).startswith("Error calculating")
+    assert capfd.readouterr().err == ""
@@ -0,0 +1,57 @@
+"""Unit tests for bounded conversation history."""
+
+from itertools import cycle
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.agent.history import SUMMARY_MESSAGE_ID, HistoryMiddleware
+
+
+def _turns(n):
+    messages = []
+    for i in range(n):
+        messages.append(HumanMessage(content=f"question {i}", id=f"h{i}"))
+        messages.append(AIMessage(content="", id=f"c{i}", tool_calls=[{"name": "t", "args": {}, "id": f"call{i}"}]))
+        messages.append(ToolMessage(content="result", tool_call_id=f"call{i}", id=f"t{i}"))
+        messages.append(AIMessage(content=f"answer {i}", id=f"a{i}"))
+    return messages
+
+
+def test_window_cuts_at_turn_boundaries():
+    """Trimming keeps whole turns and starts only above the limit."""
+    history = HistoryMiddleware(policy="window", max_turns=4, max_tokens=None, keep_turns=2)
+
+    assert history._cutoff(_turns(4)) == 0
+    messages = _turns(5)
+    cutoff = history._cutoff(messages)
+    assert messages[cutoff].id == "h3"
+
+    # A token budget trims too, but never into the current turn
+    history = HistoryMiddleware(policy="window", max_turns=None, max_tokens=10)
+    messages = _turns(3)
+    assert messages[history._cutoff(messages)].id == "h2"
+
+
+async def test_summarize_policy_keeps_thread_bounded():
+    """Old turns are folded into one rolling summary at the head of the history."""
+    agent_model = GenericFakeChatModel(messages=cycle([AIMessage(content="ok")]))
+    summarizer = GenericFakeChatModel(messages=cycle([AIMessage(content="user asked questions")]))
+    agent = create_agent(
+        model=agent_model,
+        checkpointer=MemorySaver(),
+        middleware=[HistoryMiddleware(max_turns=3, max_tokens=None, keep_turns=2, model=summarizer)],
+    )
+    config = {"configurable": {"thread_id": "t"}}
+
+    for i in range(8):
+        result = await agent.ainvoke({"messages": [{"role": "user", "content": f"q{i}"}]}, config=config)
+
+    messages = result["messages"]
+    assert messages[0].id == SUMMARY_MESSAGE_ID
+    assert "user asked questions" in messages[0].content
+    assert sum(m.id == SUMMARY_MESSAGE_ID for m in messages) == 1
+    assert len([m for m in messages if isinstance(m, HumanMessage)]) <= 4
+    assert messages[-2].content == "q7"
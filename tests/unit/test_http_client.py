@@ -0,0 +1,64 @@
+"""Unit tests for the shared HTTP client."""
+
+import asyncio
+
+import httpx
+
+from src.tools import http_client
+from src.tools.api_tools import HTTPRequestTool
+from src.tools.http_client import HostLimitedTransport, close_http_client, get_http_client
+
+
+async def test_host_limited_transport_caps_concurrency_per_host():
+    """At most ``max_per_host`` requests to one host are in flight at once."""
+    active = {"a.test": 0, "b.test": 0}
+    peak = {"a.test": 0, "b.test": 0}
+
+    async def handler(request):
+        host = request.url.host
+        active[host] += 1
+        peak[host] = max(peak[host], active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+
+        async def body():
+            yield host.encode()
+
+        # Streamed body: the slot is held until the body is consumed
+        return httpx.Response(200, content=body())
+
+    transport = HostLimitedTransport(httpx.MockTransport(handler), max_per_host=2)
+    async with httpx.AsyncClient(transport=transport) as client:
+        urls = ["http://a.test/"] * 6 + ["http://b.test/"] * 2
+        responses = await asyncio.gather(*(client.get(url) for url in urls))
+
+    assert [r.text for r in responses] == [url[7:13] for url in urls]
+    assert peak == {"a.test": 2, "b.test": 2}
+    # Every slot was released once the bodies were read
+    assert all(s._value == 2 for s in transport._semaphores.values())
+
+
+async def test_http_tool_uses_shared_client(monkeypatch):
+    """The HTTP tool reuses the process-wide client instead of opening its own."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.path)
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "_client", client)
+
+    assert get_http_client() is client
+    tool = HTTPRequestTool()
+    first = await tool.execute("http://api.test/one")
+    second = await tool.execute("http://api.test/two", timeout=1.0)
+
+    assert first["body"] == {"ok": True}
+    assert second["status_code"] == 200
+    assert seen == ["/one", "/two"]
+    assert get_http_client() is client
+
+    await close_http_client()
+    assert client.is_closed
+    assert http_client._client is None
@@ -0,0 +1,11 @@
+"""Cold-start import checks (the timing budget is enforced by benchmarks/import_benchmark.py)."""
+
+from benchmarks.import_benchmark import eager_lazy_modules, import_times
+
+
+def test_app_import_defers_heavy_modules():
+    """Provider SDKs, database/template layers and NumPy load on first use, not at startup."""
+    times = import_times("src.main")
+    assert "src.main" in times
+    assert eager_lazy_modules(times) == []
+    assert "src.tools.example_tools" not in times and "src.storage.memory" not in times
@@ -0,0 +1,58 @@
+"""Unit tests for the chat-model response cache."""
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from src.storage.cache import LRUCache
+from src.storage.llm_cache import InMemoryLLMCache
+
+
+class KeywordEmbeddings:
+    """Embeds text by counting a few keywords (enough to test similarity)."""
+
+    words = ["weather", "beijing", "flow"]
+
+    def embed_query(self, text):
+        return [float(text.lower().count(w)) + 1e-3 for w in self.words]
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+async def test_exact_cache_ignores_whitespace():
+    """Equivalent histories hit the cache; the provider is called once."""
+    cache = InMemoryLLMCache()
+    model = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    assert (await model.ainvoke([HumanMessage("What is  the weather?")])).content == "first"
+    assert (await model.ainvoke([HumanMessage(" What is the weather? ")])).content == "first"
+    assert (await model.ainvoke([HumanMessage("Something else")])).content == "second"
+
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+async def test_semantic_cache():
+    """Similar questions after an identical history share a response."""
+    cache = InMemoryLLMCache(embeddings=KeywordEmbeddings(), semantic_threshold=0.99)
+    model = FakeListChatModel(responses=["sunny", "high"], cache=cache)
+
+    assert (await model.ainvoke("Beijing weather today?")).content == "sunny"
+    assert (await model.ainvoke("what's the weather in Beijing")).content == "sunny"
+    assert (await model.ainvoke("river flow")).content == "high"
+    assert cache.get_stats()["semantic_hits"] == 1
+
+
+def test_lru_cache_eviction_and_ttl():
+    """LRU entries are evicted by count and expire after their TTL."""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+
+    cache.set("d", 4, ttl=0)
+    assert cache.get("d") is None
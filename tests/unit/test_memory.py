@@ -0,0 +1,164 @@
+"""Unit tests for long-term memory storage and search."""
+
+import numpy as np
+
+from src.storage.ann import IVFIndex
+from src.storage.bm25 import BM25Index
+from src.storage.memory import MemoryManager
+from src.storage.vector_index import VectorIndex
+
+
+def test_vector_index_top_k():
+    """Exact search returns the nearest rows in score order."""
+    index = VectorIndex(initial_capacity=2)
+    index.add([1.0, 0.0])
+    index.add([0.0, 1.0])
+    index.add([1.0, 1.0])
+
+    results = index.search([1.0, 0.1], limit=2)
+    assert [row for row, _ in results] == [0, 2]
+    assert results[0][1] > results[1][1]
+
+
+def test_vector_index_threshold_and_delete():
+    """Threshold and deleted rows are honored."""
+    index = VectorIndex()
+    rows = [index.add(v) for v in np.eye(3)]
+
+    assert [row for row, _ in index.search([1, 0, 0], limit=3, threshold=0.5)] == [rows[0]]
+    index.delete(rows[0])
+    assert index.search([1, 0, 0], limit=3, threshold=0.5) == []
+
+
+async def test_search_memories_by_embedding():
+    """Embedding search honors limit and threshold."""
+    manager = MemoryManager()
+    await manager.store_memory("rainfall in Beijing", embedding=[1.0, 0.0, 0.0])
+    await manager.store_memory("river discharge", embedding=[0.0, 1.0, 0.0])
+    await manager.store_memory("rain and flow", embedding=[0.7, 0.7, 0.0])
+
+    results = await manager.search_memories("rain", limit=5, threshold=0.6, query_embedding=[1.0, 0.0, 0.0])
+    assert [r["content"] for r in results] == ["rainfall in Beijing", "rain and flow"]
+    assert results[0]["score"] >= results[1]["score"]
+
+    results = await manager.search_memories("rain", limit=1, threshold=0.0, query_embedding=[1.0, 0.0, 0.0])
+    assert len(results) == 1
+
+
+async def test_search_memories_keyword_fallback():
+    """Without embeddings, search falls back to keyword matching."""
+    manager = MemoryManager()
+    await manager.store_memory("Yangtze water level")
+    await manager.store_memory("Yellow River sediment")
+
+    results = await manager.search_memories("river")
+    assert [r["content"] for r in results] == ["Yellow River sediment"]
+
+
+async def test_delete_and_compact():
+    """Deletes are O(1) tombstones and compaction keeps IDs resolvable."""
+    manager = MemoryManager(compact_min=2, compact_ratio=0.5)
+    ids = [await manager.store_memory(f"m{i}", embedding=[float(i), 1.0]) for i in range(4)]
+    assert len(set(ids)) == 4
+
+    assert await manager.delete_memory(ids[0])
+    assert not await manager.delete_memory(ids[0])
+    assert await manager.get_memory(ids[0]) is None
+
+    # Third tombstone crosses the ratio and triggers compaction
+    await manager.delete_memory(ids[1])
+    await manager.delete_memory(ids[2])
+    assert len(manager) == 1
+    assert manager._store.tombstones == 0
+
+    memory = await manager.get_memory(ids[3])
+    assert memory["content"] == "m3"
+    results = await manager.search_memories("m", threshold=0.0, query_embedding=[3.0, 1.0])
+    assert [r["id"] for r in results] == [ids[3]]
+
+
+async def test_mmap_store_persists_across_instances(tmp_path):
+    """A persistent store is reopened with its memories and embeddings intact."""
+    manager = MemoryManager(path=str(tmp_path))
+    first = await manager.store_memory("no embedding yet", metadata={"station": "A"})
+    second = await manager.store_memory("flood peak", embedding=[0.0, 1.0])
+
+    reopened = MemoryManager(path=str(tmp_path))
+    assert len(reopened) == 2
+    assert (await reopened.get_memory(first))["metadata"] == {"station": "A"}
+    results = await reopened.search_memories("", threshold=0.5, query_embedding=[0.0, 2.0])
+    assert [r["id"] for r in results] == [second]
+
+    # Deletes and appends by one instance are visible to the other
+    await manager.delete_memory(first)
+    third = await manager.store_memory("low flow", embedding=[1.0, 0.0])
+    assert await reopened.get_memory(first) is None
+    assert (await reopened.get_memory(third))["content"] == "low flow"
+
+
+async def test_mmap_store_compact(tmp_path):
+    """Compaction rewrites the store as a new generation."""
+    manager = MemoryManager(path=str(tmp_path))
+    ids = [await manager.store_memory(f"m{i}", embedding=[1.0, float(i)]) for i in range(3)]
+    await manager.delete_memory(ids[1])
+    manager.compact()
+
+    reopened = MemoryManager(path=str(tmp_path))
+    assert [m["id"] for m in reopened.get_all_memories()] == [ids[0], ids[2]]
+    assert (await reopened.get_memory(ids[2]))["content"] == "m2"
+
+
+async def test_ann_search_matches_exact():
+    """IVF search probing every list equals exact search, incl. deletes and compaction."""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 8))
+    manager = MemoryManager(ann=IVFIndex(n_lists=4, n_probe=4, min_train_size=100), compact_min=1, compact_ratio=0.0)
+    exact = MemoryManager()
+    ids = []
+    for i, vector in enumerate(vectors):
+        ids.append(await manager.store_memory(f"m{i}", embedding=vector.tolist()))
+        await exact.store_memory(f"m{i}", embedding=vector.tolist())
+
+    query = vectors[7].tolist()
+    found = await manager.search_memories("", limit=5, threshold=-1.0, query_embedding=query)
+    expected = await exact.search_memories("", limit=5, threshold=-1.0, query_embedding=query)
+    assert manager.ann.is_trained
+    assert [r["content"] for r in found] == [r["content"] for r in expected]
+
+    # Deleted memories disappear; compaction renumbers slots in the index
+    await manager.delete_memory(ids[7])
+    found = await manager.search_memories("", limit=5, threshold=-1.0, query_embedding=query)
+    assert "m7" not in [r["content"] for r in found]
+    assert manager._store.tombstones == 0
+    added = await manager.store_memory("new", embedding=query)
+    found = await manager.search_memories("", limit=1, threshold=-1.0, query_embedding=query)
+    assert [r["id"] for r in found] == [added]
+
+
+def test_bm25_ranks_chinese_and_english():
+    """BM25 ranks mixed-language documents by term relevance."""
+    index = BM25Index()
+    index.add(0, "北京今天降雨量 12 mm")
+    index.add(1, "上海气温 30 度")
+    index.add(2, "北京 降雨 降雨 rainfall warning")
+
+    assert [slot for slot, _ in index.search("降雨")] == [2, 0]
+    assert [slot for slot, _ in index.search("Rainfall")] == [2]
+
+    index.delete(2, "北京 降雨 降雨 rainfall warning")
+    assert [slot for slot, _ in index.search("降雨")] == [0]
+
+
+async def test_hybrid_search_fuses_scores():
+    """Hybrid mode lets keyword evidence reorder near-tied embedding matches."""
+    manager = MemoryManager()
+    await manager.store_memory("station metadata", embedding=[1.0, 0.0])
+    await manager.store_memory("黄河 flood report", embedding=[0.99, 0.14])
+
+    vector = await manager.search_memories("黄河", threshold=0.0, query_embedding=[1.0, 0.0], mode="vector")
+    hybrid = await manager.search_memories("黄河", query_embedding=[1.0, 0.0], mode="hybrid")
+    assert vector[0]["content"] == "station metadata"
+    assert hybrid[0]["content"] == "黄河 flood report"
+
+    keyword = await manager.search_memories("flood", mode="keyword")
+    assert [r["content"] for r in keyword] == ["黄河 flood report"]
@@ -0,0 +1,87 @@
+"""Unit tests for the bounded in-memory checkpointer."""
+
+import time
+from itertools import count
+from typing import Annotated, List
+
+from langchain.agents import AgentState, create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AnyMessage
+from langgraph.channels import DeltaChannel
+from typing_extensions import Required
+
+from src.agent.state import add_message_batches
+from src.storage.memory_checkpointer import BoundedMemorySaver
+
+
+class FrequentSnapshotState(AgentState):
+    """Delta-encoded messages with a snapshot every 10 updates."""
+
+    messages: Required[Annotated[List[AnyMessage], DeltaChannel(add_message_batches, snapshot_frequency=10)]]
+
+
+def _agent(saver, state_schema=None):
+    replies = (AIMessage(content=f"answer {i}") for i in count())
+    return create_agent(model=GenericFakeChatModel(messages=replies), checkpointer=saver, state_schema=state_schema)
+
+
+async def _turns(agent, thread_id, n):
+    config = {"configurable": {"thread_id": thread_id}}
+    for i in range(n):
+        await agent.ainvoke({"messages": [{"role": "user", "content": f"{thread_id}-q{i}"}]}, config=config)
+    return config
+
+
+async def test_keeps_last_checkpoints_and_full_state():
+    """Old checkpoints are pruned; delta-encoded history still reloads completely."""
+    for schema in (None, FrequentSnapshotState):
+        saver = BoundedMemorySaver(keep_checkpoints=3)
+        config = await _turns(_agent(saver, schema), "t", 12)
+
+        stats = saver.get_stats()
+        assert stats["pruned_checkpoints"] > 0
+        assert stats["checkpoints"] < 36
+        if schema is None:
+            assert stats["checkpoints"] == 3
+
+        state = await _agent(saver, schema).aget_state(config)
+        messages = state.values["messages"]
+        assert len(messages) == 24
+        assert [m.content for m in messages[:2]] == ["t-q0", "answer 0"]
+
+
+async def test_evicts_idle_and_least_recently_used_threads():
+    """Threads beyond the budget or past the TTL are evicted as a whole."""
+    saver = BoundedMemorySaver(max_threads=2)
+    agent = _agent(saver)
+    config_a = await _turns(agent, "a", 1)
+    await _turns(agent, "b", 1)
+    await agent.aget_state(config_a)  # a is now more recent than b
+    await _turns(agent, "c", 1)
+
+    assert set(saver.storage) == {"a", "c"}
+    assert saver.get_stats()["evicted"] == 1
+
+    saver.ttl = 0.01
+    time.sleep(0.02)
+    assert await saver.aget_tuple(config_a) is None
+    assert saver.get_stats()["threads"] == 0
+    assert saver.get_stats()["bytes"] == 0
+    assert not saver.blobs and not saver.writes
+
+
+async def test_byte_budget():
+    """The byte budget evicts older threads and unknown-thread reads store nothing."""
+    probe = BoundedMemorySaver()
+    await _turns(_agent(probe), "probe", 1)
+    per_thread = probe.get_stats()["bytes"]
+
+    saver = BoundedMemorySaver(max_bytes=per_thread * 3)
+    agent = _agent(saver)
+    for i in range(6):
+        await _turns(agent, f"t{i}", 1)
+    assert saver.get_stats()["bytes"] <= per_thread * 3
+    assert "t5" in saver.storage and "t0" not in saver.storage
+
+    assert await saver.aget_tuple({"configurable": {"thread_id": "missing"}}) is None
+    assert "missing" not in saver.storage
@@ -0,0 +1,35 @@
+"""Unit tests for prompt loading and rendering."""
+
+import os
+
+from src.prompts import loader
+
+
+def test_system_prompt_strips_yaml_wrapper():
+    """The YAML system prompt renders only its 'prompt' body."""
+    rendered = loader.get_system_prompt({"user_context": "hydrologist"})
+    assert rendered.startswith("You are HydroAgent")
+    assert "variables:" not in rendered
+    assert "User context: hydrologist" in rendered
+
+
+def test_compiled_prompt_cache(tmp_path, monkeypatch):
+    """Templates are compiled once and recompiled when the file changes."""
+    monkeypatch.setattr(loader, "PROMPTS_DIR", tmp_path)
+    monkeypatch.setattr(loader, "auto_reload", True)
+    loader.clear_prompt_cache()
+
+    path = tmp_path / "greeting.txt"
+    path.write_text("Hello {{ name }}", encoding="utf-8")
+    assert loader.preload_prompts() == ["greeting"]
+
+    first = loader.get_compiled_prompt("greeting")
+    assert loader.get_compiled_prompt("greeting") is first
+    assert loader.render_prompt("greeting", {"name": "河流"}) == "Hello 河流"
+
+    path.write_text("Hi {{ name }}", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, first.mtime_ns + 1_000_000))
+    assert loader.render_prompt("greeting", {"name": "河流"}) == "Hi 河流"
+
+    loader.clear_prompt_cache()
@@ -0,0 +1,61 @@
+"""Unit tests for agent event streaming."""
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from src.agent.streaming import format_sse, message_content, stream_agent_events
+
+
+class FakeAgent:
+    """Agent stub that replays a fixed list of graph events."""
+
+    def __init__(self, events):
+        self.events = events
+
+    async def astream_events(self, inputs, config=None, version=None):
+        for event in self.events:
+            yield event
+
+
+async def test_stream_agent_events_order():
+    """Tokens, tool events and the final message are forwarded in order."""
+    agent = FakeAgent([
+        {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="Hel")}},
+        {"event": "on_chat_model_stream", "data": {"chunk": AIMessageChunk(content="lo")}},
+        {"event": "on_tool_start", "name": "get_weather", "run_id": "r1", "data": {"input": {"city": "北京"}}},
+        {"event": "on_tool_end", "name": "get_weather", "run_id": "r1", "data": {"output": "sunny"}},
+        {
+            "event": "on_chain_end",
+            "parent_ids": [],
+            "data": {"output": {"messages": [AIMessage(content="Hello")]}},
+        },
+    ])
+
+    events = [e async for e in stream_agent_events(agent, "hi", "s1")]
+
+    assert [e["event"] for e in events] == [
+        "start", "token", "token", "tool_start", "tool_end", "final",
+    ]
+    assert events[-1]["data"] == {"response": "Hello", "session_id": "s1"}
+
+
+async def test_stream_agent_events_error():
+    """A failing run ends the stream with an error event."""
+
+    class FailingAgent:
+        async def astream_events(self, inputs, config=None, version=None):
+            raise RuntimeError("boom")
+            yield  # pragma: no cover
+
+    events = [e async for e in stream_agent_events(FailingAgent(), "hi", "s1")]
+    assert events[-1] == {"event": "error", "data": {"detail": "boom"}}
+
+
+def test_message_content_blocks():
+    """List-of-blocks content is flattened to text."""
+    message = AIMessage(content=[{"type": "text", "text": "a"}, {"type": "tool_use"}, "b"])
+    assert message_content(message) == "ab"
+
+
+def test_format_sse():
+    """SSE frames carry the event name and JSON data."""
+    assert format_sse("token", {"content": "水"}) == 'event: token\ndata: {"content": "水"}\n\n'
@@ -0,0 +1,109 @@
+"""Unit tests for the two-tier checkpointer."""
+
+import asyncio
+from itertools import count
+
+from langchain.agents import create_agent
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.agent.state import DeltaAgentState
+from src.storage.tiered_checkpointer import TieredCheckpointSaver
+
+
+class SlowSaver(MemorySaver):
+    """Backend whose writes take a while to land."""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    async def aget_tuple(self, config):
+        self.reads += 1
+        return await super().aget_tuple(config)
+
+    async def aput(self, *args):
+        await asyncio.sleep(0.005)
+        return await super().aput(*args)
+
+
+def _agent(saver):
+    replies = (AIMessage(content=f"answer {i}") for i in count())
+    return create_agent(model=GenericFakeChatModel(messages=replies), checkpointer=saver, state_schema=DeltaAgentState)
+
+
+async def _turns(agent, thread_id, n):
+    config = {"configurable": {"thread_id": thread_id}}
+    for i in range(n):
+        await agent.ainvoke({"messages": [{"role": "user", "content": f"{thread_id}-q{i}"}]}, config=config)
+    return config
+
+
+async def test_hot_cache_serves_turns_and_writes_behind():
+    """Later turns read from memory; the backend catches up after a flush."""
+    backend = SlowSaver()
+    saver = TieredCheckpointSaver(backend, workers=2)
+    agent = _agent(saver)
+
+    config = await _turns(agent, "a", 5)
+    assert backend.reads == 1  # only the first turn missed
+    assert saver.get_stats()["hit_rate"] > 0.5
+
+    # State is complete before the backend has it
+    assert len((await agent.aget_state(config)).values["messages"]) == 10
+
+    await saver.flush()
+    assert saver.get_stats()["dirty_threads"] == 0
+    persisted = await _agent(backend).aget_state(config)
+    assert [m.content for m in persisted.values["messages"]][-2:] == ["a-q4", "answer 4"]
+    await saver.aclose()
+
+
+async def test_evicted_threads_read_through():
+    """Threads evicted from the LRU are reloaded from the backend."""
+    backend = MemorySaver()
+    saver = TieredCheckpointSaver(backend, max_threads=1)
+    agent = _agent(saver)
+
+    config_a = await _turns(agent, "a", 2)
+    await _turns(agent, "b", 2)
+    await saver.flush()
+    assert saver.get_stats()["evictions"] >= 1
+
+    state = await agent.aget_state(config_a)
+    assert len(state.values["messages"]) == 4
+    await saver.aclose()
+
+
+async def test_thread_flush_does_not_wait_for_other_threads():
+    """Deleting a thread waits for its own pending writes only."""
+    backend = SlowSaver()
+    saver = TieredCheckpointSaver(backend, workers=1)
+    agent = _agent(saver)
+    await _turns(agent, "busy", 1)
+    await _turns(agent, "done", 1)
+    await saver.flush()
+
+    release = asyncio.Event()
+    aput = backend.aput
+
+    async def stuck_aput(config, *args):
+        if config["configurable"]["thread_id"] == "busy":
+            await release.wait()
+        return await aput(config, *args)
+
+    backend.aput = stuck_aput
+    await _turns(agent, "busy", 1)
+    await _turns(agent, "short", 1)  # queued behind "busy" on the only writer
+    assert saver.get_stats()["dirty_threads"] == 2
+
+    await asyncio.wait_for(saver.adelete_thread("done"), 1)
+    flushing = asyncio.create_task(saver.flush("short"))
+    await asyncio.sleep(0.05)
+    assert not flushing.done()  # its writes are still queued
+
+    release.set()
+    await asyncio.wait_for(flushing, 1)
+    assert await backend.aget_tuple({"configurable": {"thread_id": "short"}}) is not None
+    await saver.aclose()
@@ -0,0 +1,128 @@
+"""Unit tests for tool result memoization."""
+
+import time
+from typing import Any, Dict
+
+from langchain.agents import create_agent
+from langchain.tools import tool
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import ToolException
+
+from src.agent.tool_executor import ToolExecutionMiddleware, ToolExecutor
+from src.storage.tool_cache import ToolCache
+from src.tools.base import BaseTool, cacheable
+from src.tools.example_tools import get_current_time, get_weather
+
+executions = []
+
+
+class GaugeTool(BaseTool):
+    name = "gauge"
+    description = "Water level of a station."
+    cacheable = True
+    cache_ttl = 0.2
+
+    async def execute(self, station: str, unit: str = "m") -> Dict[str, Any]:
+        executions.append(station)
+        if station == "offline":
+            return {"error": "station offline"}
+        return {"station": station, "level": 1.5, "unit": unit}
+
+
+class SendTool(GaugeTool):
+    name = "send"
+
+    def is_cacheable(self, arguments: Dict[str, Any]) -> bool:
+        return arguments["unit"] != "raw"
+
+
+async def test_registry_tools_memoize_by_canonical_arguments(monkeypatch):
+    """Defaults and keyword order map to one entry; errors and TTL expiry re-execute."""
+    cache = ToolCache(ttl=60)
+    monkeypatch.setattr("src.storage.tool_cache._tool_cache", cache)
+    executions.clear()
+    gauge = GaugeTool()
+
+    first = await gauge.call(station="S01")
+    assert await gauge.call(unit="m", station="S01") == first
+    assert await gauge.to_langchain_tool().ainvoke({"station": "S01"}) == first
+    await gauge.call(station="S01", unit="ft")
+    await gauge.call(station="offline")
+    await gauge.call(station="offline")
+    assert executions == ["S01", "S01", "offline", "offline"]
+
+    time.sleep(0.25)
+    await gauge.call(station="S01")
+    assert executions[-1] == "S01" and len(executions) == 5
+
+    send = SendTool()
+    await send.call(station="S02", unit="raw")
+    await send.call(station="S02", unit="raw")
+    assert executions[-2:] == ["S02", "S02"]
+
+    stats = cache.get_stats()["tools"]
+    assert stats["gauge"]["hits"] == 2
+    assert stats["gauge"]["misses"] == 5
+    assert stats["gauge"]["stores"] == 3
+    assert "send" not in stats
+
+
+def test_langchain_tools_declare_cacheability():
+    assert get_weather.metadata["cacheable"] and get_weather.metadata["cache_ttl"] == 600
+    assert not (get_current_time.metadata or {}).get("cacheable")
+
+
+calls = []
+
+
+@cacheable(ttl=60)
+@tool
+async def forecast(city: str, days: int = 3) -> str:
+    """Forecast for a city."""
+    calls.append(city)
+    if city == "nowhere":
+        raise ToolException("unknown city")
+    return f"{days} sunny days in {city}"
+
+
+forecast.handle_tool_error = True
+
+
+class ToolCallingModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+async def test_middleware_memoizes_across_turns():
+    """A repeated call in a later turn is answered from the cache under its own call ID."""
+    calls.clear()
+    cache = ToolCache(ttl=60)
+    first_turn = [
+        {"name": "forecast", "args": {"city": "Wuhan"}, "id": "call-1"},
+        {"name": "forecast", "args": {"city": "nowhere"}, "id": "call-2"},
+    ]
+    second_turn = [
+        {"name": "forecast", "args": {"city": "Wuhan", "days": 3}, "id": "call-3"},
+        {"name": "forecast", "args": {"city": "nowhere"}, "id": "call-4"},
+    ]
+    replies = iter(
+        [
+            AIMessage(content="", tool_calls=first_turn),
+            AIMessage(content="", tool_calls=second_turn),
+            AIMessage(content="ok"),
+        ]
+    )
+    executor = ToolExecutor([forecast], timeout=1, max_parallel=2, cache=cache)
+    agent = create_agent(
+        model=ToolCallingModel(messages=replies),
+        tools=[forecast],
+        middleware=[ToolExecutionMiddleware(executor)],
+    )
+
+    result = await agent.ainvoke({"messages": [{"role": "user", "content": "forecast?"}]})
+
+    assert calls == ["Wuhan", "nowhere", "nowhere"]
+    hit = next(m for m in result["messages"] if getattr(m, "tool_call_id", None) == "call-3")
+    assert hit.content == "3 sunny days in Wuhan"
+    assert cache.get_stats()["tools"]["forecast"]["hit_rate"] == 0.25
@@ -0,0 +1,144 @@
+"""Unit tests for tool execution policies and worker pools."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain.tools import tool
+
+from src.tools import execution
+from src.tools.base import BaseTool
+from src.tools.example_tools import calculate
+from src.tools.execution import ToolPools, execution_policy
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    pools = ToolPools(thread_workers=1, process_workers=1)
+    monkeypatch.setattr(execution, "_pools", pools)
+    yield pools
+    pools.shutdown()
+
+
+@execution_policy("process")
+@tool
+def spin(seconds: float) -> str:
+    """Busy-loops (holding the GIL) for the given time."""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+    return "done"
+
+
+class BlockingTool(BaseTool):
+    name = "blocking"
+    description = "Blocks its thread."
+    execution = "thread"
+
+    async def execute(self, seconds: float) -> str:
+        time.sleep(seconds)
+        return threading.current_thread().name
+
+
+async def test_thread_policy_keeps_loop_free_and_reports_queue_time(pools):
+    """Blocking tools run in the pool; calls beyond the limit wait and count as queued."""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    started = time.monotonic()
+    names = await asyncio.gather(BlockingTool().call(seconds=0.2), BlockingTool().call(seconds=0.2))
+    task.cancel()
+
+    assert all(name.startswith("tool") for name in names)
+    assert time.monotonic() - started >= 0.4  # one worker: the second call queued
+    assert ticks > 20
+    stats = pools.get_stats()["thread"]
+    assert stats["calls"] == 2 and stats["running"] == 0
+    assert stats["max_queue_seconds"] >= 0.15
+
+
+async def test_runaway_process_call_is_killed(pools):
+    """A runaway CPU-bound call times out without blocking the loop; the pool recovers."""
+    assert await calculate.ainvoke({"expression": "1 + 1"}) == "2"  # starts the worker
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(spin.ainvoke({"seconds": 60}), 0.5)
+    task.cancel()
+    assert ticks > 20
+
+    assert await calculate.ainvoke({"expression": "6 * 7"}) == "42"
+    stats = pools.get_stats()["process"]
+    assert stats["killed"] == 1 and stats["cancelled"] == 1 and stats["calls"] == 3
+
+
+async def test_killing_a_runaway_call_spares_other_calls(monkeypatch):
+    """Cancelling one process call kills only its worker; a concurrent call still completes."""
+    pools = ToolPools(thread_workers=1, process_workers=2)
+    monkeypatch.setattr(execution, "_pools", pools)
+    try:
+        healthy = asyncio.create_task(spin.ainvoke({"seconds": 1.5}))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(spin.ainvoke({"seconds": 60}), 1.0)
+        assert await healthy == "done"
+
+        stats = pools.get_stats()["process"]
+        assert stats["killed"] == 1 and stats["errors"] == 0
+    finally:
+        pools.shutdown()
+
+
+async def test_timed_out_thread_call_keeps_its_slot(pools):
+    """A thread that is still running after its caller timed out still counts against the limit."""
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(BlockingTool().call(seconds=0.5), 0.1)
+    assert pools.get_stats()["thread"]["running"] == 1
+
+    started = time.monotonic()
+    await BlockingTool().call(seconds=0.01)
+    assert time.monotonic() - started >= 0.3  # waited for the abandoned thread
+    stats = pools.get_stats()["thread"]
+    assert stats["running"] == 0 and stats["max_queue_seconds"] >= 0.3
+
+
+async def test_workers_start_ahead_and_are_replaced(pools):
+    """Workers are spawned (and import the tool modules) before the first call; lost ones are replaced."""
+    await asyncio.to_thread(pools.start)
+    assert pools.get_stats()["process"]["alive"] == 1
+    started = time.monotonic()
+    assert await calculate.ainvoke({"expression": "6 * 7"}) == "42"
+    assert time.monotonic() - started < 0.5
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(spin.ainvoke({"seconds": 60}), 0.3)
+    for _ in range(100):
+        if pools.get_stats()["process"]["alive"] == 1:
+            break
+        await asyncio.sleep(0.05)
+    assert pools.get_stats()["process"]["alive"] == 1  # refilled in the background
+
+    # A worker that died while idle is discarded, not handed to the next call
+    pools._processes._idle[0].process.kill()
+    await asyncio.sleep(0.1)
+    assert await calculate.ainvoke({"expression": "1 + 1"}) == "2"
+    assert pools.get_stats()["process"]["errors"] == 0
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        execution_policy("gpu")
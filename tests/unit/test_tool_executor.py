@@ -0,0 +1,85 @@
+"""Unit tests for concurrent tool execution."""
+
+import asyncio
+import time
+
+from langchain.agents import create_agent
+from langchain.tools import tool
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.agent.tool_executor import ToolExecutionMiddleware, ToolExecutor
+
+running = 0
+peak = 0
+
+
+@tool
+async def lookup(city: str) -> str:
+    """Slow lookup."""
+    global running, peak
+    running += 1
+    peak = max(peak, running)
+    await asyncio.sleep(0.1 if city != "slow" else 1)
+    running -= 1
+    return f"sunny in {city}"
+
+
+@tool
+def broken(city: str) -> str:
+    """Always fails."""
+    raise ValueError("station offline")
+
+
+def _calls(*cities, name="lookup"):
+    return [{"name": name, "args": {"city": c}, "id": f"call-{i}"} for i, c in enumerate(cities)]
+
+
+def _reset():
+    global running, peak
+    running = peak = 0
+
+
+async def test_fan_out_takes_one_latency_and_keeps_order():
+    _reset()
+    executor = ToolExecutor([lookup, broken], timeout=0.5, max_parallel=3)
+    calls = _calls("a", "b", "c", "slow") + _calls("x", name="broken") + _calls("y", name="missing")
+
+    started = time.monotonic()
+    results = await executor.arun(calls)
+    assert time.monotonic() - started < 0.8
+
+    assert [r.content for r in results[:3]] == ["sunny in a", "sunny in b", "sunny in c"]
+    assert [r.tool_call_id for r in results] == [c["id"] for c in calls]
+    assert "timed out" in results[3].content and results[3].status == "error"
+    assert "station offline" in results[4].content
+    assert "unknown tool" in results[5].content
+    assert peak <= 3
+    assert executor.get_stats() == {"calls": 6, "errors": 2, "timeouts": 1}
+
+
+class ToolCallingModel(GenericFakeChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+async def test_create_agent_middleware_limits_each_turn():
+    """create_agent runs a turn's calls in parallel, capped by the middleware."""
+    _reset()
+    replies = iter([AIMessage(content="", tool_calls=_calls("a", "b", "c", "d", "e", "slow")), AIMessage(content="ok")])
+    executor = ToolExecutor([lookup], timeout=0.5, max_parallel=2)
+    agent = create_agent(
+        model=ToolCallingModel(messages=replies),
+        tools=[lookup],
+        middleware=[ToolExecutionMiddleware(executor)],
+    )
+
+    started = time.monotonic()
+    result = await agent.ainvoke({"messages": [{"role": "user", "content": "weather?"}]})
+    elapsed = time.monotonic() - started
+
+    assert peak == 2
+    assert 0.5 < elapsed < 1.0  # 3 waves of 0.1s, with the slow call cut at 0.5s
+    contents = [m.content for m in result["messages"][2:-1]]
+    assert contents[:5] == [f"sunny in {c}" for c in "abcde"]
+    assert "timed out" in contents[5]
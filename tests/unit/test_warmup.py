@@ -0,0 +1,81 @@
+"""Unit tests for startup warm-up and readiness."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from src import main
+from src.agent.warmup import Warmup
+from src.tools import execution
+from src.tools.execution import ToolPools
+
+
+@pytest.fixture(autouse=True)
+def pools(monkeypatch):
+    """The warm-up starts the tool worker processes; keep it to one."""
+    pools = ToolPools(thread_workers=1, process_workers=1)
+    monkeypatch.setattr(execution, "_pools", pools)
+    yield pools
+    pools.shutdown()
+
+
+def _slow_build():
+    time.sleep(0.2)
+    return object()
+
+
+async def test_warmup_reports_readiness(monkeypatch, pools):
+    """Not ready while warming; a failed warm-up request does not block readiness."""
+
+    def no_model():
+        raise ValueError("no API key")
+
+    monkeypatch.setattr("src.agent.graph.get_model", no_model)
+    warmup = Warmup(llm=True)
+    task = asyncio.create_task(warmup.run(_slow_build))
+    await asyncio.sleep(0.05)
+    assert warmup.status == "warming" and not warmup.ready
+
+    await task
+    assert warmup.ready
+    assert set(warmup.steps) == {"prompts", "agent", "tools", "llm"}
+    assert warmup.steps["agent"]["seconds"] >= 0.2
+    assert warmup.steps["llm"] == {"ok": False, "seconds": warmup.steps["llm"]["seconds"], "error": "no API key"}
+    assert pools.get_stats()["process"]["alive"] == 1
+
+
+async def test_failed_warmup_is_not_ready():
+    def broken():
+        raise RuntimeError("checkpointer unreachable")
+
+    warmup = Warmup()
+    await warmup.run(broken)
+    assert warmup.status == "failed" and warmup.error == "checkpointer unreachable"
+
+
+async def test_agent_built_once_and_ready_endpoint(monkeypatch):
+    """Concurrent first callers share one build; /ready answers 503 until warm."""
+    builds = []
+
+    def build():
+        builds.append(threading.current_thread().name)
+        return _slow_build()
+
+    monkeypatch.setattr(main, "create_agent_graph", build)
+    monkeypatch.setattr(main, "_agent", None)
+    monkeypatch.setattr(main, "warmup", Warmup())
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/ready")).status_code == 503
+
+        warm = asyncio.create_task(main.warmup.run(main.get_agent))
+        agents = await asyncio.gather(*(main.aget_agent() for _ in range(5)))
+        await warm
+        assert len(builds) == 1 and all(agent is agents[0] for agent in agents)
+
+        response = await client.get("/ready")
+        assert response.status_code == 200 and response.json()["status"] == "ready"